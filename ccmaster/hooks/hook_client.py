@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Forwarding client for the CCMaster hook server
+
+Hook entrypoints call forward_event() first. When CCMaster is running it owns
+a Unix socket listener that applies the event in-process, so the hook only
+has to hand the payload over and print the reply. This module deliberately
+imports nothing beyond the standard essentials to keep hook startup short.
+
+Forwarded events run under a latency budget ("hooks.latency_budget_ms" in
+config.json, 5 ms by default). When the server's reply misses it, the hook
+spools the event to a memory-backed directory, answers Claude immediately
+and leaves the event for CCMaster to drain. Each event carries a unique id
+so a spooled copy of an event that was applied after all is dropped as
+duplicate. Without a server the hook applies the event itself, to the end.
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+import uuid
+
+CONFIG_FILE = os.path.join(os.path.expanduser('~'), '.ccmaster', 'config.json')
+RUN_DIR = os.path.join(os.path.expanduser('~'), '.ccmaster', 'run')
+SOCKET_PATH = os.path.join(RUN_DIR, 'hooks.sock')
+
+# Upper bound for connecting to the hook server
+FORWARD_TIMEOUT = 1.0
+
+DEFAULT_LATENCY_BUDGET_MS = 5
+
+# Extra time allowed for the server's reply on top of its own budget
+REPLY_SLACK = 0.02
+
+_hooks_config = None
+
+
+def read_hook_input():
+    """Read the hook payload Claude Code writes to stdin"""
+    try:
+        return json.load(sys.stdin)
+    except Exception:
+        return {}
+
+
+def load_hooks_config():
+    """The "hooks" section of ~/.ccmaster/config.json (read once per process)"""
+    global _hooks_config
+    if _hooks_config is None:
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                _hooks_config = json.load(f).get('hooks', {})
+        except (OSError, ValueError, AttributeError):
+            _hooks_config = {}
+    return _hooks_config
+
+
+def latency_budget():
+    """Seconds a hook may spend applying its event before spooling it"""
+    return load_hooks_config().get('latency_budget_ms', DEFAULT_LATENCY_BUDGET_MS) / 1000.0
+
+
+def default_response(event):
+    """The response a hook gives without waiting for its event to be applied"""
+    if event == 'PostToolUse':
+        return {"status": "ok"}
+    return {"allow": True}
+
+
+def spool_dir():
+    """Memory-backed spool directory for events that missed the latency budget"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, f'ccmaster-{os.getuid()}', 'spool')
+
+
+def spool_event(event, session_id, data, event_id, ts):
+    """Park an event for CCMaster to apply later"""
+    directory = spool_dir()
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    path = os.path.join(directory, f'{ts:.6f}-{event_id}.json')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'event': event, 'session_id': session_id, 'data': data, 'id': event_id, 'ts': ts}, f)
+    # Readers only pick up complete *.json files
+    os.replace(tmp_path, path)
+
+
+def forward_event(event, session_id, data, event_id, ts, timeout=FORWARD_TIMEOUT):
+    """
+    Hand a hook event to the CCMaster hook server
+
+    Returns the server's response dict, or None when no server is listening
+    so the caller can fall back to handling the event itself. Once the event
+    has been sent, a reply that misses the latency budget spools the event
+    and returns the default response instead.
+    """
+    if not os.path.exists(SOCKET_PATH):
+        return None
+
+    request = json.dumps({
+        'event': event,
+        'session_id': session_id,
+        'data': data,
+        'id': event_id,
+        'ts': ts
+    }).encode('utf-8') + b'\n'
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(SOCKET_PATH)
+            sock.sendall(request)
+
+            # The server answers within its own budget; don't wait much longer
+            sock.settimeout(latency_budget() + REPLY_SLACK)
+            reply = b''
+            try:
+                while not reply.endswith(b'\n'):
+                    chunk = sock.recv(4096)
+                    if not chunk:
+                        break
+                    reply += chunk
+            except OSError:
+                reply = b''
+
+        if reply:
+            return json.loads(reply)
+    except (OSError, ValueError):
+        return None
+
+    # Sent but unanswered: the server may or may not have applied it
+    spool_event(event, session_id, data, event_id, ts)
+    return default_response(event)
+
+
+def apply_locally(event, session_id, data, event_id, ts):
+    """Apply an event in this process when no hook server answered
+
+    There is no latency budget on this path: the hook process exits as soon
+    as it answers, and a write cut short there would leave a torn journal
+    line behind.
+    """
+    from hook_utils import handle_event
+
+    return handle_event(event, session_id, data, event_id=event_id, ts=ts)
+
+
+def deliver_event(event, session_id, data):
+    """Forward an event to CCMaster, or apply it here; returns the hook response"""
+    event_id = uuid.uuid4().hex
+    ts = time.time()
+    response = forward_event(event, session_id, data, event_id, ts)
+    if response is None:
+        response = apply_locally(event, session_id, data, event_id, ts)
+    return response
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Hook server for CCMaster
+
+A long-lived Unix socket listener owned by the CCMaster process. Hook
+entrypoints forward their events here (see hook_client.py) instead of doing
+the status bookkeeping themselves, which keeps per-event work inside one warm
+interpreter rather than in a fresh python3 per tool call.
+
+Wire format: the client sends one JSON line
+    {"event": "PreToolUse", "session_id": "...", "data": {...}, "id": "...", "ts": 0.0}
+and the server answers with one JSON line holding the hook response. If the
+event takes longer than the latency budget to apply, the server answers with
+the default response right away and finishes applying it in the background.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from hook_client import DEFAULT_LATENCY_BUDGET_MS, SOCKET_PATH, default_response
+from hook_utils import handle_event
+
+
+class HookRequestHandler(socketserver.StreamRequestHandler):
+    """Handles a single forwarded hook event"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            request = json.loads(line)
+            event = request['event']
+            session_id = request['session_id']
+            data = request.get('data') or {}
+            response = self.server.hook_server.dispatch(
+                event, session_id, data, event_id=request.get('id'), ts=request.get('ts')
+            )
+        except Exception as e:
+            self.server.hook_server.logger.error(f"Hook server error: {e}")
+            # Never block Claude on our own failures
+            response = {"allow": True}
+
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class HookServer:
+    """Unix socket service that applies hook events in-process"""
+
+    def __init__(self, socket_path=SOCKET_PATH, on_event=None, latency_budget_ms=DEFAULT_LATENCY_BUDGET_MS):
+        self.socket_path = socket_path
+        self.on_event = on_event  # Optional callback(event, session_id, data)
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.server = None
+        self.server_thread = None
+        self.running = False
+        self.logger = logging.getLogger('CCMaster.HookServer')
+
+    def dispatch(self, event, session_id, data, event_id=None, ts=None):
+        """Apply an event exactly as the hook process would have, within the latency budget"""
+        result = {}
+
+        def apply():
+            try:
+                result['response'] = handle_event(event, session_id, data, event_id=event_id, ts=ts)
+            except Exception as e:
+                self.logger.error(f"Failed to apply {event} for {session_id}: {e}")
+                result['response'] = default_response(event)
+                return
+            if self.on_event:
+                try:
+                    self.on_event(event, session_id, data)
+                except Exception as e:
+                    self.logger.warning(f"Hook event callback failed: {e}")
+
+        worker = threading.Thread(target=apply, name='HookApply', daemon=True)
+        worker.start()
+        worker.join(self.latency_budget)
+        if 'response' in result:
+            return result['response']
+
+        # Slow disk: let Claude continue, the worker still applies the event
+        self.logger.warning(f"{event} for {session_id} exceeded the hook latency budget")
+        return default_response(event)
+
+    def _socket_in_use(self):
+        """Check whether another live process already owns the socket"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.settimeout(0.5)
+            try:
+                probe.connect(self.socket_path)
+                return True
+            except OSError:
+                return False
+
+    def start(self):
+        """Start listening; returns False if the socket could not be bound"""
+        try:
+            os.makedirs(os.path.dirname(self.socket_path), mode=0o700, exist_ok=True)
+
+            if os.path.exists(self.socket_path):
+                if self._socket_in_use():
+                    self.logger.warning(f"Hook socket {self.socket_path} is owned by another CCMaster")
+                    return False
+                # Stale socket left behind by a crashed instance
+                os.unlink(self.socket_path)
+
+            self.server = _UnixServer(self.socket_path, HookRequestHandler)
+            self.server.hook_server = self
+            os.chmod(self.socket_path, 0o600)
+
+            self.server_thread = threading.Thread(
+                target=self.server.serve_forever,
+                name='HookServer',
+                daemon=True
+            )
+            self.server_thread.start()
+            self.running = True
+            self.logger.info(f"Hook server listening on {self.socket_path}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to start hook server: {e}")
+            return False
+
+    def stop(self):
+        """Stop listening and remove the socket so hooks fall back immediately"""
+        if not self.server:
+            return
+
+        self.running = False
+        self.server.shutdown()
+        self.server.server_close()
+        if self.server_thread:
+            self.server_thread.join(timeout=5)
+
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        self.server = None
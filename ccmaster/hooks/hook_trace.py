@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Bounded hook tracing for CCMaster
+
+Hooks write diagnostics to ~/.ccmaster/logs/hooks.log through a HookTracer
+configured from the "hooks.trace" section of ~/.ccmaster/config.json:
+
+    "trace": {
+        "level": "error",          # off, error, warning, info or debug
+        "sample_rate": 1.0,        # fraction of info/debug records kept
+        "max_bytes": 1048576,      # rotate the log once it passes this size
+        "backups": 2,              # rotated files kept (hooks.log.1, .2, ...)
+        "dump_payload": false,     # include hook payloads in debug records
+        "max_payload_bytes": 4096  # truncate dumped payloads to this size
+    }
+
+Errors and warnings are never sampled. The file is opened per record with
+O_APPEND under flock(), so concurrent hook processes can share it and
+rotate it safely.
+"""
+
+import fcntl
+import json
+import os
+import random
+from datetime import datetime
+from pathlib import Path
+
+LEVELS = {'off': 0, 'error': 1, 'warning': 2, 'info': 3, 'debug': 4}
+
+DEFAULT_TRACE_CONFIG = {
+    'level': 'error',
+    'sample_rate': 1.0,
+    'max_bytes': 1024 * 1024,
+    'backups': 2,
+    'dump_payload': False,
+    'max_payload_bytes': 4096
+}
+
+
+def load_trace_config(config_file=None):
+    """Read hooks.trace from config.json, falling back to the defaults"""
+    config_file = config_file or Path.home() / '.ccmaster' / 'config.json'
+    trace_config = dict(DEFAULT_TRACE_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            trace_config.update(json.load(f).get('hooks', {}).get('trace', {}))
+    except (OSError, ValueError, AttributeError):
+        pass
+    return trace_config
+
+
+class HookTracer:
+    """Leveled, sampled, size-capped trace log for hooks"""
+
+    def __init__(self, config=None, path=None):
+        config = config if config is not None else load_trace_config()
+        self.level = LEVELS.get(str(config.get('level', 'error')).lower(), LEVELS['error'])
+        self.sample_rate = float(config.get('sample_rate', 1.0))
+        self.max_bytes = int(config.get('max_bytes', DEFAULT_TRACE_CONFIG['max_bytes']))
+        self.backups = max(int(config.get('backups', DEFAULT_TRACE_CONFIG['backups'])), 0)
+        self.dump_payload = bool(config.get('dump_payload', False))
+        self.max_payload_bytes = int(config.get('max_payload_bytes', DEFAULT_TRACE_CONFIG['max_payload_bytes']))
+        self.path = str(path or Path.home() / '.ccmaster' / 'logs' / 'hooks.log')
+
+    def enabled(self, level):
+        """Whether a record at this level would be written (before sampling)"""
+        return LEVELS.get(level, LEVELS['debug']) <= self.level
+
+    def error(self, message):
+        self.trace('error', message)
+
+    def warning(self, message):
+        self.trace('warning', message)
+
+    def info(self, message):
+        self.trace('info', message)
+
+    def debug(self, message, payload=None):
+        """Debug record; the payload is only written when dump_payload is on"""
+        if payload is not None and self.dump_payload and self.enabled('debug'):
+            dumped = json.dumps(payload, separators=(',', ':'))
+            if len(dumped) > self.max_payload_bytes:
+                dumped = dumped[:self.max_payload_bytes] + f'...<{len(dumped)} bytes>'
+            message = f"{message} payload={dumped}"
+        self.trace('debug', message)
+
+    def trace(self, level, message):
+        """Write one record if the level and sample rate allow it"""
+        if not self.enabled(level):
+            return
+        if LEVELS[level] >= LEVELS['info'] and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+
+        line = f"[{datetime.now().isoformat()}] {level.upper()} {message}\n".encode('utf-8', 'replace')
+        try:
+            self._write(line)
+        except OSError:
+            # Tracing must never break a hook
+            pass
+
+    def _write(self, line):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = self._open_locked()
+        try:
+            if self.max_bytes > 0 and os.fstat(fd).st_size + len(line) > self.max_bytes:
+                self._rotate()
+                os.close(fd)
+                fd = self._open_locked()
+            os.write(fd, line)
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
+
+    def _open_locked(self):
+        """Open the current log file and lock it, following concurrent rotations"""
+        while True:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            # Another writer may have rotated the file while we waited
+            if os.fstat(fd).st_ino == self._current_inode():
+                return fd
+            os.close(fd)
+
+    def _current_inode(self):
+        try:
+            return os.stat(self.path).st_ino
+        except OSError:
+            return None
+
+    def _rotate(self):
+        """Shift hooks.log -> hooks.log.1 -> ... dropping the oldest"""
+        if self.backups == 0:
+            os.truncate(self.path, 0)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+_tracer = None
+
+
+def get_tracer():
+    """Process-wide tracer, created on first use"""
+    global _tracer
+    if _tracer is None:
+        _tracer = HookTracer()
+    return _tracer
+
+
+def reset_tracer():
+    """Drop the cached tracer so the next use re-reads config.json"""
+    global _tracer
+    _tracer = None
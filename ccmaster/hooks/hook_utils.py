@@ -5,34 +5,130 @@ Shared utilities for CCMaster hooks
 
 import json
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 
+from hook_trace import get_tracer
+from prompt_journal import PromptJournal
+from status_journal import append_event, journal_path
+from status_table import StatusTable
+
+_status_table = None
+
+
+def get_status_table():
+    """Process-wide handle on the shared status table"""
+    global _status_table
+    if _status_table is None:
+        _status_table = StatusTable()
+    return _status_table
+
+
 class HookUtils:
-    def __init__(self, session_id):
+    def __init__(self, session_id, event_id=None, ts=None):
         self.session_id = session_id
-        # Use session-specific status file to avoid conflicts
+        # Identity and time of the hook event being applied (see hook_client)
+        self.event_id = event_id
+        self.ts = ts if ts is not None else time.time()
+        # Use session-specific status files to avoid conflicts
         self.status_dir = Path.home() / '.ccmaster' / 'status'
         self.status_dir.mkdir(exist_ok=True, parents=True)
         self.status_file = self.status_dir / f'{session_id}.json'
-    
-    def update_status(self, state, tool=None, action=None):
-        """Update session status"""
-        # Create status data for this session
+        self.journal_file = journal_path(self.status_dir, session_id)
+
+    def update_status(self, state, tool=None, action=None, **extra):
+        """Record a session state change in the session's event journal"""
+        # Create status event for this session
         status_data = {
             'state': state,
             'timestamp': datetime.now().isoformat(),
             'last_tool': tool,
-            'current_action': action
+            'current_action': action,
+            'ts': self.ts,
+            'id': self.event_id
         }
-        
-        # Save status to session-specific file
-        with open(self.status_file, 'w') as f:
-            json.dump(status_data, f, indent=2)
-    
+        status_data.update(extra)
+
+        # Append rather than overwrite so no transition is lost; CCMaster
+        # consumes the journal and exports the latest state to status_file
+        append_event(self.journal_file, status_data)
+        self.publish(state, tool)
+
+    def publish(self, state=None, tool=None):
+        """Mirror the latest state into the shared status table so CCMaster sees the change"""
+        try:
+            get_status_table().update(self.session_id, state, tool, ts=self.ts)
+        except (OSError, ValueError) as e:
+            # The journal already has the event; the table is only a change signal
+            get_tracer().warning(f"Status table update failed for {self.session_id}: {e}")
+
+    def record_tool_end(self, tool, tool_use_id=None):
+        """Journal the end of a tool call without changing the session state"""
+        append_event(self.journal_file, {
+            'event': 'tool_end',
+            'ts': self.ts,
+            'id': self.event_id,
+            'last_tool': tool,
+            'tool_use_id': tool_use_id
+        })
+        self.publish()
+
+    def log_prompt(self, prompt):
+        """Append a user prompt to the session's prompt journal (the only writer)"""
+        PromptJournal(Path.home() / '.ccmaster' / 'logs', self.session_id).append(prompt, ts=self.ts, event_id=self.event_id)
+
     def read_hook_input(self):
         """Read input from stdin for hooks"""
         try:
             return json.load(sys.stdin)
         except:
-            return {}
\ No newline at end of file
+            return {}
+
+
+def handle_event(event, session_id, data, event_id=None, ts=None):
+    """
+    Apply a hook event for a session and return the JSON response for Claude
+
+    This is the single implementation of what each hook does. It runs inside
+    the hook process when CCMaster's hook server is unavailable, and inside
+    the CCMaster process when the hook server forwards the event or drains
+    the spool. event_id and ts identify the original hook invocation.
+    """
+    utils = HookUtils(session_id, event_id=event_id, ts=ts)
+    tracer = get_tracer()
+    tracer.debug(f"{event} session={session_id} keys={list(data.keys())}", payload=data)
+
+    if event == 'PreToolUse':
+        # According to docs, PreToolUse gets: tool_name field directly
+        tool_name = data.get('tool_name', 'unknown')
+        utils.update_status('working', tool=tool_name, action=f'Using {tool_name}',
+                            event='tool_start', tool_use_id=data.get('tool_use_id'))
+        return {"allow": True}
+
+    if event == 'PostToolUse':
+        # Don't update status on PostToolUse - let other hooks handle idle detection,
+        # but timestamp the end of the call so CCMaster can measure tool latency
+        utils.record_tool_end(data.get('tool_name', 'unknown'), data.get('tool_use_id'))
+        return {"status": "ok"}
+
+    if event == 'Stop':
+        # Update status to idle when Claude stops
+        utils.update_status('idle', action='Response complete')
+        return {"allow": True}
+
+    if event == 'UserPromptSubmit':
+        # The prompt is in the 'input' field for UserPromptSubmit
+        user_prompt = data.get('input', data.get('prompt', ''))
+        utils.log_prompt(user_prompt)
+
+        # Update status to processing with the prompt
+        utils.update_status('processing', action='Processing user prompt', prompt=user_prompt)
+        return {"allow": True}
+
+    return {"allow": True}
+
+
+def log_hook_error(message):
+    """Record a hook error in the hook trace log"""
+    get_tracer().error(message)
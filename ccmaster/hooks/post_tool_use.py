@@ -6,28 +6,24 @@ Reports when Claude Code has finished using a tool
 
 import sys
 import json
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent))
-from hook_utils import HookUtils
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from hook_client import deliver_event, read_hook_input
 
 def main():
     if len(sys.argv) < 2:
         sys.exit(1)
     
     session_id = sys.argv[1]
-    utils = HookUtils(session_id)
     
     # Read hook input
-    data = utils.read_hook_input()
+    data = read_hook_input()
     
-    # Extract tool name
-    tool_name = data.get('tool', {}).get('name', 'unknown')
-    
-    # Don't update status on PostToolUse - let other hooks handle idle detection
-    # utils.update_status('completed_tool', tool=tool_name, action=f'Finished {tool_name}')
+    # Hand the event to CCMaster's hook server, or apply it ourselves
+    response = deliver_event('PostToolUse', session_id, data)
     
     # Output must be valid JSON
-    print(json.dumps({"status": "ok"}))
+    print(json.dumps(response))
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
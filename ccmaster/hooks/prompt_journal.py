@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Per-session prompt journal for CCMaster
+
+The UserPromptSubmit hook is the only writer of ~/.ccmaster/logs/<id>_prompts.log
+(one JSON line per prompt). Next to it, <id>_prompts.idx holds one fixed-size
+record per prompt, (epoch timestamp, byte offset) packed as '<dQ', so readers
+can binary search a time range and seek straight to it instead of scanning
+the whole log.
+
+Both files are written under an flock() on the log, which also guards the
+de-duplication check against the most recent entries.
+"""
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+
+INDEX_RECORD = struct.Struct('<dQ')
+
+# A hook event whose id matches one of this many most recent entries is a duplicate
+DEDUPE_ENTRIES = 64
+
+
+def prompt_log_path(logs_dir, session_id):
+    """Path of the prompt journal for a session"""
+    return os.path.join(str(logs_dir), f'{session_id}_prompts.log')
+
+
+def prompt_index_path(logs_dir, session_id):
+    """Path of the timestamp index for a session's prompt journal"""
+    return os.path.join(str(logs_dir), f'{session_id}_prompts.idx')
+
+
+def _entry_ts(entry):
+    """Epoch timestamp of a journal entry, including entries written before 'ts' existed"""
+    if 'ts' in entry:
+        return float(entry['ts'])
+    return datetime.fromisoformat(entry['timestamp']).timestamp()
+
+
+def _read_line(fd, offset):
+    """Read the journal line starting at offset"""
+    chunk = b''
+    while True:
+        data = os.pread(fd, 4096, offset + len(chunk))
+        if not data:
+            return chunk
+        end = data.find(b'\n')
+        if end >= 0:
+            return chunk + data[:end]
+        chunk += data
+
+
+class PromptJournal:
+    """Append and query one session's prompt journal"""
+
+    def __init__(self, logs_dir, session_id):
+        self.session_id = session_id
+        self.log_path = prompt_log_path(logs_dir, session_id)
+        self.index_path = prompt_index_path(logs_dir, session_id)
+
+    def append(self, prompt, ts=None, event_id=None):
+        """Append a prompt unless its hook event is already journaled; returns True if written
+
+        The same event_id among the last DEDUPE_ENTRIES entries, e.g. drained
+        from the spool after it was applied after all, is a duplicate. The
+        same text without a matching id is a genuine repeat and is kept.
+        """
+        ts = time.time() if ts is None else ts
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+
+        fd = os.open(self.log_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            records = self._load_index(fd, tail=DEDUPE_ENTRIES)
+
+            if event_id and event_id in self._recent_ids(fd, records):
+                return False
+
+            entry = {
+                'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                'ts': ts,
+                'prompt': prompt
+            }
+            if event_id:
+                entry['id'] = event_id
+            offset = os.fstat(fd).st_size
+            os.write(fd, (json.dumps(entry) + '\n').encode('utf-8'))
+            # Keep the index sorted even when a late (spooled) prompt arrives
+            index_ts = max(ts, records[-1][0]) if records else ts
+            with open(self.index_path, 'ab') as idx:
+                idx.write(INDEX_RECORD.pack(index_ts, offset))
+            return True
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
+
+    def query(self, since=None, until=None, last=None):
+        """Entries with since <= ts <= until (epoch seconds), optionally only the last N"""
+        try:
+            fd = os.open(self.log_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return []
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            records = self._load_index(fd)
+
+            lo = records.bisect(since) if since is not None else 0
+            hi = records.bisect(until, right=True) if until is not None else len(records)
+            if last is not None:
+                lo = max(lo, hi - last)
+
+            entries = []
+            for i in range(lo, hi):
+                line = _read_line(fd, records[i][1])
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+            return entries
+        finally:
+            os.close(fd)
+
+    def _recent_ids(self, fd, records):
+        """Event ids of the last DEDUPE_ENTRIES entries, read in one pass"""
+        if not records:
+            return set()
+        start = records[max(len(records) - DEDUPE_ENTRIES, 0)][1]
+        ids = set()
+        for line in os.pread(fd, os.fstat(fd).st_size - start, start).splitlines():
+            try:
+                ids.add(json.loads(line).get('id'))
+            except (ValueError, AttributeError):
+                continue
+        ids.discard(None)
+        return ids
+
+    def _load_index(self, fd, tail=None):
+        """Index records for the log open on fd, rebuilding the index if it is stale
+
+        With tail only the last that many records are loaded, which is all
+        append needs.
+        """
+        log_size = os.fstat(fd).st_size
+        try:
+            with open(self.index_path, 'rb') as idx:
+                index_size = os.fstat(idx.fileno()).st_size
+                if index_size % INDEX_RECORD.size:
+                    data = None
+                elif tail is not None:
+                    idx.seek(max(index_size - tail * INDEX_RECORD.size, 0))
+                    data = idx.read()
+                else:
+                    data = idx.read()
+        except FileNotFoundError:
+            data = None
+
+        if data is not None:
+            records = _IndexRecords(data)
+            if not records and log_size == 0:
+                return records
+            # The index is current if its last record points at the last line
+            if records and records[-1][1] < log_size:
+                end = records[-1][1] + len(_read_line(fd, records[-1][1])) + 1
+                if end == log_size:
+                    return records
+
+        return self._rebuild_index(fd)
+
+    def _rebuild_index(self, fd):
+        """Regenerate the index by scanning the log (old logs, crashes mid-append)"""
+        out = bytearray()
+        if os.fstat(fd).st_size:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as log:
+                offset = 0
+                index_ts = 0.0
+                while offset < len(log):
+                    end = log.find(b'\n', offset)
+                    if end < 0:
+                        end = len(log)
+                    try:
+                        # Same monotonic timestamps append() writes
+                        index_ts = max(index_ts, _entry_ts(json.loads(log[offset:end])))
+                        out += INDEX_RECORD.pack(index_ts, offset)
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                    offset = end + 1
+
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'wb') as idx:
+            idx.write(out)
+        os.replace(tmp_path, self.index_path)
+        return _IndexRecords(bytes(out))
+
+
+class _IndexRecords:
+    """Read-only sequence view over packed (ts, offset) index records"""
+
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data) // INDEX_RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return INDEX_RECORD.unpack_from(self.data, i * INDEX_RECORD.size)
+
+    def bisect(self, ts, right=False):
+        """First position whose timestamp is >= ts (> ts if right)"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_ts = self[mid][0]
+            if mid_ts < ts or (right and mid_ts == ts):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
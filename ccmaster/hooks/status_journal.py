@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Append-only status event journal for CCMaster sessions
+
+Hooks append one JSON line per state change to ~/.ccmaster/status/<id>.jsonl
+and CCMaster consumes the journal incrementally from a saved byte offset, so
+every transition is seen exactly once and in order no matter how quickly
+they follow each other. Writers and the reader serialize on flock(), which
+lets the reader truncate a fully consumed journal without losing an append
+that races with it.
+"""
+
+import fcntl
+import json
+import os
+
+JOURNAL_SUFFIX = '.jsonl'
+
+# Truncate a fully consumed journal once it has grown past this size
+ROTATE_BYTES = 64 * 1024
+
+
+def journal_path(status_dir, session_id):
+    """Path of the event journal for a session"""
+    return os.path.join(str(status_dir), f'{session_id}{JOURNAL_SUFFIX}')
+
+
+def append_event(path, event):
+    """Append one event to a journal as a single JSON line"""
+    line = (json.dumps(event) + '\n').encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.write(fd, line)
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+class JournalReader:
+    """Incremental reader for one session's status journal"""
+
+    def __init__(self, path, rotate_bytes=ROTATE_BYTES):
+        self.path = path
+        self.rotate_bytes = rotate_bytes
+        self.offset = 0
+
+    def read_new(self):
+        """Return the events appended since the last call, oldest first"""
+        try:
+            fd = os.open(self.path, os.O_RDWR)
+        except FileNotFoundError:
+            self.offset = 0
+            return []
+
+        events = []
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+
+            size = os.fstat(fd).st_size
+            if size < self.offset:
+                # Journal was truncated or recreated behind our back
+                self.offset = 0
+            if size == self.offset:
+                return events
+
+            os.lseek(fd, self.offset, os.SEEK_SET)
+            chunk = b''
+            while len(chunk) < size - self.offset:
+                data = os.read(fd, size - self.offset - len(chunk))
+                if not data:
+                    break
+                chunk += data
+
+            # Only consume complete lines; a torn tail is picked up next time
+            end = chunk.rfind(b'\n') + 1
+            for line in chunk[:end].splitlines():
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+            self.offset += end
+
+            # Everything written so far is consumed, so dropping it is safe
+            if self.offset >= self.rotate_bytes and self.offset == size:
+                os.ftruncate(fd, 0)
+                self.offset = 0
+        finally:
+            os.close(fd)
+
+        return events
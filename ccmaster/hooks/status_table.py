@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Shared-memory status table for CCMaster
+
+~/.ccmaster/status.table is a small fixed-size file mapped into memory by
+every hook and by CCMaster. It holds one fixed-size slot per session:
+
+    seq (u64) | ts (f64) | session_id (48s) | state (16s) | tool (40s) | crc32 (u32) | pad
+
+Hooks update their session's slot with a single pwrite() and bump its
+sequence counter; CCMaster scans every slot in one pass over the mapping
+and only looks further at sessions whose counter moved. Readers check the
+crc so a slot caught mid-write is simply retried on the next scan. Writers
+claim slots and bump counters under flock() on the table, so concurrent
+hooks never lose an update, and slots are recycled oldest-first when the
+table is full.
+
+The table only carries the latest state per session. The event journal
+(status_journal.py) stays the complete record of transitions, and CCMaster
+still exports status/<id>.json for external tools.
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+MAGIC = b'CCST'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHI')  # magic, version, slot size, slot count
+HEADER_SIZE = 64
+
+SLOT = struct.Struct('<Qd48s16s40sI4x')  # seq, ts, session_id, state, tool, crc
+CRC_SPAN = SLOT.size - 8  # crc covers everything before the crc field
+
+SLOT_COUNT = 256
+
+
+def default_table_path():
+    return str(Path.home() / '.ccmaster' / 'status.table')
+
+
+def _text(raw):
+    return raw.rstrip(b'\0').decode('utf-8', 'replace')
+
+
+def _field(value, size):
+    return (value or '').encode('utf-8')[:size]
+
+
+class StatusTable:
+    """Fixed-slot, memory-mapped table of the latest state per session"""
+
+    def __init__(self, path=None, slot_count=SLOT_COUNT):
+        self.path = path or default_table_path()
+        self.slot_count = slot_count
+        self.fd = None
+        self.map = None
+        self.slots = {}  # session_id -> slot index (cache, verified on use)
+        # flock() doesn't exclude threads sharing the descriptor, e.g. the hook server's
+        self.lock = threading.Lock()
+
+    def open(self):
+        """Map the table, creating it on first use"""
+        if self.map is not None:
+            return self
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            size = HEADER_SIZE + self.slot_count * SLOT.size
+            if os.fstat(fd).st_size < HEADER_SIZE:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    # Re-check under the lock; another process may have won
+                    if os.fstat(fd).st_size < HEADER_SIZE:
+                        os.ftruncate(fd, size)
+                        header = HEADER.pack(MAGIC, VERSION, SLOT.size, self.slot_count)
+                        os.pwrite(fd, header.ljust(HEADER_SIZE, b'\0'), 0)
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+            magic, version, slot_size, slot_count = HEADER.unpack(os.pread(fd, HEADER.size, 0))
+            if magic != MAGIC or version != VERSION or slot_size != SLOT.size:
+                raise ValueError(f"{self.path} is not a version {VERSION} status table")
+            self.slot_count = slot_count
+            self.map = mmap.mmap(fd, HEADER_SIZE + slot_count * SLOT.size, access=mmap.ACCESS_READ)
+            self.fd = fd
+        except Exception:
+            os.close(fd)
+            raise
+        return self
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _offset(self, index):
+        return HEADER_SIZE + index * SLOT.size
+
+    def _slot_session(self, index):
+        start = self._offset(index) + 16
+        return _text(self.map[start:start + 48])
+
+    def _find(self, session_id):
+        """Slot index holding session_id, or None"""
+        index = self.slots.get(session_id)
+        if index is not None and self._slot_session(index) == session_id:
+            return index
+
+        key = _field(session_id, 48).ljust(48, b'\0')
+        for index in range(self.slot_count):
+            start = self._offset(index) + 16
+            if self.map[start:start + 48] == key:
+                self.slots[session_id] = index
+                return index
+        return None
+
+    def _claim(self, session_id):
+        """Assign a slot to session_id, recycling the stalest one if the table is full
+
+        Called with the table locked.
+        """
+        index = None
+        empty = b'\0' * 48
+        oldest = None
+        for candidate in range(self.slot_count):
+            start = self._offset(candidate)
+            if self.map[start + 16:start + 64] == empty:
+                index = candidate
+                break
+            ts = struct.unpack_from('<d', self.map, start + 8)[0]
+            if oldest is None or ts < oldest[0]:
+                oldest = (ts, candidate)
+        if index is None:
+            index = oldest[1]
+
+        self._write(index, session_id, '', None, time.time(), 0)
+        self.slots[session_id] = index
+        return index
+
+    def _write(self, index, session_id, state, tool, ts, seq):
+        body = SLOT.pack(seq, ts, _field(session_id, 48), _field(state, 16), _field(tool, 40), 0)
+        crc = zlib.crc32(body[:CRC_SPAN])
+        # One pwrite per update; readers detect a torn slot through the crc
+        os.pwrite(self.fd, body[:CRC_SPAN] + struct.pack('<I4x', crc), self._offset(index))
+
+    def update(self, session_id, state=None, tool=None, ts=None):
+        """Publish a session's latest state; state=None only bumps the sequence counter"""
+        self.open()
+        # Locked from reading the counter to writing it back, or two writers
+        # could both publish seq + 1 and the watcher would miss one change
+        with self.lock:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                index = self._find(session_id)
+                if index is None:
+                    index = self._claim(session_id)
+
+                current = self.read_slot(index)
+                seq = (current['seq'] if current else 0) + 1
+                if state is None and current:
+                    state, tool = current['state'], current['tool']
+                self._write(index, session_id, state, tool, ts if ts is not None else time.time(), seq)
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def read_slot(self, index):
+        """Decode one slot; None if it is empty or caught mid-write"""
+        start = self._offset(index)
+        raw = self.map[start:start + SLOT.size]
+        seq, ts, session_id, state, tool, crc = SLOT.unpack(raw)
+        if not session_id.strip(b'\0') or zlib.crc32(raw[:CRC_SPAN]) != crc:
+            return None
+        return {
+            'session_id': _text(session_id),
+            'state': _text(state),
+            'tool': _text(tool) or None,
+            'ts': ts,
+            'seq': seq
+        }
+
+    def scan(self):
+        """Every valid slot in one pass over the mapping, keyed by session ID"""
+        self.open()
+        entries = {}
+        for index in range(self.slot_count):
+            slot = self.read_slot(index)
+            if slot:
+                entries[slot['session_id']] = slot
+        return entries
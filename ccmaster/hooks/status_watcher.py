@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Status directory watcher for CCMaster
+
+One thread watches for hook writes and tells CCMaster which session
+changed. The backend only decides how the thread is woken:
+
+- inotify (Linux): one watch on the status directory and one on the table
+- kqueue (macOS/BSD): one vnode filter per journal, one on the directory
+  and one on the table
+- polling: a timer every poll interval
+
+On every wakeup the watcher makes one pass over the shared status table
+(status_table.py) and dispatches the sessions whose sequence counter moved.
+Sessions without a table slot fall back to their journal: journal events
+name them on inotify/kqueue, and the polling backend stat()s the journal.
+Hooks append to the journal just before they publish to the table, so a
+journal event for a session whose counter hasn't moved yet is held back for
+one poll interval and dispatched then if the table update never arrives.
+The polling backend has no journal events, so for sessions with a slot it
+goes by the table alone.
+
+Thread count stays constant however many sessions are registered.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from status_journal import JOURNAL_SUFFIX, journal_path
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+
+def _load_inotify():
+    """Return libc if it provides inotify, otherwise None"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+    return libc
+
+
+class StatusWatcher:
+    """Single-thread watcher dispatching status journal writes per session"""
+
+    def __init__(self, status_dir, on_change, poll_interval=0.5, backend=None, table=None):
+        self.status_dir = str(status_dir)
+        self.on_change = on_change  # Callback(session_id), run on the watcher thread
+        self.poll_interval = poll_interval
+        self.table = table  # Optional StatusTable scanned on every wakeup
+        self.table_seqs = {}  # session_id -> slot sequence counter at the last scan
+        self.unconfirmed = {}  # session_id -> deadline for a journal event the table hasn't shown yet
+        self.logger = logging.getLogger('CCMaster.StatusWatcher')
+
+        self.sessions = set()
+        self.pending = set()  # Sessions to dispatch on the next wakeup
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+        # Self-pipe used to wake the watcher for registrations and stop()
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+
+        self.libc = None
+        if backend is None:
+            if _load_inotify():
+                backend = 'inotify'
+            elif hasattr(select, 'kqueue'):
+                backend = 'kqueue'
+            else:
+                backend = 'poll'
+        if backend == 'inotify':
+            self.libc = _load_inotify()
+        self.backend = backend
+
+    def watch(self, session_id):
+        """Start dispatching changes for a session"""
+        with self.lock:
+            self.sessions.add(session_id)
+        # Pick up anything already journaled before registration
+        self.notify(session_id)
+
+    def unwatch(self, session_id):
+        """Stop dispatching changes for a session"""
+        with self.lock:
+            self.sessions.discard(session_id)
+            self.pending.discard(session_id)
+
+    def notify(self, session_id):
+        """Ask the watcher thread to dispatch a session now"""
+        with self.lock:
+            self.pending.add(session_id)
+        self._wake()
+
+    def start(self):
+        """Start the watcher thread"""
+        if self.running:
+            return
+        self.running = True
+        target = {
+            'inotify': self._run_inotify,
+            'kqueue': self._run_kqueue,
+        }.get(self.backend, self._run_poll)
+        self.thread = threading.Thread(target=target, name='StatusWatcher', daemon=True)
+        self.thread.start()
+        self.logger.info(f"Status watcher started ({self.backend})")
+
+    def stop(self):
+        """Stop the watcher thread"""
+        if not self.running:
+            return
+        self.running = False
+        self._wake()
+        if self.thread:
+            self.thread.join(timeout=5)
+        for fd in (self.wake_r, self.wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _wake(self):
+        try:
+            os.write(self.wake_w, b'x')
+        except OSError:
+            # Pipe full means a wakeup is already queued
+            pass
+
+    def _drain_wake(self):
+        try:
+            while os.read(self.wake_r, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _dispatch(self, changed):
+        """Run the callback for changed sessions plus any explicitly notified"""
+        with self.lock:
+            changed = (set(changed) | self.pending) & self.sessions
+            self.pending.clear()
+        for session_id in changed:
+            try:
+                self.on_change(session_id)
+            except Exception as e:
+                self.logger.error(f"Status dispatch error for {session_id}: {e}")
+
+    def _open_table(self):
+        """Path of the mapped status table, or None if there is no usable table"""
+        if not self.table:
+            return None
+        try:
+            self.table.open()
+            return self.table.path
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Status table unavailable, following journals only: {e}")
+            self.table = None
+            return None
+
+    def _scan_table(self, sessions):
+        """One pass over the status table: (sessions whose slot changed, sessions without a slot)"""
+        slots = {}
+        if self.table:
+            try:
+                slots = self.table.scan()
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Status table scan failed, following journals only: {e}")
+                self.table = None
+
+        moved = set()
+        for session_id in sessions & slots.keys():
+            seq = slots[session_id]['seq']
+            if self.table_seqs.get(session_id) != seq:
+                self.table_seqs[session_id] = seq
+                moved.add(session_id)
+        return moved, sessions - slots.keys()
+
+    def _collect(self, named, sessions):
+        """Sessions to dispatch after a wakeup, given those named by journal events"""
+        moved, unslotted = self._scan_table(sessions)
+        now = time.monotonic()
+        for session_id in set(self.unconfirmed) - sessions:
+            del self.unconfirmed[session_id]
+        for session_id in moved:
+            self.unconfirmed.pop(session_id, None)
+        for session_id in (named & sessions) - moved - unslotted:
+            # The hook publishes to the table right after its journal append
+            self.unconfirmed.setdefault(session_id, now + self.poll_interval)
+        expired = {session_id for session_id, deadline in self.unconfirmed.items() if deadline <= now}
+        for session_id in expired:
+            del self.unconfirmed[session_id]
+        return moved | (named & unslotted) | expired
+
+    def _timeout(self):
+        """How long a wakeup may wait: until the earliest unconfirmed journal event is due"""
+        if not self.unconfirmed:
+            return None
+        return max(0.0, min(self.unconfirmed.values()) - time.monotonic())
+
+    def _session_for(self, name):
+        """Map a journal file name back to its session ID"""
+        if not name.endswith(JOURNAL_SUFFIX):
+            return None
+        return name[:-len(JOURNAL_SUFFIX)]
+
+    def _run_inotify(self):
+        libc = self.libc
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            self.logger.warning("inotify_init1 failed, falling back to polling")
+            return self._run_poll()
+
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_MOVED_TO
+        if libc.inotify_add_watch(fd, self.status_dir.encode(), mask) < 0:
+            os.close(fd)
+            self.logger.warning("inotify_add_watch failed, falling back to polling")
+            return self._run_poll()
+        table_path = self._open_table()
+        if table_path and libc.inotify_add_watch(fd, table_path.encode(), IN_MODIFY) < 0:
+            self.logger.warning("inotify_add_watch failed on the status table, following journals only")
+            self.table = None
+
+        try:
+            while self.running:
+                readable, _, _ = select.select([fd, self.wake_r], [], [], self._timeout())
+                if self.wake_r in readable:
+                    self._drain_wake()
+
+                with self.lock:
+                    sessions = set(self.sessions)
+                named = set()
+                overflow = False
+                if fd in readable:
+                    try:
+                        buf = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        buf = b''
+                    offset = 0
+                    while offset + _INOTIFY_EVENT.size <= len(buf):
+                        _, event_mask, _, name_len = _INOTIFY_EVENT.unpack_from(buf, offset)
+                        start = offset + _INOTIFY_EVENT.size
+                        name = buf[start:start + name_len].split(b'\0', 1)[0].decode('utf-8', 'replace')
+                        offset = start + name_len
+
+                        if event_mask & IN_Q_OVERFLOW:
+                            # Events were dropped; re-read every session
+                            overflow = True
+                            continue
+                        # Writes to the table carry no name; the scan below finds the session
+                        session_id = self._session_for(name)
+                        if session_id:
+                            named.add(session_id)
+
+                changed = self._collect(named, sessions)
+                if overflow:
+                    changed |= sessions
+                if self.running:
+                    self._dispatch(changed)
+        finally:
+            os.close(fd)
+
+    def _run_kqueue(self):
+        kq = select.kqueue()
+        dir_fd = os.open(self.status_dir, os.O_RDONLY)
+        file_fds = {}  # session_id -> fd
+        fd_sessions = {}  # fd -> session_id
+
+        vnode_flags = select.KQ_NOTE_WRITE | select.KQ_NOTE_EXTEND | select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME
+
+        def register(session_id):
+            path = journal_path(self.status_dir, session_id)
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                return
+            kq.control([select.kevent(fd, select.KQ_FILTER_VNODE,
+                                      select.KQ_EV_ADD | select.KQ_EV_CLEAR, vnode_flags)], 0)
+            file_fds[session_id] = fd
+            fd_sessions[fd] = session_id
+
+        def unregister(session_id):
+            fd = file_fds.pop(session_id, None)
+            if fd is not None:
+                fd_sessions.pop(fd, None)
+                os.close(fd)  # Closing removes the kevent
+
+        kq.control([
+            select.kevent(dir_fd, select.KQ_FILTER_VNODE, select.KQ_EV_ADD | select.KQ_EV_CLEAR, select.KQ_NOTE_WRITE),
+            select.kevent(self.wake_r, select.KQ_FILTER_READ, select.KQ_EV_ADD),
+        ], 0)
+        table_fd = None
+        table_path = self._open_table()
+        if table_path:
+            table_fd = os.open(table_path, os.O_RDONLY)
+            kq.control([select.kevent(table_fd, select.KQ_FILTER_VNODE,
+                                      select.KQ_EV_ADD | select.KQ_EV_CLEAR, select.KQ_NOTE_WRITE)], 0)
+
+        try:
+            while self.running:
+                # Journals appear lazily, so attach to any that exist now
+                with self.lock:
+                    sessions = set(self.sessions)
+                for session_id in sessions - set(file_fds):
+                    register(session_id)
+                for session_id in set(file_fds) - sessions:
+                    unregister(session_id)
+
+                events = kq.control(None, 64, self._timeout())
+                named = set()
+                for event in events:
+                    if event.ident == self.wake_r:
+                        self._drain_wake()
+                    elif event.ident == dir_fd:
+                        # A journal was created; new ones get registered above
+                        named |= sessions - set(file_fds)
+                    elif event.ident in fd_sessions:
+                        session_id = fd_sessions[event.ident]
+                        named.add(session_id)
+                        if event.fflags & (select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME):
+                            unregister(session_id)
+                    # A table write needs no bookkeeping; the scan below finds the session
+
+                changed = self._collect(named, sessions)
+                if self.running:
+                    self._dispatch(changed)
+        finally:
+            for session_id in list(file_fds):
+                unregister(session_id)
+            if table_fd is not None:
+                os.close(table_fd)
+            os.close(dir_fd)
+            kq.close()
+
+    def _run_poll(self):
+        signatures = {}  # session_id -> (size, mtime_ns) of journals without a table slot
+        self._open_table()
+        while self.running:
+            readable, _, _ = select.select([self.wake_r], [], [], self.poll_interval)
+            if readable:
+                self._drain_wake()
+
+            with self.lock:
+                sessions = set(self.sessions)
+
+            changed, unslotted = self._scan_table(sessions)
+            for session_id in unslotted:
+                try:
+                    st = os.stat(journal_path(self.status_dir, session_id))
+                    signature = (st.st_size, st.st_mtime_ns)
+                except OSError as e:
+                    if e.errno != errno.ENOENT:
+                        raise
+                    signature = None
+                if signatures.get(session_id) != signature:
+                    signatures[session_id] = signature
+                    changed.add(session_id)
+
+            if self.running:
+                self._dispatch(changed)
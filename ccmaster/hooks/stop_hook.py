@@ -6,9 +6,9 @@ Reports when Claude finishes responding completely
 
 import sys
 import json
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent))
-from hook_utils import HookUtils
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from hook_client import deliver_event, read_hook_input
 
 def main():
     # Always allow even if no session ID
@@ -18,26 +18,22 @@ def main():
     
     session_id = sys.argv[1]
     
-    utils = HookUtils(session_id)
-    
     # Read hook input
-    data = utils.read_hook_input()
+    data = read_hook_input()
     
-    # Update status to idle when Claude stops
-    utils.update_status('idle', action='Response complete')
+    # Hand the event to CCMaster's hook server, or apply it ourselves
+    response = deliver_event('Stop', session_id, data)
     
     # Output must be valid JSON with allow field
     # Always allow stop
-    print(json.dumps({"allow": True}))
+    print(json.dumps(response))
 
 if __name__ == '__main__':
     try:
         main()
     except Exception as e:
         # On any error, allow the operation to continue
-        from datetime import datetime
-        error_log = Path.home() / '.ccmaster' / 'hook_errors.log'
-        with open(error_log, 'a') as f:
-            f.write(f"\n[{datetime.now()}] Stop Hook Error: {str(e)}\n")
+        from hook_utils import log_hook_error
+        log_hook_error(f"Stop Hook Error: {str(e)}")
         print(json.dumps({"allow": True}))
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
@@ -1,3 +1,4 @@
 #!/usr/bin/env bash
 # Wrapper script for Claude Code compatibility
-exec /usr/bin/env python3 "$(dirname "$0")/stop_hook.py" "$@"
\ No newline at end of file
+# -S skips site-packages setup; hooks only need the standard library
+exec /usr/bin/env python3 -S "$(dirname "$0")/stop_hook.py" "$@"
\ No newline at end of file
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tool latency tracking for CCMaster sessions
+
+PreToolUse and PostToolUse hooks journal a timestamp for each end of a tool
+call. CCMaster pairs them (by tool_use_id when Claude provides one, otherwise
+first-in first-out per tool) and records the duration in a per-tool histogram.
+Histograms use logarithmic buckets so they stay small and can be merged
+across sessions for `ccmaster stats tools`.
+"""
+
+import math
+import threading
+from collections import deque
+
+# Each bucket is 2^(1/4) wider than the previous one (~19% relative error)
+BUCKET_BASE = 2 ** 0.25
+_LOG_BASE = math.log(BUCKET_BASE)
+
+# Cap on unmatched PreToolUse events kept per tool (denied calls never end)
+MAX_PENDING = 256
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram in milliseconds"""
+
+    def __init__(self):
+        self.buckets = {}  # bucket index -> count
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        """Add one observation"""
+        ms = max(ms, 0.0)
+        index = int(math.floor(math.log(ms) / _LOG_BASE)) if ms >= 1.0 else 0
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        """Approximate percentile (0-100) as the upper bound of its bucket"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100.0)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(BUCKET_BASE ** (index + 1), self.max_ms)
+        return self.max_ms
+
+    def merge(self, other):
+        """Fold another histogram into this one"""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def summary(self):
+        """Count, mean, percentiles and max, all in milliseconds"""
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 1),
+            'mean_ms': round(self.total_ms / self.count, 1) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 1),
+            'p95_ms': round(self.percentile(95), 1),
+            'p99_ms': round(self.percentile(99), 1),
+            'max_ms': round(self.max_ms, 1)
+        }
+
+    def to_dict(self):
+        return {
+            'buckets': {str(k): v for k, v in self.buckets.items()},
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'max_ms': self.max_ms
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls()
+        hist.buckets = {int(k): v for k, v in data.get('buckets', {}).items()}
+        hist.count = data.get('count', 0)
+        hist.total_ms = data.get('total_ms', 0.0)
+        hist.max_ms = data.get('max_ms', 0.0)
+        return hist
+
+
+class ToolLatencyTracker:
+    """Pairs tool start/end events for one session and keeps per-tool histograms"""
+
+    def __init__(self):
+        self.histograms = {}  # tool name -> LatencyHistogram
+        self.pending_by_id = {}  # tool_use_id -> (tool, start ts)
+        self.pending_by_tool = {}  # tool name -> deque of start ts without an ID
+        self.lock = threading.Lock()
+
+    def start(self, tool, ts, tool_use_id=None):
+        """Record the start of a tool call"""
+        with self.lock:
+            if tool_use_id:
+                self.pending_by_id[tool_use_id] = (tool, ts)
+                if len(self.pending_by_id) > MAX_PENDING:
+                    # Drop the oldest unmatched start
+                    self.pending_by_id.pop(next(iter(self.pending_by_id)))
+            else:
+                self.pending_by_tool.setdefault(tool, deque(maxlen=MAX_PENDING)).append(ts)
+
+    def end(self, tool, ts, tool_use_id=None):
+        """Record the end of a tool call; returns the duration in ms or None"""
+        with self.lock:
+            start = None
+            if tool_use_id and tool_use_id in self.pending_by_id:
+                tool, start = self.pending_by_id.pop(tool_use_id)
+            elif self.pending_by_tool.get(tool):
+                start = self.pending_by_tool[tool].popleft()
+            if start is None:
+                return None
+
+            ms = (ts - start) * 1000.0
+            self.histograms.setdefault(tool, LatencyHistogram()).record(ms)
+            return ms
+
+    def clear_pending(self):
+        """Forget unmatched starts, e.g. when the turn has ended"""
+        with self.lock:
+            self.pending_by_id.clear()
+            self.pending_by_tool.clear()
+
+    def summary(self):
+        """Per-tool summaries, slowest total time first"""
+        with self.lock:
+            return summarize(self.histograms)
+
+    def to_dict(self):
+        with self.lock:
+            return {tool: hist.to_dict() for tool, hist in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        tracker = cls()
+        tracker.histograms = {tool: LatencyHistogram.from_dict(h) for tool, h in data.items()}
+        return tracker
+
+
+def summarize(histograms):
+    """Summaries for a {tool: LatencyHistogram} mapping, slowest total first"""
+    rows = {tool: hist.summary() for tool, hist in histograms.items()}
+    return dict(sorted(rows.items(), key=lambda item: item[1]['total_ms'], reverse=True))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the MCP protocol layer and JSON codecs
+
+Measures encode/decode throughput for a typical tools/call request and its
+response. It covers the protocol classes against the previous
+dict + uuid4 + stdlib json implementation, and each installed JSON backend.
+
+    python -m mcp.bench_protocol [--seconds 0.5]
+"""
+
+import argparse
+import json
+import time
+import uuid
+
+from . import codec
+from .protocol import MCPMessage, MCPProtocol
+
+ARGUMENTS = {
+    "action": "send_to_member",
+    "member": "developer_1",
+    "message": "Please run the integration tests for the payment service and report failures. " * 3,
+    "wait_for_response": False
+}
+
+RESULT = {
+    "success": True,
+    "session_id": "mcp_20250119_143022_123456",
+    "message_sent": ARGUMENTS["message"],
+    "timestamp": "2025-01-19T14:30:22.123456",
+    "member": "developer_1",
+    "message": "Message sent to developer_1 (mcp_20250119_143022_123456)"
+}
+
+
+def measure(func, seconds: float) -> float:
+    """Calls per second of func, run for roughly the given time"""
+    batch = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batch):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return batch / elapsed
+        batch *= 2
+
+
+def legacy_request() -> str:
+    """Request encoding before the fast path: dict envelope, uuid4 id, stdlib json"""
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "method": "tools/call",
+        "params": {"name": "communicate", "arguments": ARGUMENTS},
+        "id": str(uuid.uuid4())
+    })
+
+
+def legacy_response(message_id) -> str:
+    content = [{"type": "text", "text": json.dumps(RESULT, indent=2)}]
+    return json.dumps({"jsonrpc": "2.0", "id": message_id, "result": {"content": content, "isError": False}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark MCP message encoding and decoding')
+    parser.add_argument('--seconds', type=float, default=0.5, help='Time spent on each measurement')
+    args = parser.parse_args()
+    
+    protocol = MCPProtocol()
+    request_text = legacy_request()
+    response_text = legacy_response(1)
+    
+    def fast_request():
+        return protocol.create_tool_call_message("communicate", ARGUMENTS).to_json()
+    
+    def fast_response():
+        content = [{"type": "text", "text": codec.dumps(RESULT)}]
+        return protocol.create_tool_response(1, content).to_json()
+    
+    rows = [
+        ("encode tools/call (legacy)", legacy_request),
+        (f"encode tools/call ({codec.BACKEND})", fast_request),
+        ("encode result (legacy)", lambda: legacy_response(1)),
+        (f"encode result ({codec.BACKEND})", fast_response),
+        ("decode tools/call (json)", lambda: json.loads(request_text)),
+        (f"decode tools/call ({codec.BACKEND})", lambda: protocol.parse_message(request_text)),
+        ("decode result (json)", lambda: json.loads(response_text)),
+        (f"decode result ({codec.BACKEND})", lambda: codec.loads(response_text)),
+        ("message id (uuid4)", lambda: str(uuid.uuid4())),
+        ("message id (counter)", lambda: MCPMessage("ping").id),
+    ]
+    
+    # Every installed backend on the same payloads
+    for name in ('json', 'orjson', 'ujson'):
+        backend, dumps, loads = codec._load_backend(name)
+        if backend != name:
+            continue
+        payload = {"jsonrpc": "2.0", "method": "tools/call",
+                   "params": {"name": "communicate", "arguments": ARGUMENTS}, "id": 1}
+        rows.append((f"backend {name}: dumps", lambda dumps=dumps: dumps(payload)))
+        rows.append((f"backend {name}: loads", lambda loads=loads: loads(request_text)))
+    
+    print(f"JSON backend: {codec.BACKEND}; request {len(request_text)} bytes, response {len(response_text)} bytes")
+    print(f"{'Benchmark':<36} {'ops/s':>12} {'us/op':>9}")
+    for label, func in rows:
+        rate = measure(func, args.seconds)
+        print(f"{label:<36} {rate:>12,.0f} {1e6 / rate:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Pre-serialized catalogues for the CCMaster MCP server
+
+tools/list and resources/list return the same large definitions on every
+call, so each catalogue is built and serialized once and then served from
+the cached text. A catalogue is rebuilt only when the registry changes
+(tool registered or removed); if the serialized form actually differs, its
+version is bumped and the change callback fires so the server can send
+notifications/<kind>/list_changed.
+
+Each catalogue carries an ETag so HTTP clients can revalidate with
+If-None-Match instead of downloading it again.
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from . import codec
+from .protocol import encode_response
+
+
+class CatalogEntry:
+    """One serialized catalogue"""
+    
+    def __init__(self, kind: str, version: int, result: Dict[str, Any]):
+        self.kind = kind
+        self.version = version
+        self.text = codec.dumps(result)
+        self.body = self.text.encode('utf-8')
+        self.digest = hashlib.sha1(self.body).hexdigest()[:16]
+        self.etag = f'"{kind}-{version}-{self.digest}"'
+
+
+class Catalog:
+    """Cached tools/resources listings, rebuilt only on registry changes"""
+    
+    def __init__(self, builders: Dict[str, Callable[[], Dict[str, Any]]],
+                 on_change: Callable[[str], None] = None):
+        self.builders = builders  # kind -> callable returning the list result, e.g. {"tools": [...]}
+        self.on_change = on_change  # Callback(kind) after a catalogue's content changed
+        self.entries = {}  # kind -> CatalogEntry
+        self.lock = threading.Lock()
+    
+    def get(self, kind: str) -> CatalogEntry:
+        """Current catalogue, built on first use"""
+        entry = self.entries.get(kind)
+        if entry is None:
+            with self.lock:
+                entry = self.entries.get(kind)
+                if entry is None:
+                    entry = CatalogEntry(kind, 1, self.builders[kind]())
+                    self.entries[kind] = entry
+        return entry
+    
+    def invalidate(self, kind: str) -> Optional[CatalogEntry]:
+        """Rebuild a catalogue after a registry change; notifies only if it changed"""
+        with self.lock:
+            previous = self.entries.get(kind)
+            if previous is None:
+                # Never served, so nobody can hold a stale copy; build lazily
+                return None
+            entry = CatalogEntry(kind, previous.version + 1, self.builders[kind]())
+            if entry.digest == previous.digest:
+                return previous
+            self.entries[kind] = entry
+        
+        if self.on_change:
+            self.on_change(kind)
+        return entry
+    
+    def response(self, kind: str, message_id: Any) -> str:
+        """JSON-RPC response for a list request, spliced around the cached result"""
+        return encode_response(message_id, self.get(kind).text)
@@ -21,7 +21,7 @@ from client import CCMasterMCPClient
 def main():
     parser = argparse.ArgumentParser(description='CCMaster MCP Client for Claude Code Sessions')
     parser.add_argument('--host', default='localhost', help='CCMaster MCP server host')
-    parser.add_argument('--port', type=int, default=8080, help='CCMaster MCP server port')
+    parser.add_argument('--port', type=int, default=8181, help='CCMaster MCP server port')
     
     subparsers = parser.add_subparsers(dest='command', help='Commands')
     
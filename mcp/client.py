@@ -5,7 +5,6 @@ Provides MCP client functionality to connect to external MCP servers
 and the CCMaster MCP server from Claude Code sessions.
 """
 
-import json
 try:
     import requests
 except ImportError:
@@ -13,19 +12,22 @@ except ImportError:
 import subprocess
 import sys
 import time
+import uuid
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from urllib.parse import urljoin
 
-from .protocol import MCPProtocol, MCPMessage, MCPResponse
+from . import codec
+from .protocol import MCPProtocol, MCPMessage, MCPNotification, MCPResponse
 
 
 class MCPClient:
     """MCP Client for connecting to MCP servers"""
     
-    def __init__(self, client_name: str = "ccmaster-client", client_version: str = "1.0.0"):
+    def __init__(self, client_name: str = "ccmaster-client", client_version: str = "1.0.0", timeout: float = 30):
         self.client_name = client_name
         self.client_version = client_version
+        self.timeout = timeout  # Per-request HTTP timeout in seconds
         self.protocol = MCPProtocol()
         self.server_url = None
         self.initialized = False
@@ -85,6 +87,19 @@ class MCPClient:
     
     def _send_message(self, message: MCPMessage) -> Optional[Dict[str, Any]]:
         """Send message to MCP server"""
+        return self._post(message.to_json())
+    
+    def _send_batch(self, messages: List[MCPMessage]) -> Dict[Any, Dict[str, Any]]:
+        """Send messages as one JSON-RPC batch; returns responses keyed by message id"""
+        payload = "[" + ",".join(message.to_json() for message in messages) + "]"
+        responses = self._post(payload)
+        if isinstance(responses, dict):
+            # The server rejected the batch as a whole
+            return {message.id: responses for message in messages}
+        return {response.get('id'): response for response in responses or []}
+    
+    def _post(self, payload: str) -> Optional[Any]:
+        """POST a JSON-RPC payload; None for notifications or on error"""
         try:
             if not self.server_url:
                 return None
@@ -96,18 +111,24 @@ class MCPClient:
             
             response = self.session.post(
                 self.server_url,
-                data=message.to_json(),
+                data=payload,
                 headers=headers,
-                timeout=30
+                timeout=self.timeout
             )
             
             response.raise_for_status()
-            return response.json()
+            if response.status_code == 202 or not response.content:
+                return None
+            return codec.loads(response.content)
             
         except Exception as e:
             self.logger.error(f"Message send error: {e}")
             return None
     
+    def send_notification(self, method: str, params: Optional[Dict[str, Any]] = None):
+        """Send a notification (no response is expected)"""
+        self._post(MCPNotification(method, params).to_json())
+    
     def _load_server_capabilities(self):
         """Load available tools and resources from server"""
         if not self.initialized:
@@ -137,32 +158,73 @@ class MCPClient:
         """List available resources"""
         return self.available_resources
     
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Call a tool on the MCP server"""
+    def call_tool(self, tool_name: str, arguments: Dict[str, Any], retries: int = 0) -> Optional[Dict[str, Any]]:
+        """Call a tool on the MCP server
+        
+        With retries, a call that gets no response (connection error or
+        timeout) is sent again. It carries an idempotency_key so the server
+        runs a mutating action only once however often it is retried.
+        """
         if not self.initialized:
             self.logger.error("Client not connected to server")
             return None
         
         try:
+            if retries and 'idempotency_key' not in arguments:
+                arguments = dict(arguments, idempotency_key=uuid.uuid4().hex)
+            
             # Create tool call message
             tool_message = self.protocol.create_tool_call_message(tool_name, arguments)
             
             # Send message
             response = self._send_message(tool_message)
-            
-            if response and response.get('result'):
-                return response['result']
-            elif response and response.get('error'):
-                self.logger.error(f"Tool call error: {response['error']}")
-                return {"error": response['error']}
-            else:
-                self.logger.error("Invalid response from server")
-                return None
+            for attempt in range(retries):
+                if response is not None:
+                    break
+                time.sleep(min(0.1 * 2 ** attempt, 2))
+                self.logger.info(f"Retrying {tool_name} ({attempt + 1}/{retries})")
+                response = self._send_message(tool_message)
+            return self._tool_result(response)
                 
         except Exception as e:
             self.logger.error(f"Tool call error: {e}")
             return None
     
+    def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """Call several tools in one round trip; results are returned in call order
+        
+        The server runs the calls concurrently, so they should not depend on each other.
+        """
+        if not self.initialized:
+            self.logger.error("Client not connected to server")
+            return [None] * len(calls)
+        
+        if not calls:
+            return []
+        
+        try:
+            messages = [
+                self.protocol.create_tool_call_message(tool_name, arguments)
+                for tool_name, arguments in calls
+            ]
+            responses = self._send_batch(messages)
+            return [self._tool_result(responses.get(message.id)) for message in messages]
+            
+        except Exception as e:
+            self.logger.error(f"Batch tool call error: {e}")
+            return [None] * len(calls)
+    
+    def _tool_result(self, response: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Extract a tool call's result or error from its response"""
+        if response and response.get('result'):
+            return response['result']
+        elif response and response.get('error'):
+            self.logger.error(f"Tool call error: {response['error']}")
+            return {"error": response['error']}
+        else:
+            self.logger.error("Invalid response from server")
+            return None
+    
     def read_resource(self, uri: str) -> Optional[Dict[str, Any]]:
         """Read a resource from the MCP server"""
         if not self.initialized:
@@ -206,7 +268,7 @@ class MCPClient:
 class CCMasterMCPClient:
     """Specialized MCP client for connecting to CCMaster from Claude Code sessions"""
     
-    def __init__(self, ccmaster_host: str = "localhost", ccmaster_port: int = 8080):
+    def __init__(self, ccmaster_host: str = "localhost", ccmaster_port: int = 8181):
         self.ccmaster_host = ccmaster_host
         self.ccmaster_port = ccmaster_port
         self.client = MCPClient("claude-session", "1.0.0")
@@ -228,6 +290,17 @@ class CCMasterMCPClient:
         """Get status of a specific session"""
         return self.client.call_tool("get_session_status", {"session_id": session_id})
     
+    def get_sessions_status(self, session_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get status of several sessions in a single request"""
+        results = self.client.call_tools_batch([
+            ("get_session_status", {"session_id": session_id}) for session_id in session_ids
+        ])
+        return dict(zip(session_ids, results))
+    
+    def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """Call several tools in one round trip"""
+        return self.client.call_tools_batch(calls)
+    
     def send_message_to_session(self, session_id: str, message: str, wait_for_response: bool = False) -> Optional[Dict[str, Any]]:
         """Send message to another session"""
         return self.client.call_tool("send_message_to_session", {
@@ -0,0 +1,79 @@
+"""
+JSON codec for the CCMaster MCP transports
+
+Everything the MCP server, stdio bridge and client put on the wire goes
+through dumps()/loads() here. The backend is picked once at import time,
+from the fastest one installed: orjson, then ujson, then the standard
+library. Set CCMASTER_JSON=json (or orjson/ujson) to force a backend.
+
+All backends produce compact, UTF-8 (non-ASCII-escaped) JSON, so output
+only differs between backends in float formatting. Anything a fast backend
+rejects (integers beyond 64 bits, non-string keys) is retried with the
+standard library.
+
+This module has no package-relative imports, because the stdio bridge loads
+it as a plain script.
+"""
+
+import json
+import os
+from typing import Any, Union
+
+# Raised by loads() for malformed input, whichever backend is in use
+DecodeError = ValueError
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def _load_backend(preferred: str = None):
+    """(name, dumps, loads) for the preferred backend or the fastest installed one"""
+    candidates = [preferred] if preferred else ['orjson', 'ujson']
+    for name in candidates:
+        if name == 'orjson':
+            try:
+                import orjson
+            except ImportError:
+                continue
+            fast_dumps = orjson.dumps
+            
+            def dumps(obj: Any) -> str:
+                try:
+                    return fast_dumps(obj).decode('utf-8')
+                except TypeError:
+                    return _stdlib_dumps(obj)
+            
+            return 'orjson', dumps, orjson.loads
+        if name == 'ujson':
+            try:
+                import ujson
+            except ImportError:
+                continue
+            fast_dumps = ujson.dumps
+            
+            def dumps(obj: Any) -> str:
+                try:
+                    return fast_dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+                except (TypeError, OverflowError):
+                    return _stdlib_dumps(obj)
+            
+            return 'ujson', dumps, ujson.loads
+    return 'json', _stdlib_dumps, json.loads
+
+
+BACKEND, _dumps, _loads = _load_backend(os.environ.get('CCMASTER_JSON', '').lower() or None)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to compact JSON text"""
+    return _dumps(obj)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or UTF-8 bytes; raises DecodeError (ValueError) on bad input"""
+    return _loads(data)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return _dumps(obj).encode('utf-8')
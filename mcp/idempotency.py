@@ -0,0 +1,113 @@
+"""
+Idempotency keys for mutating CCMaster MCP tool calls
+
+Mutating actions (sending jobs and mail, creating sessions, ...) accept an
+optional `idempotency_key`. The first call with a given key runs normally and
+its result is kept for a while. A retry with the same key and arguments gets
+that result back instead of enqueuing a second job, sending a second mail or
+opening a second Terminal window.
+
+A retry that arrives while the first call is still running waits for it. A
+key reused with different arguments is rejected. Results that report an
+error are not kept, so a failed call can be retried for real.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from .operations import check_cancelled
+
+DEFAULT_TTL = 600
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def fingerprint(arguments: Dict[str, Any]) -> str:
+    """Stable digest of a call's arguments"""
+    encoded = json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+class _Entry:
+    __slots__ = ('fingerprint', 'result', 'expires', 'done')
+    
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.result = None
+        self.expires = None  # Set once the call has finished
+        self.done = threading.Event()
+
+
+class IdempotencyCache:
+    """Bounded TTL cache of recent results, keyed by (tool, action, idempotency_key)"""
+    
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> _Entry, oldest first
+        self.lock = threading.Lock()
+    
+    def run(self, key: Hashable, arguments: Dict[str, Any], func: Callable[[], Any]) -> Any:
+        """Run func once per key; repeats get the first call's result"""
+        digest = fingerprint(arguments)
+        while True:
+            with self.lock:
+                self._expire()
+                entry = self.entries.get(key)
+                if entry is None:
+                    entry = self.entries[key] = _Entry(digest)
+                    owner = True
+                else:
+                    owner = False
+            
+            if owner:
+                return self._run_owner(key, entry, func)
+            
+            if entry.fingerprint != digest:
+                return {"error": "idempotency_key was already used with different arguments"}
+            
+            # The first call may still be running, e.g. the client timed out and retried
+            while not entry.done.wait(0.5):
+                check_cancelled()
+            if entry.expires is not None:
+                result = dict(entry.result) if isinstance(entry.result, dict) else entry.result
+                if isinstance(result, dict):
+                    result["idempotent_replay"] = True
+                return result
+            # The first call failed and was forgotten; run it for real
+    
+    def _run_owner(self, key: Hashable, entry: _Entry, func: Callable[[], Any]) -> Any:
+        try:
+            result = func()
+        except BaseException:
+            self._forget(key, entry)
+            raise
+        if isinstance(result, dict) and "error" in result:
+            self._forget(key, entry)
+            return result
+        with self.lock:
+            entry.result = result
+            entry.expires = time.monotonic() + self.ttl
+            entry.done.set()
+            self._expire()
+        return result
+    
+    def _forget(self, key: Hashable, entry: _Entry):
+        with self.lock:
+            if self.entries.get(key) is entry:
+                del self.entries[key]
+            entry.done.set()
+    
+    def _expire(self):
+        """Drop expired results, then the oldest finished ones past max_entries (lock held)"""
+        now = time.monotonic()
+        for key in [key for key, entry in self.entries.items()
+                    if entry.expires is not None and entry.expires <= now]:
+            del self.entries[key]
+        if len(self.entries) > self.max_entries:
+            finished = [key for key, entry in self.entries.items() if entry.expires is not None]
+            for key in finished[:len(self.entries) - self.max_entries]:
+                del self.entries[key]
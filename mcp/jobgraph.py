@@ -0,0 +1,219 @@
+"""
+Dependency graph and ready queues for CCMaster jobs
+
+A job is ready when it is pending and every job in its `dependencies` is
+done, whichever session that dependency is queued for. JobGraph keeps, for
+each queue, a heap of its ready jobs ordered by (priority, created_at), so
+picking the next job is O(log n) however long the backlog is.
+
+A queue is (assigned_to, pinned). assigned_to is a session id, or
+"pool:<name>" for jobs sent to a pool. Each session has two queues: jobs
+teammates may steal and pinned jobs that only it may run. pop_best() takes
+the best job across several queues, e.g. a session's own queues and those
+of its pools.
+
+The graph is built from the job store once, then follows the store's change
+feed: sync() applies only the jobs written since the last sync. When a job
+is done, its dependents lose one unmet dependency and move to their
+session's heap once they have none left. Writes from other threads and
+processes are picked up the same way as our own. sync() returns the
+sessions that gained ready jobs, so they can be offered work right away.
+
+A dependency on a cancelled or unknown job is never met, so its dependents
+stay pending until they are cancelled too. Dependencies that don't exist are
+rejected when the job is submitted (check_dependencies). That also rules out
+cycles: a job's dependencies are fixed when it is submitted under a fresh
+id, so they can only point at jobs that already existed, never at the job
+itself or at anything submitted after it. Jobs imported from the legacy
+job_queue/ directory skip the check; a cycle among them leaves its jobs
+pending, like a dependency on a cancelled job.
+"""
+
+import heapq
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .jobstore import JobStore, priority_rank
+
+# Statuses a job can still move on from
+OPEN_STATUSES = ('pending', 'doing')
+
+
+class _Node:
+    """An open (pending or doing) job"""
+    __slots__ = ('id', 'queue', 'status', 'key', 'dependencies', 'waiting', 'queued')
+    
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.queue = None  # (assigned_to, pinned)
+        self.status = None
+        self.key = None  # (priority rank, created_at)
+        self.dependencies = ()
+        self.waiting = set()  # Dependencies not done yet
+        self.queued = False  # Has a live entry in its queue's ready heap
+
+
+class JobGraph:
+    """Jobs' dependency graph with a ready heap per queue"""
+    
+    def __init__(self, store: JobStore):
+        self.store = store
+        self.lock = threading.RLock()
+        self.build()
+    
+    def build(self):
+        """(Re)load the whole graph from the store"""
+        with self.lock:
+            self.statuses = {}  # job id -> status, for every job
+            self.nodes = {}  # job id -> _Node, open jobs only
+            self.dependents = {}  # job id -> ids of open jobs waiting for it
+            self.ready = {}  # (assigned_to, pinned) -> heap of (priority rank, created_at, job id)
+            self.woken = set()  # Sessions and pools that gained ready jobs since the last sync()
+            self.seq = 0
+            self._apply_changes(self.store.changes(0))
+    
+    def sync(self) -> Set[str]:
+        """Apply jobs written since the last sync; returns the sessions (and pools) that gained ready jobs"""
+        with self.lock:
+            self._apply_changes(self.store.changes(self.seq))
+            woken, self.woken = self.woken, set()
+            return woken
+    
+    def catch_up(self):
+        """Apply jobs written since the last sync, leaving the woken sessions for the next sync()
+        
+        For readers of the graph; whoever wrote the jobs calls sync() and
+        dispatches the sessions it returns.
+        """
+        with self.lock:
+            self._apply_changes(self.store.changes(self.seq))
+    
+    def _apply_changes(self, changes: List[tuple]):
+        for seq, job in changes:
+            self._apply(job)
+            self.seq = max(self.seq, seq)
+    
+    def _apply(self, job: Dict[str, Any]):
+        """Bring one job's node in line with its stored state (lock held)"""
+        job_id = job['id']
+        status = job.get('status') or 'pending'
+        previous = self.statuses.get(job_id)
+        self.statuses[job_id] = status
+        
+        if status not in OPEN_STATUSES:
+            node = self.nodes.pop(job_id, None)
+            if node:
+                self._unlink(node)
+            if status == 'done' and previous != 'done':
+                self._release(job_id)
+            return
+        
+        node = self.nodes.get(job_id)
+        if node is None:
+            node = self.nodes[job_id] = _Node(job_id)
+        
+        dependencies = tuple(dict.fromkeys(job.get('dependencies') or []))
+        if dependencies != node.dependencies:
+            self._unlink(node)
+            node.dependencies = dependencies
+            node.waiting = {dep_id for dep_id in dependencies if self.statuses.get(dep_id) != 'done'}
+            for dep_id in node.waiting:
+                self.dependents.setdefault(dep_id, set()).add(job_id)
+        
+        queue = (job.get('assigned_to') or '', bool(job.get('pinned')))
+        key = (priority_rank(job.get('priority')), job.get('created_at') or '')
+        if queue != node.queue or key != node.key:
+            # Any heap entry under the old queue or ordering is now stale
+            node.queued = False
+        node.queue = queue
+        node.key = key
+        node.status = status
+        self._enqueue(node)
+    
+    def _unlink(self, node: _Node):
+        for dep_id in node.waiting:
+            waiting = self.dependents.get(dep_id)
+            if waiting:
+                waiting.discard(node.id)
+                if not waiting:
+                    del self.dependents[dep_id]
+        node.waiting = set()
+    
+    def _release(self, job_id: str):
+        """A job is done: its dependents have one fewer dependency to wait for"""
+        for dependent_id in self.dependents.pop(job_id, ()):
+            node = self.nodes.get(dependent_id)
+            if node:
+                node.waiting.discard(job_id)
+                self._enqueue(node)
+    
+    def _enqueue(self, node: _Node):
+        if node.status == 'pending' and not node.waiting and not node.queued:
+            heapq.heappush(self.ready.setdefault(node.queue, []), node.key + (node.id,))
+            node.queued = True
+            self.woken.add(node.queue[0])
+    
+    def _owner(self, queue: tuple, entry: tuple) -> Optional[_Node]:
+        """Node a heap entry belongs to, unless the entry was superseded"""
+        node = self.nodes.get(entry[-1])
+        if node and node.queued and node.queue == queue and node.key == entry[:-1]:
+            return node
+        return None
+    
+    def _peek(self, queue: tuple) -> Optional[tuple]:
+        """Top entry of a queue's heap that is still ready; stale entries are discarded on the way"""
+        heap = self.ready.get(queue)
+        while heap:
+            node = self._owner(queue, heap[0])
+            if node and node.status == 'pending' and not node.waiting:
+                return heap[0]
+            heapq.heappop(heap)
+            if node:
+                # Started or blocked again since it was queued; _enqueue() brings it back
+                node.queued = False
+        return None
+    
+    def pop_best(self, queues: Iterable[tuple]) -> Optional[str]:
+        """Take the highest priority ready job id off any of these (assigned_to, pinned) queues"""
+        with self.lock:
+            best = None
+            for queue in queues:
+                entry = self._peek(queue)
+                if entry and (best is None or entry < best[1]):
+                    best = (queue, entry)
+            if best is None:
+                return None
+            queue, entry = best
+            heapq.heappop(self.ready[queue])
+            self.nodes[entry[-1]].queued = False
+            return entry[-1]
+    
+    def pop_ready(self, session_id: str) -> Optional[str]:
+        """Take the session's next ready job id, pinned or not"""
+        return self.pop_best([(session_id, False), (session_id, True)])
+    
+    def requeue(self, job_id: str):
+        """Put back a job taken with pop_best/pop_ready that could not be started"""
+        with self.lock:
+            node = self.nodes.get(job_id)
+            if node:
+                self._enqueue(node)
+    
+    def ready_count(self, queue: tuple) -> int:
+        """Ready jobs in an (assigned_to, pinned) queue"""
+        with self.lock:
+            return sum(1 for node in (self._owner(queue, entry) for entry in self.ready.get(queue, ()))
+                       if node and node.status == 'pending' and not node.waiting)
+    
+    def check_dependencies(self, dependencies: Iterable[str]) -> Optional[str]:
+        """Why a new job with these dependencies can't be submitted, or None if it can
+        
+        Only existing jobs may be depended on, which also keeps the graph
+        acyclic (see the module docstring).
+        """
+        with self.lock:
+            self.catch_up()
+            missing = [dep_id for dep_id in dict.fromkeys(dependencies or []) if dep_id not in self.statuses]
+            if missing:
+                return f"Unknown dependencies: {', '.join(missing)}"
+            return None
@@ -0,0 +1,341 @@
+"""
+Job store for CCMaster job queues
+
+Jobs live in a single SQLite database, ~/.ccmaster/jobs.db, opened in WAL
+mode so the watch loop and MCP workers can read while a job is written.
+Each row keeps the job's JSON document next to the columns queues are
+queried by:
+
+    jobs(id PRIMARY KEY, assigned_to, status, priority, created_at, seq, data)
+    INDEX jobs_queue ON jobs(assigned_to, status, priority, created_at)
+    INDEX jobs_order ON jobs(assigned_to, priority, created_at, id)
+    INDEX jobs_seq ON jobs(seq)
+
+so "pending jobs for this session, p0 first, oldest first" is an index
+range scan however many done and cancelled jobs have piled up, and a page
+of a session's jobs (page()) resumes from the (priority, created_at, id)
+key of the previous page instead of skipping over it. State changes
+(start, cancel, complete) run as a single IMMEDIATE transaction that checks
+the current status before writing it.
+
+Jobs sent to a pool are assigned to "pool:<name>" until a member starts
+one. Pool membership is kept in pool_members(pool, session_id).
+
+Every write stamps the row with the next `seq`, so changes(since) returns
+each job written after a given point. The dependency graph (jobgraph.py)
+uses this to keep up with writes from any thread or process.
+
+Earlier versions kept one JSON file per job under
+~/.ccmaster/job_queue/<session>/. The first time the store opens it imports
+that directory, then renames it to job_queue.migrated.
+
+This module has no package-relative imports, so scripts can load it with
+only the mcp directory on sys.path.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SCHEMA_VERSION = 3
+
+# Queue order: p0 first; unknown priorities sort with p1
+PRIORITY_ORDER = {"p0": 0, "p1": 1, "p2": 2}
+
+JOB_STATUSES = ('pending', 'doing', 'done', 'cancelled')
+
+# assigned_to of a job waiting in a pool
+POOL_PREFIX = 'pool:'
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    assigned_to TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (assigned_to, status, priority, created_at);
+CREATE INDEX IF NOT EXISTS jobs_order ON jobs (assigned_to, priority, created_at, id);
+CREATE TABLE IF NOT EXISTS pool_members (
+    pool TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    joined_at TEXT NOT NULL,
+    PRIMARY KEY (pool, session_id)
+);
+CREATE INDEX IF NOT EXISTS pool_members_session ON pool_members (session_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def default_store_path() -> str:
+    return str(Path.home() / '.ccmaster' / 'jobs.db')
+
+
+def default_legacy_dir() -> str:
+    return str(Path.home() / '.ccmaster' / 'job_queue')
+
+
+def priority_rank(priority: Any) -> int:
+    return PRIORITY_ORDER.get(priority, 1)
+
+
+def order_key(job: Dict[str, Any]) -> Tuple[int, str, str]:
+    """A job's position in queue order, as used by JobStore.page(after=...)"""
+    return (priority_rank(job.get('priority')), job.get('created_at') or '', job['id'])
+
+
+def pool_queue(pool: str) -> str:
+    """assigned_to value of jobs waiting in a pool"""
+    return POOL_PREFIX + pool
+
+
+class JobStore:
+    """Jobs of every session, indexed by queue and by id"""
+    
+    def __init__(self, path: str = None, legacy_dir: str = None):
+        self.path = str(path or default_store_path())
+        self.legacy_dir = Path(legacy_dir or default_legacy_dir())
+        self.local = threading.local()  # One connection per thread
+        with self.transaction() as conn:
+            for statement in _SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if 'seq' not in columns:
+                # Version 1 databases predate the change feed
+                conn.execute("ALTER TABLE jobs ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+                conn.execute("UPDATE jobs SET seq = rowid")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_seq ON jobs (seq)")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                         (str(SCHEMA_VERSION),))
+        self.migrated = self.migrate_legacy_dir()
+    
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # Autocommit; transactions are explicit
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+    
+    @contextmanager
+    def transaction(self):
+        """Write transaction; the database lock is taken up front so read-check-write can't race"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _row(self, job: Dict[str, Any]) -> Tuple:
+        return (
+            job['id'],
+            job.get('assigned_to') or '',
+            job.get('status') or 'pending',
+            priority_rank(job.get('priority')),
+            job.get('created_at') or '',
+            json.dumps(job)
+        )
+    
+    def _write(self, conn: sqlite3.Connection, job: Dict[str, Any], verb: str = "INSERT OR REPLACE"):
+        conn.execute(f"{verb} INTO jobs (id, assigned_to, status, priority, created_at, data, seq) "
+                     "VALUES (?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM jobs))", self._row(job))
+    
+    def add(self, job: Dict[str, Any]):
+        """Store a new job; raises sqlite3.IntegrityError if the id is taken"""
+        with self.transaction() as conn:
+            self._write(conn, job, verb="INSERT")
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.connection().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def get_many(self, job_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Jobs by id; ids that don't exist are left out"""
+        job_ids = list(dict.fromkeys(job_ids))
+        jobs = {}
+        conn = self.connection()
+        for start in range(0, len(job_ids), _BATCH):
+            batch = job_ids[start:start + _BATCH]
+            placeholders = ",".join("?" * len(batch))
+            for (data,) in conn.execute(f"SELECT data FROM jobs WHERE id IN ({placeholders})", batch):
+                job = json.loads(data)
+                jobs[job['id']] = job
+        return jobs
+    
+    def locate(self, job_ids: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """{"assigned_to", "status"} by job id, read from the primary key index without decoding jobs"""
+        job_ids = list(dict.fromkeys(job_ids))
+        located = {}
+        conn = self.connection()
+        for start in range(0, len(job_ids), _BATCH):
+            batch = job_ids[start:start + _BATCH]
+            placeholders = ",".join("?" * len(batch))
+            query = f"SELECT id, assigned_to, status FROM jobs WHERE id IN ({placeholders})"
+            for job_id, assigned_to, status in conn.execute(query, batch):
+                located[job_id] = {"assigned_to": assigned_to, "status": status}
+        return located
+    
+    def _where(self, assigned_to: str = None, statuses: Iterable[str] = None,
+               priorities: Iterable[str] = None) -> Tuple[List[str], List[Any]]:
+        """WHERE clauses and parameters selecting a queue's jobs"""
+        clauses, params = [], []
+        if assigned_to is not None:
+            clauses.append("assigned_to = ?")
+            params.append(assigned_to)
+        if statuses:
+            statuses = list(statuses)
+            clauses.append(f"status IN ({','.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if priorities:
+            # The rank narrows the index range; the stored string keeps unknown priorities exact
+            priorities = list(priorities)
+            ranks = sorted({priority_rank(priority) for priority in priorities})
+            clauses.append(f"priority IN ({','.join('?' * len(ranks))})")
+            params.extend(ranks)
+            clauses.append(f"json_extract(data, '$.priority') IN ({','.join('?' * len(priorities))})")
+            params.extend(priorities)
+        return clauses, params
+    
+    def list(self, assigned_to: str = None, statuses: Iterable[str] = None,
+             priorities: Iterable[str] = None, limit: int = None) -> List[Dict[str, Any]]:
+        """Jobs in queue order (priority, then creation time)"""
+        return self.page(assigned_to, statuses, priorities, limit=limit)
+    
+    def page(self, assigned_to: str = None, statuses: Iterable[str] = None, priorities: Iterable[str] = None,
+             after: Tuple = None, limit: int = None) -> List[Dict[str, Any]]:
+        """Jobs in queue order, starting after the job whose order_key() is `after`"""
+        clauses, params = self._where(assigned_to, statuses, priorities)
+        if after is not None:
+            clauses.append("(priority, created_at, id) > (?, ?, ?)")
+            params.extend(after)
+        query = "SELECT data FROM jobs"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY priority, created_at, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        return [json.loads(data) for (data,) in self.connection().execute(query, params)]
+    
+    def changes(self, since: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+        """(seq, job) for every job written after seq `since`, oldest write first"""
+        rows = self.connection().execute("SELECT seq, data FROM jobs WHERE seq > ? ORDER BY seq", (since,))
+        return [(seq, json.loads(data)) for seq, data in rows]
+    
+    def counts(self, assigned_to: str = None, statuses: Iterable[str] = None,
+               priorities: Iterable[str] = None) -> Dict[str, int]:
+        """Number of jobs by status"""
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        clauses, params = self._where(assigned_to, statuses, priorities)
+        query = "SELECT status, COUNT(*) FROM jobs"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        for status, count in self.connection().execute(query + " GROUP BY status", params):
+            counts[status] = count
+        return counts
+    
+    def update(self, job_id: str, changes: Dict[str, Any], allowed: Iterable[str] = None,
+               assigned_to: str = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Apply changes to a job in one transaction
+        
+        Returns (before, after). before is None if the job doesn't exist (or
+        isn't assigned_to the given session); after is None if its status
+        was not one of allowed, in which case nothing was written.
+        """
+        with self.transaction() as conn:
+            row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None, None
+            before = json.loads(row[0])
+            if assigned_to is not None and before.get('assigned_to') != assigned_to:
+                return None, None
+            if allowed is not None and before.get('status') not in allowed:
+                return before, None
+            after = dict(before, **changes)
+            self._write(conn, after)
+        return before, after
+    
+    def join_pool(self, pool: str, session_id: str) -> bool:
+        """Add a session to a pool; False if it was already a member"""
+        with self.transaction() as conn:
+            cursor = conn.execute("INSERT OR IGNORE INTO pool_members (pool, session_id, joined_at) VALUES (?, ?, ?)",
+                                  (pool, session_id, datetime.now().isoformat()))
+            return cursor.rowcount > 0
+    
+    def leave_pool(self, pool: str, session_id: str) -> bool:
+        """Remove a session from a pool; False if it wasn't a member"""
+        with self.transaction() as conn:
+            cursor = conn.execute("DELETE FROM pool_members WHERE pool = ? AND session_id = ?", (pool, session_id))
+            return cursor.rowcount > 0
+    
+    def pools_of(self, session_id: str) -> List[str]:
+        rows = self.connection().execute("SELECT pool FROM pool_members WHERE session_id = ? ORDER BY pool",
+                                         (session_id,))
+        return [pool for (pool,) in rows]
+    
+    def pool_members(self, pool: str) -> List[str]:
+        """Member session ids of a pool, oldest member first"""
+        rows = self.connection().execute("SELECT session_id FROM pool_members WHERE pool = ? ORDER BY joined_at",
+                                         (pool,))
+        return [session_id for (session_id,) in rows]
+    
+    def pools(self) -> Dict[str, List[str]]:
+        """Member session ids of every pool"""
+        members = {}
+        rows = self.connection().execute("SELECT pool, session_id FROM pool_members ORDER BY pool, joined_at")
+        for pool, session_id in rows:
+            members.setdefault(pool, []).append(session_id)
+        return members
+    
+    def migrate_legacy_dir(self) -> int:
+        """Import job_queue/<session>/*.json once, then move the directory aside"""
+        if not self.legacy_dir.is_dir():
+            return 0
+        jobs = []
+        for job_file in self.legacy_dir.glob("*/*.json"):
+            try:
+                with open(job_file, 'r') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(job, dict):
+                job.setdefault('id', job_file.stem)
+                job.setdefault('assigned_to', job_file.parent.name)
+                jobs.append(job)
+        
+        with self.transaction() as conn:
+            for job in jobs:
+                self._write(conn, job, verb="INSERT OR IGNORE")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_at', ?)",
+                         (str(time.time()),))
+        
+        target = self.legacy_dir.with_name(self.legacy_dir.name + '.migrated')
+        if target.exists():
+            target = self.legacy_dir.with_name(f"{self.legacy_dir.name}.migrated.{int(time.time())}")
+        try:
+            os.replace(self.legacy_dir, target)
+        except OSError:
+            pass
+        return len(jobs)
@@ -0,0 +1,283 @@
+"""
+Metrics for the CCMaster MCP server
+
+Counts tool calls per tool and action (`session`/`create`, `team`/`status`,
+...) with their outcome, and keeps a latency histogram for each. Alongside
+those it tracks requests in flight, calls queued and running per worker
+pool, and CCMaster's own thread count and resident memory.
+
+Latency is the tool's own run time, measured on the worker. A call whose
+request timed out keeps running and is counted when it finishes; the
+timeout itself is counted separately.
+
+The same snapshot is served as JSON (the `ccmaster://metrics` resource) and
+in the Prometheus text format (`GET /metrics`).
+"""
+
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .operations import OperationCancelled
+
+# Latency histogram bucket bounds in seconds; slow-pool calls can run for minutes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Outcome of a tool call
+STATUSES = ('ok', 'error', 'cancelled')
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _bound(bound: float) -> str:
+    return "+Inf" if bound == float('inf') else repr(float(bound))
+
+
+def resident_memory() -> Optional[int]:
+    """Current resident set size in bytes (peak RSS where the current value is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (OSError, ValueError):
+        return None
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds"""
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(buckets) + (float('inf'),)
+        self.counts = [0] * len(self.bounds)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+    
+    def cumulative(self) -> List[tuple]:
+        """(bound, calls at or below it) pairs, as Prometheus buckets expect"""
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return None
+        target = q * self.count
+        for bound, total in self.cumulative():
+            if total >= target:
+                return bound if bound != float('inf') else self.bounds[-2]
+        return None
+
+
+class ToolStats:
+    """Counters and latency for one tool/action pair"""
+    
+    def __init__(self):
+        self.statuses = dict.fromkeys(STATUSES, 0)
+        self.latency = Histogram()
+        self.timeouts = 0  # Requests that gave up waiting for this call
+        self.last_called = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        calls = sum(self.statuses.values())
+        latency = self.latency
+        return {
+            "calls": calls,
+            "errors": calls - self.statuses['ok'],
+            "by_status": dict(self.statuses),
+            "timeouts": self.timeouts,
+            "latency": {
+                "count": latency.count,
+                "avg": round(latency.sum / latency.count, 6) if latency.count else None,
+                "p50": latency.quantile(0.5),
+                "p95": latency.quantile(0.95),
+                "p99": latency.quantile(0.99)
+            },
+            "last_called": self.last_called
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe counters for the MCP server"""
+    
+    def __init__(self):
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.tools = {}  # (tool, action) -> ToolStats
+        self.in_flight = 0  # Requests being handled, over any transport
+        self.requests = 0
+        self.active = {}  # pool -> calls running
+    
+    def _stats(self, tool: str, action: Optional[str]) -> ToolStats:
+        """Stats for a tool/action pair (lock held)"""
+        key = (tool, action or '')
+        stats = self.tools.get(key)
+        if stats is None:
+            stats = self.tools[key] = ToolStats()
+        return stats
+    
+    def request_started(self):
+        with self.lock:
+            self.in_flight += 1
+            self.requests += 1
+    
+    def request_finished(self):
+        with self.lock:
+            self.in_flight -= 1
+    
+    def record(self, tool: str, action: Optional[str], status: str, duration: float):
+        """Count one finished tool call"""
+        with self.lock:
+            stats = self._stats(tool, action)
+            stats.statuses[status] += 1
+            stats.last_called = time.time()
+            stats.latency.observe(duration)
+    
+    def record_timeout(self, tool: str, action: Optional[str]):
+        """Count a request that stopped waiting for its tool call"""
+        with self.lock:
+            self._stats(tool, action).timeouts += 1
+    
+    def instrument(self, pool: str, tool: str, action: Optional[str], func: Callable) -> Callable:
+        """Wrap a tool function to record its outcome and run time on the worker"""
+        
+        def run(**arguments):
+            with self.lock:
+                self.active[pool] = self.active.get(pool, 0) + 1
+            started = time.monotonic()
+            status = 'error'
+            try:
+                result = func(**arguments)
+                # Tools report failures as {"error": ...} rather than raising
+                if not (isinstance(result, dict) and "error" in result):
+                    status = 'ok'
+                return result
+            except OperationCancelled:
+                status = 'cancelled'
+                raise
+            finally:
+                with self.lock:
+                    self.active[pool] -= 1
+                self.record(tool, action, status, time.monotonic() - started)
+        
+        return run
+    
+    def snapshot(self, pools: Dict[str, Dict[str, int]] = None, operations: int = 0) -> Dict[str, Any]:
+        """Everything as JSON; pools maps pool names to {"workers": n, "queued": n}"""
+        with self.lock:
+            tools = {}
+            for (tool, action), stats in sorted(self.tools.items()):
+                tools.setdefault(tool, {})[action or tool] = stats.to_dict()
+            active = dict(self.active)
+            in_flight = self.in_flight
+            requests = self.requests
+        
+        return {
+            "uptime": round(time.time() - self.started_at, 3),
+            "requests": {
+                "total": requests,
+                "in_flight": in_flight
+            },
+            "pools": {
+                name: dict(pool, active=active.get(name, 0))
+                for name, pool in (pools or {}).items()
+            },
+            "operations_running": operations,
+            "process": {
+                "threads": threading.active_count(),
+                "rss_bytes": resident_memory()
+            },
+            "tools": tools
+        }
+    
+    def render_prometheus(self, pools: Dict[str, Dict[str, int]] = None, operations: int = 0) -> str:
+        """Everything in the Prometheus text exposition format"""
+        pools = pools or {}
+        with self.lock:
+            tools = [
+                (tool, action, dict(stats.statuses), stats.latency.cumulative(), stats.latency.sum, stats.latency.count)
+                for (tool, action), stats in sorted(self.tools.items())
+            ]
+            timeouts = [
+                (tool, action, stats.timeouts)
+                for (tool, action), stats in sorted(self.tools.items()) if stats.timeouts
+            ]
+            active = dict(self.active)
+            in_flight = self.in_flight
+            requests = self.requests
+        
+        lines = []
+        
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_labels(**labels) if labels else ''} {value}")
+        
+        metric("ccmaster_mcp_tool_calls_total", "counter", "MCP tool calls by tool, action and outcome", [
+            ("", {"tool": tool, "action": action, "status": status}, count)
+            for tool, action, statuses, _, _, _ in tools
+            for status, count in statuses.items() if count
+        ])
+        
+        metric("ccmaster_mcp_tool_timeouts_total", "counter", "MCP requests that timed out waiting for a tool call", [
+            ("", {"tool": tool, "action": action}, count) for tool, action, count in timeouts
+        ])
+        
+        latency = []
+        for tool, action, _, buckets, total, count in tools:
+            for bound, cumulative in buckets:
+                latency.append(("_bucket", {"tool": tool, "action": action, "le": _bound(bound)}, cumulative))
+            latency.append(("_sum", {"tool": tool, "action": action}, round(total, 6)))
+            latency.append(("_count", {"tool": tool, "action": action}, count))
+        metric("ccmaster_mcp_tool_call_duration_seconds", "histogram", "MCP tool call run time", latency)
+        
+        metric("ccmaster_mcp_requests_total", "counter", "JSON-RPC messages handled", [("", None, requests)])
+        metric("ccmaster_mcp_requests_in_flight", "gauge", "JSON-RPC messages being handled", [("", None, in_flight)])
+        metric("ccmaster_mcp_pool_workers", "gauge", "Worker pool size", [
+            ("", {"pool": name}, pool["workers"]) for name, pool in pools.items()
+        ])
+        metric("ccmaster_mcp_pool_queue_depth", "gauge", "Calls waiting for a worker", [
+            ("", {"pool": name}, pool["queued"]) for name, pool in pools.items()
+        ])
+        metric("ccmaster_mcp_pool_active", "gauge", "Tool calls running", [
+            ("", {"pool": name}, active.get(name, 0)) for name in pools
+        ])
+        metric("ccmaster_mcp_operations_running", "gauge", "Asynchronous operations still running",
+               [("", None, operations)])
+        metric("ccmaster_process_threads", "gauge", "Threads in the CCMaster process",
+               [("", None, threading.active_count())])
+        rss = resident_memory()
+        if rss is not None:
+            metric("ccmaster_process_resident_memory_bytes", "gauge", "Resident memory of the CCMaster process",
+                   [("", None, rss)])
+        metric("ccmaster_mcp_uptime_seconds", "gauge", "Seconds since the MCP server was created",
+               [("", None, round(time.time() - self.started_at, 3))])
+        
+        return "\n".join(lines) + "\n"
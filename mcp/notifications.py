@@ -0,0 +1,98 @@
+"""
+Server-to-client notifications for the CCMaster MCP server
+
+HTTP requests only flow client -> server, so notifications (progress,
+resource updates, list changes) are queued per client in a NotificationHub
+and delivered over a Server-Sent Events stream (GET /events?client=<id>),
+which the stdio bridge relays to Claude Code as JSON-RPC notifications.
+"""
+
+import queue
+import threading
+from typing import Any, Dict, Optional
+
+# Per-client backlog; the oldest notification is dropped when a client lags
+MAX_PENDING = 1000
+
+
+class NotificationHub:
+    """Fan-out of JSON-RPC notifications to subscribed clients"""
+    
+    def __init__(self, max_pending: int = MAX_PENDING):
+        self.max_pending = max_pending
+        self.subscribers = {}  # client_id -> list of queues (one per open stream)
+        self.resource_subscriptions = {}  # uri -> set of client_ids (resources/subscribe)
+        self.lock = threading.Lock()
+    
+    def subscribe(self, client_id: str) -> queue.Queue:
+        """Open a notification stream for a client"""
+        stream = queue.Queue(maxsize=self.max_pending)
+        with self.lock:
+            self.subscribers.setdefault(client_id, []).append(stream)
+        return stream
+    
+    def unsubscribe(self, client_id: str, stream: queue.Queue):
+        with self.lock:
+            streams = self.subscribers.get(client_id, [])
+            if stream in streams:
+                streams.remove(stream)
+            if not streams:
+                self.subscribers.pop(client_id, None)
+    
+    def has_subscribers(self) -> bool:
+        with self.lock:
+            return bool(self.subscribers)
+    
+    def subscribe_resource(self, client_id: str, uri: str):
+        """Send the client notifications/resources/updated whenever uri changes"""
+        with self.lock:
+            self.resource_subscriptions.setdefault(uri, set()).add(client_id)
+    
+    def unsubscribe_resource(self, client_id: str, uri: str):
+        with self.lock:
+            clients = self.resource_subscriptions.get(uri)
+            if clients:
+                clients.discard(client_id)
+                if not clients:
+                    del self.resource_subscriptions[uri]
+    
+    def drop_client(self, client_id: str):
+        """Forget a client's resource subscriptions (its connection is gone for good)"""
+        with self.lock:
+            for uri in list(self.resource_subscriptions):
+                self.resource_subscriptions[uri].discard(client_id)
+                if not self.resource_subscriptions[uri]:
+                    del self.resource_subscriptions[uri]
+    
+    def resource_updated(self, uri: str):
+        """Tell subscribers of uri that it changed; they re-read it with resources/read"""
+        with self.lock:
+            clients = list(self.resource_subscriptions.get(uri, ()))
+        for client_id in clients:
+            self.publish("notifications/resources/updated", {"uri": uri}, client_id=client_id)
+    
+    def publish(self, method: str, params: Optional[Dict[str, Any]] = None, client_id: Optional[str] = None):
+        """Send a notification to one client, or to every client when client_id is None"""
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        
+        with self.lock:
+            if client_id is None:
+                streams = [s for group in self.subscribers.values() for s in group]
+            else:
+                streams = list(self.subscribers.get(client_id, []))
+        
+        for stream in streams:
+            self._offer(stream, message)
+    
+    def _offer(self, stream: queue.Queue, message: Dict[str, Any]):
+        while True:
+            try:
+                stream.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    stream.get_nowait()
+                except queue.Empty:
+                    pass
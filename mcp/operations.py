@@ -0,0 +1,214 @@
+"""
+Long-running operations for the CCMaster MCP server
+
+A tool call made with "async": true returns an operation handle right away
+instead of holding the request open. The call runs on the server's worker
+pools; callers poll or wait on it with the `operation` tool and can cancel
+it there or with a `notifications/cancelled` for the original request.
+
+Code running inside an operation reports progress and honours cancellation
+through the thread-local helpers below; outside an operation they are
+no-ops, so tools can call them unconditionally.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class OperationCancelled(Exception):
+    """Raised inside an operation once it has been cancelled"""
+
+
+_context = threading.local()
+
+
+def current_operation() -> Optional['Operation']:
+    """Operation running on this thread, if any"""
+    return getattr(_context, 'operation', None)
+
+
+def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None):
+    """Report progress for the current operation"""
+    operation = current_operation()
+    if operation:
+        operation.update_progress(progress, total, message)
+
+
+def check_cancelled():
+    """Raise OperationCancelled if the current operation was cancelled"""
+    operation = current_operation()
+    if operation and operation.cancel_event.is_set():
+        raise OperationCancelled(operation.id)
+
+
+def cancellable_sleep(seconds: float):
+    """time.sleep() that wakes up early and raises when the operation is cancelled"""
+    operation = current_operation()
+    if not operation:
+        time.sleep(seconds)
+        return
+    if operation.cancel_event.wait(seconds):
+        raise OperationCancelled(operation.id)
+
+
+class Operation:
+    """State of one asynchronous tool call"""
+    
+    def __init__(self, tool: str, arguments: Dict[str, Any], client_id: str = None,
+                 request_id: Any = None, progress_token: Any = None):
+        self.id = f"op_{uuid.uuid4().hex[:12]}"
+        self.tool = tool
+        self.action = arguments.get('action')
+        self.client_id = client_id
+        self.request_id = request_id
+        self.progress_token = progress_token
+        self.status = 'running'
+        self.created_at = time.time()
+        self.finished_at = None
+        self.progress = 0
+        self.total = None
+        self.message = None
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self.on_progress = None  # Callback(operation), set by the manager
+    
+    def update_progress(self, progress: float, total: Optional[float] = None, message: Optional[str] = None):
+        self.progress = progress
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        if self.on_progress:
+            self.on_progress(self)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view of the operation"""
+        data = {
+            "operation_id": self.id,
+            "tool": self.tool,
+            "action": self.action,
+            "status": self.status,
+            "progress": self.progress,
+            "total": self.total,
+            "message": self.message,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+        if self.status == 'completed':
+            data["result"] = self.result
+        elif self.error:
+            data["error"] = self.error
+        return data
+
+
+class OperationManager:
+    """Runs tool calls as operations and keeps their handles"""
+    
+    def __init__(self, notify: Callable[[Operation, str, Dict[str, Any]], None] = None, max_finished: int = 200):
+        self.notify = notify  # Callback(operation, method, params) for progress notifications
+        self.max_finished = max_finished
+        self.operations = OrderedDict()  # operation_id -> Operation
+        self.by_request = {}  # (client_id, request_id) -> operation_id
+        self.lock = threading.Lock()
+    
+    def start(self, pool, func: Callable, tool: str, arguments: Dict[str, Any], client_id: str = None,
+              request_id: Any = None, progress_token: Any = None) -> Operation:
+        """Submit a tool call to a pool as a new operation"""
+        operation = Operation(tool, arguments, client_id, request_id, progress_token)
+        operation.on_progress = self._send_progress
+        
+        with self.lock:
+            self.operations[operation.id] = operation
+            if request_id is not None:
+                self.by_request[(client_id, request_id)] = operation.id
+            self._prune()
+        
+        pool.submit(self._run, operation, func, arguments)
+        return operation
+    
+    def _run(self, operation: Operation, func: Callable, arguments: Dict[str, Any]):
+        _context.operation = operation
+        try:
+            if operation.cancel_event.is_set():
+                raise OperationCancelled(operation.id)
+            result = func(**arguments)
+            if operation.cancel_event.is_set():
+                operation.status = 'cancelled'
+            else:
+                operation.result = result
+                operation.status = 'completed'
+        except OperationCancelled:
+            operation.status = 'cancelled'
+        except Exception as e:
+            operation.error = str(e)
+            operation.status = 'failed'
+        finally:
+            _context.operation = None
+            operation.finished_at = time.time()
+            with self.lock:
+                self.by_request.pop((operation.client_id, operation.request_id), None)
+            operation.done_event.set()
+            self._send_progress(operation)
+    
+    def _send_progress(self, operation: Operation):
+        if not self.notify or operation.progress_token is None:
+            return
+        params = {
+            "progressToken": operation.progress_token,
+            "progress": operation.progress
+        }
+        if operation.total is not None:
+            params["total"] = operation.total
+        message = operation.message if operation.status == 'running' else f"Operation {operation.status}"
+        if message:
+            params["message"] = message
+        self.notify(operation, "notifications/progress", params)
+    
+    def _prune(self):
+        """Drop the oldest finished operations past max_finished (lock held)"""
+        finished = [op_id for op_id, op in self.operations.items() if op.done_event.is_set()]
+        for op_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self.operations[op_id]
+    
+    def get(self, operation_id: str) -> Optional[Operation]:
+        with self.lock:
+            return self.operations.get(operation_id)
+    
+    def wait(self, operation_id: str, timeout: float) -> Optional[Operation]:
+        """Block until the operation finishes or timeout passes"""
+        operation = self.get(operation_id)
+        if operation:
+            operation.done_event.wait(timeout)
+        return operation
+    
+    def cancel(self, operation_id: str) -> Optional[Operation]:
+        """Request cancellation; the operation stops at its next cancellation point"""
+        operation = self.get(operation_id)
+        if operation and not operation.done_event.is_set():
+            operation.cancel_event.set()
+        return operation
+    
+    def cancel_request(self, client_id: str, request_id: Any) -> Optional[Operation]:
+        """Cancel the operation started by a given client request"""
+        with self.lock:
+            operation_id = self.by_request.get((client_id, request_id))
+        return self.cancel(operation_id) if operation_id else None
+    
+    def list_operations(self) -> list:
+        with self.lock:
+            return [op.to_dict() for op in self.operations.values()]
+    
+    def running_count(self) -> int:
+        with self.lock:
+            return sum(1 for op in self.operations.values() if not op.done_event.is_set())
+    
+    def cancel_all(self):
+        with self.lock:
+            operations = list(self.operations.values())
+        for operation in operations:
+            operation.cancel_event.set()
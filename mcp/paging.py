@@ -0,0 +1,76 @@
+"""
+Pagination and field projection for list-style MCP tool results
+
+List actions (list_sessions, job list, mail listings, team members) return
+at most one page of records plus an opaque `next_cursor` to fetch the next
+page. A cursor records the offset and the key of the last record returned,
+so a page boundary stays put when newer records are inserted ahead of it.
+`fields` trims each record to the named keys.
+
+paginate() pages a list that is already in memory. Sources that can seek,
+like the job store, page themselves: they fetch `limit` records after the
+cursor's anchor and issue the next cursor with encode_cursor().
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(offset: int, anchor: Any) -> str:
+    """Opaque cursor pointing after the record at offset - 1 whose key is anchor"""
+    raw = json.dumps({"o": offset, "a": anchor}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        int(data["o"])
+        return data
+    except (ValueError, TypeError, KeyError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def page_limit(limit: Optional[int], default_limit: int = DEFAULT_PAGE_SIZE) -> int:
+    """Requested page size, clamped to 1..MAX_PAGE_SIZE"""
+    limit = default_limit if limit is None else limit
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def project(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested fields of a record"""
+    if not fields:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def paginate(records: List[Dict[str, Any]], key: str, limit: Optional[int] = None,
+             cursor: Optional[str] = None, fields: Optional[List[str]] = None,
+             default_limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of records (already filtered and sorted) and the cursor for the next page
+    
+    Raises ValueError for a malformed cursor.
+    """
+    limit = page_limit(limit, default_limit)
+    
+    start = 0
+    if cursor:
+        position = decode_cursor(cursor)
+        start = max(int(position["o"]), 0)
+        anchor = position.get("a")
+        if anchor is not None and not (0 < start <= len(records) and records[start - 1].get(key) == anchor):
+            # Records moved since the cursor was issued; resume after the anchor if it still exists
+            for index, record in enumerate(records):
+                if record.get(key) == anchor:
+                    start = index + 1
+                    break
+    
+    page = records[start:start + limit]
+    end = start + len(page)
+    next_cursor = encode_cursor(end, records[end - 1].get(key)) if end < len(records) else None
+    return [project(record, fields) for record in page], next_cursor
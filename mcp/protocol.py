@@ -4,20 +4,40 @@ MCP Protocol Implementation
 Handles JSON-RPC 2.0 protocol for Model Context Protocol communication.
 """
 
-import json
-import uuid
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import itertools
+from typing import Dict, Any, Optional, List, Union
+
+from . import codec
+
+# Request ids only need to be unique per connection; a counter is far cheaper than uuid4()
+_message_ids = itertools.count(1)
+
+# Static envelope fragments, spliced around the encoded id and payload
+_REQUEST_HEAD = '{"jsonrpc":"2.0","method":'
+_NOTIFICATION_HEAD = _REQUEST_HEAD
+_RESPONSE_HEAD = '{"jsonrpc":"2.0","id":'
+
+
+def next_message_id() -> int:
+    return next(_message_ids)
+
+
+def encode_response(message_id: Any, result_json: str) -> str:
+    """Response envelope around an already-encoded result"""
+    return f'{_RESPONSE_HEAD}{codec.dumps(message_id)},"result":{result_json}}}'
 
 
 class MCPMessage:
     """Base class for MCP messages"""
     
-    def __init__(self, method: str, params: Optional[Dict[str, Any]] = None, id: Optional[str] = None):
-        self.jsonrpc = "2.0"
+    __slots__ = ('method', 'params', 'id')
+    
+    jsonrpc = "2.0"
+    
+    def __init__(self, method: str, params: Optional[Dict[str, Any]] = None, id: Optional[Any] = None):
         self.method = method
         self.params = params or {}
-        self.id = id or str(uuid.uuid4())
+        self.id = id if id is not None else next_message_id()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary"""
@@ -31,14 +51,41 @@ class MCPMessage:
     
     def to_json(self) -> str:
         """Convert message to JSON string"""
-        return json.dumps(self.to_dict())
+        return (f'{_REQUEST_HEAD}{codec.dumps(self.method)},"params":{codec.dumps(self.params)},'
+                f'"id":{codec.dumps(self.id)}}}')
+
+
+class MCPNotification(MCPMessage):
+    """MCP notification: a message without an id, which gets no response"""
+    
+    __slots__ = ()
+    
+    def __init__(self, method: str, params: Optional[Dict[str, Any]] = None):
+        self.method = method
+        self.params = params or {}
+        self.id = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert notification to dictionary"""
+        return {
+            "jsonrpc": self.jsonrpc,
+            "method": self.method,
+            "params": self.params
+        }
+    
+    def to_json(self) -> str:
+        """Convert notification to JSON string"""
+        return f'{_NOTIFICATION_HEAD}{codec.dumps(self.method)},"params":{codec.dumps(self.params)}}}'
 
 
 class MCPResponse:
     """MCP response message"""
     
-    def __init__(self, id: str, result: Any = None, error: Optional[Dict[str, Any]] = None):
-        self.jsonrpc = "2.0"
+    __slots__ = ('id', 'result', 'error')
+    
+    jsonrpc = "2.0"
+    
+    def __init__(self, id: Any, result: Any = None, error: Optional[Dict[str, Any]] = None):
         self.id = id
         self.result = result
         self.error = error
@@ -57,7 +104,9 @@ class MCPResponse:
     
     def to_json(self) -> str:
         """Convert response to JSON string"""
-        return json.dumps(self.to_dict())
+        if self.error:
+            return f'{_RESPONSE_HEAD}{codec.dumps(self.id)},"error":{codec.dumps(self.error)}}}'
+        return encode_response(self.id, codec.dumps(self.result))
 
 
 class MCPProtocol:
@@ -118,14 +167,15 @@ class MCPProtocol:
         }
         return MCPResponse(message_id, error=error)
     
-    def parse_message(self, data: str) -> Dict[str, Any]:
-        """Parse JSON-RPC message"""
+    def parse_message(self, data: Union[str, bytes]) -> Any:
+        """Parse a JSON-RPC message or batch (text or UTF-8 bytes)"""
         try:
-            return json.loads(data)
-        except json.JSONDecodeError as e:
+            return codec.loads(data)
+        except codec.DecodeError as e:
             raise ValueError(f"Invalid JSON: {e}")
     
     def validate_message(self, message: Dict[str, Any]) -> bool:
-        """Validate JSON-RPC message format"""
-        required_fields = ["jsonrpc", "method", "id"]
-        return all(field in message for field in required_fields) and message["jsonrpc"] == "2.0"
\ No newline at end of file
+        """Validate JSON-RPC message format (a message without an id is a notification)"""
+        if not isinstance(message, dict):
+            return False
+        return message.get("jsonrpc") == "2.0" and isinstance(message.get("method"), str)
\ No newline at end of file
@@ -6,21 +6,46 @@ capabilities to Claude Code sessions and external clients.
 """
 
 import json
+import queue
 import socket
 import threading
 import time
 import logging
-from typing import Dict, Any, Optional, List, Callable
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, List, Callable, Union
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
+from . import codec
 from .protocol import MCPProtocol, MCPMessage, MCPResponse
 from .tools import SessionTools
+from .notifications import NotificationHub
+from .catalog import Catalog
+from .socket_server import MCPSocketServer
+from .operations import OperationManager
+from .metrics import MetricsRegistry
+from .tracing import Trace, TraceLog, message_trace_id, new_trace_id, traced
+
+# Header the stdio bridge uses to identify itself, matching its /events stream
+CLIENT_HEADER = 'X-CCMaster-Client'
+
+# Per-session resource, e.g. ccmaster://sessions/20250119_143022_123456
+SESSION_URI_PREFIX = 'ccmaster://sessions/'
+
+# Longest a single `operation wait` call blocks (stays below the bridge's HTTP timeout)
+MAX_OPERATION_WAIT = 25
 
 
 class MCPServerHandler(BaseHTTPRequestHandler):
     """HTTP handler for MCP server"""
     
+    # Keep-alive: clients reuse one connection for many calls, so every response sets Content-Length
+    protocol_version = 'HTTP/1.1'
+    # Idle keep-alive connections are closed after this many seconds
+    timeout = 300
+    # Headers and body go out in separate writes; without this, delayed ACKs stall every reply
+    disable_nagle_algorithm = True
+    
     def __init__(self, mcp_server, *args, **kwargs):
         self.mcp_server = mcp_server
         super().__init__(*args, **kwargs)
@@ -32,25 +57,104 @@ class MCPServerHandler(BaseHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             
             # Process MCP message
-            response = self.mcp_server.handle_message(post_data.decode('utf-8'))
+            client_id = self.headers.get(CLIENT_HEADER)
+            response = self.mcp_server.handle_message(post_data, client_id=client_id)
+            
+            if response is None:
+                # Notifications get no JSON-RPC response
+                self.send_response(202)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
             
             # Send response
+            body = response.encode('utf-8')
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
             
-            self.wfile.write(response.encode('utf-8'))
+            self.wfile.write(body)
             
         except Exception as e:
             self.send_error(500, f"Server error: {str(e)}")
     
+    def do_GET(self):
+        """Handle GET requests (catalogues and notification stream)"""
+        parsed = urlparse(self.path)
+        if parsed.path in ('/tools', '/resources'):
+            self.send_catalog(parsed.path[1:])
+            return
+        if parsed.path == '/metrics':
+            self.send_metrics()
+            return
+        if parsed.path != '/events':
+            self.send_error(404, "Not found")
+            return
+        
+        client_id = parse_qs(parsed.query).get('client', [None])[0] or self.headers.get(CLIENT_HEADER)
+        if not client_id:
+            self.send_error(400, "Missing client id")
+            return
+        
+        # The stream has no length, so it owns the connection until it ends
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        
+        stream = self.mcp_server.notifications.subscribe(client_id)
+        try:
+            while self.mcp_server.running:
+                try:
+                    message = stream.get(timeout=15)
+                    self.wfile.write(f"data: {codec.dumps(message)}\n\n".encode('utf-8'))
+                except queue.Empty:
+                    # Keep idle connections from being timed out by proxies or the client
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.mcp_server.notifications.unsubscribe(client_id, stream)
+    
+    def send_catalog(self, kind: str):
+        """Serve a cached catalogue, or 304 if the client's copy is current"""
+        entry = self.mcp_server.catalog.get(kind)
+        if self.headers.get('If-None-Match') == entry.etag:
+            self.send_response(304)
+            self.send_header('ETag', entry.etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(entry.body)))
+        self.send_header('ETag', entry.etag)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(entry.body)
+    
+    def send_metrics(self):
+        """Serve metrics in the Prometheus text format"""
+        body = self.mcp_server.render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
     def do_OPTIONS(self):
         """Handle OPTIONS requests (CORS)"""
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', f'Content-Type, {CLIENT_HEADER}')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def log_message(self, format, *args):
@@ -63,16 +167,49 @@ class MCPServerHandler(BaseHTTPRequestHandler):
 class MCPServer:
     """MCP Server for CCMaster"""
     
-    def __init__(self, ccmaster_instance, host='localhost', port=8080):
+    def __init__(self, ccmaster_instance, host='localhost', port=8181, socket_path=None):
         self.ccmaster = ccmaster_instance
         self.host = host
         self.port = port
+        self.socket_path = socket_path  # Optional Unix socket (newline-delimited JSON-RPC)
+        self.socket_server = None
         self.protocol = MCPProtocol()
         self.session_tools = SessionTools(ccmaster_instance)
         self.server = None
         self.server_thread = None
         self.running = False
         
+        # Worker pools: quick queries never wait behind launches and terminal I/O
+        workers_config = self.ccmaster.config.get('mcp', {}).get('workers', {})
+        self.pool_sizes = {
+            'fast': workers_config.get('fast', 8),
+            'slow': workers_config.get('slow', 4),
+            # Dispatches the members of JSON-RPC batches, which then run on fast/slow
+            'batch': workers_config.get('batch', 8),
+            # Dispatches requests arriving on the Unix socket, which then run on fast/slow
+            'socket': workers_config.get('socket', 16)
+        }
+        self.call_timeouts = {
+            'fast': workers_config.get('fast_timeout', 10),
+            'slow': workers_config.get('slow_timeout', 120),
+            # operation wait runs on the request thread and bounds itself
+            'inline': MAX_OPERATION_WAIT
+        }
+        self.pools = {}
+        
+        # Tool results are embedded as text in the model's context; keep them compact
+        self.compact_results = self.ccmaster.config.get('mcp', {}).get('compact_results', True)
+        
+        # Notifications to clients and asynchronous tool calls
+        self.notifications = NotificationHub()
+        self.operations = OperationManager(notify=self.notify_operation)
+        
+        # Per-tool call counts and latency, request and pool load (ccmaster://metrics, GET /metrics)
+        self.metrics = MetricsRegistry()
+        
+        # Per-stage timings of tool calls, shared with the stdio bridge (ccmaster trace <id>)
+        self.trace_log = TraceLog(self.ccmaster.config.get('mcp', {}).get('trace', {}))
+        
         # Setup logging with custom handler for thread-safe printing
         self.logger = logging.getLogger('CCMaster.MCP')
         self.logger.setLevel(logging.INFO)
@@ -108,8 +245,15 @@ class MCPServer:
         self.logger.addHandler(handler)
         self.logger.propagate = False  # Prevent propagation to root logger
         
+        # tools/list and resources/list are served from pre-serialized catalogues
+        self.catalog = Catalog({
+            'tools': self.build_tools_list,
+            'resources': self.build_resources_list
+        }, on_change=self.catalog_changed)
+        
         # Register tools
         self.tools = {}
+        self.tool_definitions = {}  # Definitions of tools served by the server itself
         self.register_tools()
         
         # Client connections
@@ -120,10 +264,34 @@ class MCPServer:
         for tool_name, tool_func in self.session_tools.tools.items():
             self.tools[tool_name] = tool_func
         
+        # Served by the MCP server itself rather than SessionTools
+        self.register_tool("operation", self.operation_tool, self.get_operation_tool_definition())
+        
         # Update protocol capabilities
         self.protocol.capabilities["tools"] = {
             "listChanged": True
         }
+        self.protocol.capabilities["resources"] = {
+            "subscribe": True,
+            "listChanged": True
+        }
+    
+    def register_tool(self, name: str, func: Callable, definition: Dict[str, Any]):
+        """Add or replace a tool; clients are told the tool list changed"""
+        self.tools[name] = func
+        self.tool_definitions[name] = definition
+        self.catalog.invalidate('tools')
+    
+    def unregister_tool(self, name: str):
+        """Remove a tool registered with register_tool"""
+        self.tools.pop(name, None)
+        if self.tool_definitions.pop(name, None) is not None:
+            self.catalog.invalidate('tools')
+    
+    def catalog_changed(self, kind: str):
+        """Tell connected clients to re-fetch a changed catalogue"""
+        self.logger.info(f"{kind.capitalize()} catalogue changed (version {self.catalog.get(kind).version})")
+        self.notifications.publish(f"notifications/{kind}/list_changed")
     
     def start(self):
         """Start the MCP server"""
@@ -131,7 +299,13 @@ class MCPServer:
             def handler_factory(*args, **kwargs):
                 return MCPServerHandler(self, *args, **kwargs)
             
-            self.server = HTTPServer((self.host, self.port), handler_factory)
+            # One thread per connection; tool calls then run on the worker pools
+            self.server = ThreadingHTTPServer((self.host, self.port), handler_factory)
+            self.server.daemon_threads = True
+            self.pools = {
+                name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'MCP-{name}')
+                for name, size in self.pool_sizes.items()
+            }
             self.running = True
             
             self.logger.info(f"Starting MCP server on {self.host}:{self.port}")
@@ -140,6 +314,13 @@ class MCPServer:
             self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.server_thread.start()
             
+            if self.socket_path:
+                self.socket_server = MCPSocketServer(self, self.socket_path)
+                if not self.socket_server.start():
+                    # HTTP keeps working; bridges fall back to it
+                    self.logger.warning(f"MCP socket {self.socket_path} unavailable, serving HTTP only")
+                    self.socket_server = None
+            
             return True
             
         except Exception as e:
@@ -151,21 +332,99 @@ class MCPServer:
         if self.server:
             self.logger.info("Stopping MCP server")
             self.running = False
+            self.operations.cancel_all()
+            if self.socket_server:
+                self.socket_server.stop()
+                self.socket_server = None
             self.server.shutdown()
             self.server.server_close()
             
             if self.server_thread:
                 self.server_thread.join(timeout=5)
+        
+        # Calls still running are abandoned; their threads are not joined
+        for pool in self.pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.pools = {}
     
-    def handle_message(self, message_data: str) -> str:
-        """Handle incoming MCP message"""
+    def handle_message(self, message_data: Union[str, bytes], client_id: str = None) -> Optional[str]:
+        """Handle incoming MCP message or batch; returns None when nothing needs a response"""
         try:
             # Parse message
             message = self.protocol.parse_message(message_data)
+        except Exception as e:
+            self.logger.error(f"Error handling message: {e}")
+            error_response = self.protocol.create_error_response(
+                'unknown', -32603, f"Internal error: {str(e)}"
+            )
+            return error_response.to_json()
+        return self.handle_parsed(message, client_id)
+    
+    def handle_parsed(self, message: Any, client_id: str = None) -> Optional[str]:
+        """Handle an already parsed message or batch"""
+        self.metrics.request_started()
+        try:
+            if isinstance(message, list):
+                return self.handle_batch(message, client_id)
             
+            return self.handle_request(message, client_id)
+                
+        except Exception as e:
+            self.logger.error(f"Error handling message: {e}")
+            error_response = self.protocol.create_error_response(
+                'unknown', -32603, f"Internal error: {str(e)}"
+            )
+            return error_response.to_json()
+        finally:
+            self.metrics.request_finished()
+    
+    def may_block(self, message: Any) -> bool:
+        """Whether handling a parsed message can take long: batches, and tool calls not classed 'fast'"""
+        if isinstance(message, list):
+            return True
+        if not isinstance(message, dict) or message.get('method') != 'tools/call':
+            return False
+        params = message.get('params')
+        if not isinstance(params, dict):
+            return False
+        arguments = params.get('arguments')
+        call_class = self.session_tools.call_class(params.get('name'), arguments if isinstance(arguments, dict) else {})
+        return call_class != 'fast'
+    
+    def handle_batch(self, messages: List[Any], client_id: str = None) -> Optional[str]:
+        """Handle a JSON-RPC batch; its requests run concurrently"""
+        if not messages:
+            return self.protocol.create_error_response(None, -32600, "Invalid Request: empty batch").to_json()
+        
+        futures = [
+            self.pools['batch'].submit(self.handle_request, message, client_id)
+            for message in messages
+        ]
+        responses = []
+        for message, future in zip(messages, futures):
+            try:
+                response = future.result()
+            except Exception as e:
+                message_id = message.get('id') if isinstance(message, dict) else None
+                response = self.protocol.create_error_response(
+                    message_id, -32603, f"Internal error: {str(e)}"
+                ).to_json()
+            if response is not None:
+                responses.append(response)
+        
+        # A batch of notifications gets no response at all
+        if not responses:
+            return None
+        return "[" + ",".join(responses) + "]"
+    
+    def handle_request(self, message: Any, client_id: str = None) -> Optional[str]:
+        """Handle a single request or notification"""
+        try:
             if not self.protocol.validate_message(message):
+                # Batch members that are not even objects get a null id, per JSON-RPC
+                message_id = message.get('id', 'unknown') if isinstance(message, dict) else None
                 error_response = self.protocol.create_error_response(
-                    message.get('id', 'unknown'), -32600, "Invalid Request"
+                    message_id, -32600, "Invalid Request"
                 )
                 return error_response.to_json()
             
@@ -173,22 +432,15 @@ class MCPServer:
             params = message.get('params', {})
             message_id = message.get('id')
             
-            # Handle different methods
-            if method == 'initialize':
-                return self.handle_initialize(message_id, params)
-            elif method == 'tools/list':
-                return self.handle_tools_list(message_id)
-            elif method == 'tools/call':
-                return self.handle_tool_call(message_id, params)
-            elif method == 'resources/list':
-                return self.handle_resources_list(message_id)
-            elif method == 'resources/read':
-                return self.handle_resource_read(message_id, params)
-            else:
-                error_response = self.protocol.create_error_response(
-                    message_id, -32601, f"Method not found: {method}"
-                )
-                return error_response.to_json()
+            if 'id' not in message:
+                # Notification: act on it but never respond
+                if method.startswith('notifications/'):
+                    self.handle_notification(method, params, client_id)
+                else:
+                    self.dispatch_request(method, None, params, client_id)
+                return None
+            
+            return self.dispatch_request(method, message_id, params, client_id)
                 
         except Exception as e:
             self.logger.error(f"Error handling message: {e}")
@@ -197,6 +449,43 @@ class MCPServer:
             )
             return error_response.to_json()
     
+    def dispatch_request(self, method: str, message_id: Any, params: Dict[str, Any], client_id: str = None) -> str:
+        """Route a request to its method handler"""
+        # Handle different methods
+        if method == 'initialize':
+            return self.handle_initialize(message_id, params)
+        elif method == 'tools/list':
+            return self.handle_tools_list(message_id)
+        elif method == 'tools/call':
+            return self.handle_tool_call(message_id, params, client_id)
+        elif method == 'resources/list':
+            return self.handle_resources_list(message_id)
+        elif method == 'resources/read':
+            return self.handle_resource_read(message_id, params)
+        elif method == 'resources/templates/list':
+            return self.handle_resource_templates_list(message_id)
+        elif method == 'resources/subscribe':
+            return self.handle_resource_subscribe(message_id, params, client_id, subscribe=True)
+        elif method == 'resources/unsubscribe':
+            return self.handle_resource_subscribe(message_id, params, client_id, subscribe=False)
+        else:
+            error_response = self.protocol.create_error_response(
+                message_id, -32601, f"Method not found: {method}"
+            )
+            return error_response.to_json()
+    
+    def handle_notification(self, method: str, params: Dict[str, Any], client_id: str = None):
+        """Handle a client notification (no response is sent)"""
+        if method == 'notifications/cancelled':
+            request_id = params.get('requestId')
+            operation = self.operations.cancel_request(client_id, request_id)
+            if operation:
+                self.logger.info(f"Cancelled {operation.tool} call {operation.id} (request {request_id})")
+    
+    def notify_operation(self, operation, method: str, params: Dict[str, Any]):
+        """Deliver an operation's progress to the client that started it"""
+        self.notifications.publish(method, params, client_id=operation.client_id)
+    
     def handle_initialize(self, message_id: str, params: Dict[str, Any]) -> str:
         """Handle initialization request"""
         client_info = params.get('clientInfo', {})
@@ -219,19 +508,23 @@ class MCPServer:
     
     def handle_tools_list(self, message_id: str) -> str:
         """Handle tools list request"""
-        tool_definitions = self.session_tools.get_tool_definitions()
+        return self.catalog.response('tools', message_id)
+    
+    def build_tools_list(self) -> Dict[str, Any]:
+        """tools/list result, built when the tool catalogue is (re)generated"""
+        tool_definitions = self.session_tools.get_tool_definitions() + list(self.tool_definitions.values())
         
-        result = {
+        return {
             "tools": tool_definitions
         }
-        
-        response = MCPResponse(message_id, result)
-        return response.to_json()
     
-    def handle_tool_call(self, message_id: str, params: Dict[str, Any]) -> str:
+    def handle_tool_call(self, message_id: str, params: Dict[str, Any], client_id: str = None) -> str:
         """Handle tool call request"""
         tool_name = params.get('name')
-        arguments = params.get('arguments', {})
+        arguments = dict(params.get('arguments', {}))
+        # "async": return an operation handle instead of waiting for the result
+        run_async = bool(arguments.pop('async', False))
+        progress_token = (params.get('_meta') or {}).get('progressToken')
         
         if tool_name not in self.tools:
             error_response = self.protocol.create_error_response(
@@ -239,20 +532,83 @@ class MCPServer:
             )
             return error_response.to_json()
         
+        # Trace id from the bridge (or the client), else a new one; returned in the result's _meta
+        action = arguments.get('action')
+        trace = Trace(message_trace_id(params) or new_trace_id(), 'server', tool=tool_name, action=action,
+                      via='socket' if (client_id or '').startswith('sock-') else 'http')
+        trace_meta = {"traceId": trace.id}
+        outcome = 'error'
+        
         try:
-            # Call the tool
-            tool_func = self.tools[tool_name]
-            result = tool_func(**arguments)
+            # Call the tool on the pool for its class, bounded by that class's timeout
+            pool_name = self.session_tools.call_class(tool_name, arguments)
+            tool_func = traced(trace, self.metrics.instrument(pool_name, tool_name, action, self.tools[tool_name]))
+            timeout = self.get_call_timeout(pool_name, arguments)
+            
+            if pool_name == 'inline':
+                # Bounded by MAX_OPERATION_WAIT, and must not queue behind the calls it waits for
+                result = tool_func(**arguments)
+            elif tool_name != "operation" and (run_async or progress_token is not None or pool_name == 'slow'):
+                # Long calls run as operations: they report progress and can be cancelled
+                operation = self.operations.start(
+                    self.pools[pool_name], tool_func, tool_name, arguments,
+                    client_id=client_id, request_id=message_id, progress_token=progress_token
+                )
+                if run_async:
+                    outcome = 'async'
+                    result = {
+                        "operation_id": operation.id,
+                        "status": operation.status,
+                        "message": f"Started {tool_name}; use the operation tool (get/wait/cancel) with this operation_id"
+                    }
+                else:
+                    if not operation.done_event.wait(timeout):
+                        self.operations.cancel(operation.id)
+                        self.metrics.record_timeout(tool_name, action)
+                        self.logger.warning(f"Tool call {tool_name} timed out after {timeout}s")
+                        outcome = 'timeout'
+                        error_response = self.protocol.create_error_response(
+                            message_id, -32000, f"Tool call timed out after {timeout}s: {tool_name}"
+                        )
+                        error_response.error["data"] = trace_meta
+                        return error_response.to_json()
+                    if operation.status == 'cancelled':
+                        outcome = 'cancelled'
+                        error_response = self.protocol.create_error_response(
+                            message_id, -32800, f"Request cancelled: {tool_name}"
+                        )
+                        error_response.error["data"] = trace_meta
+                        return error_response.to_json()
+                    if operation.status == 'failed':
+                        raise RuntimeError(operation.error)
+                    result = operation.result
+            else:
+                future = self.pools[pool_name].submit(tool_func, **arguments)
+                try:
+                    result = future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    self.metrics.record_timeout(tool_name, action)
+                    self.logger.warning(f"Tool call {tool_name} timed out after {timeout}s")
+                    outcome = 'timeout'
+                    error_response = self.protocol.create_error_response(
+                        message_id, -32000, f"Tool call timed out after {timeout}s: {tool_name}"
+                    )
+                    error_response.error["data"] = trace_meta
+                    return error_response.to_json()
             
             # Format response
-            content = [
-                {
-                    "type": "text",
-                    "text": json.dumps(result, indent=2)
-                }
-            ]
+            with trace.span("encode"):
+                content = [
+                    {
+                        "type": "text",
+                        "text": self.encode_result(result)
+                    }
+                ]
+            if outcome != 'async':
+                outcome = 'error' if isinstance(result, dict) and "error" in result else 'ok'
             
             response = self.protocol.create_tool_response(message_id, content)
+            response.result["_meta"] = trace_meta
             return response.to_json()
             
         except Exception as e:
@@ -260,10 +616,128 @@ class MCPServer:
             error_response = self.protocol.create_error_response(
                 message_id, -32603, f"Tool execution error: {str(e)}"
             )
+            error_response.error["data"] = trace_meta
             return error_response.to_json()
+        finally:
+            trace.finish(self.trace_log, status=outcome)
+    
+    def operation_tool(self, action: str, operation_id: str = None, timeout: float = 10) -> Dict[str, Any]:
+        """Inspect, wait for or cancel asynchronous tool calls"""
+        if action == "list":
+            return {"operations": self.operations.list_operations()}
+        
+        if not operation_id:
+            return {"error": "operation_id is required"}
+        
+        if action == "get":
+            operation = self.operations.get(operation_id)
+        elif action == "wait":
+            operation = self.operations.wait(operation_id, min(max(timeout, 0), MAX_OPERATION_WAIT))
+        elif action == "cancel":
+            operation = self.operations.cancel(operation_id)
+        else:
+            return {"error": f"Unknown operation action: {action}"}
+        
+        if not operation:
+            return {"error": f"Operation {operation_id} not found"}
+        return operation.to_dict()
+    
+    def get_operation_tool_definition(self) -> Dict[str, Any]:
+        """Definition of the operation tool served by the MCP server"""
+        return {
+            "name": "operation",
+            "description": "Track tool calls started with \"async\": true. Actions: get (current state), wait (block up to timeout seconds for completion), cancel, list",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "action": {
+                        "type": "string",
+                        "enum": ["get", "wait", "cancel", "list"],
+                        "description": "What to do with the operation"
+                    },
+                    "operation_id": {
+                        "type": "string",
+                        "description": "Operation handle returned by the async call"
+                    },
+                    "timeout": {
+                        "type": "number",
+                        "description": f"For wait: seconds to wait (max {MAX_OPERATION_WAIT})",
+                        "default": 10
+                    }
+                },
+                "required": ["action"]
+            }
+        }
+    
+    def handle_resource_templates_list(self, message_id: str) -> str:
+        """Handle resource templates list request"""
+        result = {
+            "resourceTemplates": [
+                {
+                    "uriTemplate": SESSION_URI_PREFIX + "{session_id}",
+                    "name": "Session Status",
+                    "description": "Status of one Claude Code session; subscribe to be notified of state changes",
+                    "mimeType": "application/json"
+                }
+            ]
+        }
+        
+        response = MCPResponse(message_id, result)
+        return response.to_json()
+    
+    def handle_resource_subscribe(self, message_id: str, params: Dict[str, Any], client_id: str = None,
+                                  subscribe: bool = True) -> str:
+        """Handle resources/subscribe and resources/unsubscribe"""
+        uri = params.get('uri') or ''
+        if uri not in ("ccmaster://sessions", "ccmaster://status") and not (
+                uri.startswith(SESSION_URI_PREFIX) and len(uri) > len(SESSION_URI_PREFIX)):
+            error_response = self.protocol.create_error_response(
+                message_id, -32602, f"Resource not found: {uri}"
+            )
+            return error_response.to_json()
+        
+        if not client_id:
+            # Updates are delivered on the client's notification stream, which needs an id
+            error_response = self.protocol.create_error_response(
+                message_id, -32602, f"Subscriptions need a client id ({CLIENT_HEADER} header)"
+            )
+            return error_response.to_json()
+        
+        if subscribe:
+            self.notifications.subscribe_resource(client_id, uri)
+        else:
+            self.notifications.unsubscribe_resource(client_id, uri)
+        
+        response = MCPResponse(message_id, {})
+        return response.to_json()
+    
+    def resources_updated(self, session_id: str = None):
+        """Notify subscribers after session state changed (one session, or the session list)"""
+        if session_id:
+            self.notifications.resource_updated(SESSION_URI_PREFIX + session_id)
+        self.notifications.resource_updated("ccmaster://sessions")
+        self.notifications.resource_updated("ccmaster://status")
+    
+    def encode_result(self, result: Any) -> str:
+        """Serialize a tool result or resource for a text content block"""
+        if self.compact_results:
+            return codec.dumps(result)
+        return json.dumps(result, indent=2)
+    
+    def get_call_timeout(self, pool_name: str, arguments: Dict[str, Any]) -> float:
+        """Per-call timeout; calls with their own timeout argument get that plus headroom"""
+        timeout = self.call_timeouts[pool_name]
+        requested = arguments.get('timeout')
+        if isinstance(requested, (int, float)):
+            timeout = max(timeout, requested + 10)
+        return timeout
     
     def handle_resources_list(self, message_id: str) -> str:
         """Handle resources list request"""
+        return self.catalog.response('resources', message_id)
+    
+    def build_resources_list(self) -> Dict[str, Any]:
+        """resources/list result, built when the resource catalogue is (re)generated"""
         resources = [
             {
                 "uri": "ccmaster://sessions",
@@ -276,15 +750,18 @@ class MCPServer:
                 "name": "System Status",
                 "description": "CCMaster system status and metrics",
                 "mimeType": "application/json"
+            },
+            {
+                "uri": "ccmaster://metrics",
+                "name": "MCP Metrics",
+                "description": "Per-tool call counts, errors and latency, request and pool load, threads and memory",
+                "mimeType": "application/json"
             }
         ]
         
-        result = {
+        return {
             "resources": resources
         }
-        
-        response = MCPResponse(message_id, result)
-        return response.to_json()
     
     def handle_resource_read(self, message_id: str, params: Dict[str, Any]) -> str:
         """Handle resource read request"""
@@ -297,7 +774,22 @@ class MCPServer:
                 {
                     "uri": uri,
                     "mimeType": "application/json",
-                    "text": json.dumps(sessions_data, indent=2)
+                    "text": self.encode_result(sessions_data)
+                }
+            ]
+        elif uri.startswith(SESSION_URI_PREFIX):
+            # Return one session's status
+            session_data = self.session_tools.get_session_status(uri[len(SESSION_URI_PREFIX):])
+            if "error" in session_data:
+                error_response = self.protocol.create_error_response(
+                    message_id, -32602, f"Resource not found: {uri}"
+                )
+                return error_response.to_json()
+            content = [
+                {
+                    "uri": uri,
+                    "mimeType": "application/json",
+                    "text": self.encode_result(session_data)
                 }
             ]
         elif uri == "ccmaster://status":
@@ -313,7 +805,15 @@ class MCPServer:
                 {
                     "uri": uri,
                     "mimeType": "application/json",
-                    "text": json.dumps(status_data, indent=2)
+                    "text": self.encode_result(status_data)
+                }
+            ]
+        elif uri == "ccmaster://metrics":
+            content = [
+                {
+                    "uri": uri,
+                    "mimeType": "application/json",
+                    "text": self.encode_result(self.metrics_snapshot())
                 }
             ]
         else:
@@ -329,11 +829,32 @@ class MCPServer:
         response = MCPResponse(message_id, result)
         return response.to_json()
     
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Size and backlog of each worker pool"""
+        stats = {}
+        for name, size in self.pool_sizes.items():
+            pool = self.pools.get(name)
+            work_queue = getattr(pool, '_work_queue', None)
+            stats[name] = {
+                "workers": size,
+                "queued": work_queue.qsize() if work_queue is not None else 0
+            }
+        return stats
+    
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """Metrics as JSON (the ccmaster://metrics resource)"""
+        return self.metrics.snapshot(self.pool_stats(), self.operations.running_count())
+    
+    def render_metrics(self) -> str:
+        """Metrics in the Prometheus text format (GET /metrics)"""
+        return self.metrics.render_prometheus(self.pool_stats(), self.operations.running_count())
+    
     def get_server_info(self) -> Dict[str, Any]:
         """Get server information"""
         return {
             "host": self.host,
             "port": self.port,
+            "socket": self.socket_server.socket_path if self.socket_server else None,
             "running": self.running,
             "connected_clients": len(self.clients),
             "available_tools": list(self.tools.keys())
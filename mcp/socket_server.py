@@ -0,0 +1,182 @@
+"""
+Unix socket transport for the CCMaster MCP server
+
+Besides HTTP, CCMaster listens on a per-instance Unix socket
+(~/.ccmaster/run/mcp-<pid>.sock) speaking newline-delimited JSON-RPC: every
+line a client writes is one message or batch, and every line the server
+writes is a response or a notification. A connection stays open for the
+whole client session, so the stdio bridge's hop costs a socket write instead
+of an HTTP connection per call.
+
+Requests on a connection are answered as they finish (JSON-RPC ids match
+them up). Requests that may block, i.e. batches and tool calls not classed
+'fast', are dispatched on the server's bounded 'socket' pool
+(mcp.workers.socket), shared by all connections, and run on the slow pool
+from there, like HTTP requests. Everything else, including fast tool calls
+and notifications such as notifications/cancelled, is handled on the
+connection's own thread, so a pool full of slow calls never holds up a
+quick query or a cancellation.
+Notifications for the connection, such as progress, are pushed onto the
+same socket, so no /events stream is needed.
+"""
+
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import uuid
+from pathlib import Path
+
+from . import codec
+
+
+def default_socket_path() -> str:
+    """Socket path for this CCMaster process"""
+    return str(Path.home() / '.ccmaster' / 'run' / f'mcp-{os.getpid()}.sock')
+
+
+class MCPSocketHandler(socketserver.StreamRequestHandler):
+    """One client connection: JSON-RPC lines in, responses and notifications out"""
+    
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+        self.open = True
+        self.client_id = f"sock-{uuid.uuid4().hex[:12]}"
+        with self.server.connections_lock:
+            self.server.connections.add(self.request)
+    
+    def handle(self):
+        mcp_server = self.server.mcp_server
+        stream = mcp_server.notifications.subscribe(self.client_id)
+        pump = threading.Thread(target=self.pump_notifications, args=(stream,),
+                                name='MCPSocketNotify', daemon=True)
+        pump.start()
+        
+        try:
+            for line in self.rfile:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = codec.loads(line)
+                except codec.DecodeError:
+                    # Answered with a parse error right away
+                    self.process(line)
+                    continue
+                if mcp_server.may_block(message):
+                    # Slow calls wait on the socket pool, so they don't hold up later requests
+                    mcp_server.pools['socket'].submit(self.process, message)
+                else:
+                    # Quick requests and notifications never queue behind slow calls
+                    self.process(message)
+        except (ConnectionResetError, OSError):
+            pass
+        finally:
+            self.open = False
+            mcp_server.notifications.unsubscribe(self.client_id, stream)
+            mcp_server.notifications.drop_client(self.client_id)
+            with self.server.connections_lock:
+                self.server.connections.discard(self.request)
+    
+    def process(self, message):
+        """Handle a parsed message, or a raw line that failed to parse"""
+        mcp_server = self.server.mcp_server
+        try:
+            if isinstance(message, bytes):
+                response = mcp_server.handle_message(message, client_id=self.client_id)
+            else:
+                response = mcp_server.handle_parsed(message, client_id=self.client_id)
+        except Exception as e:
+            mcp_server.logger.error(f"Socket request error: {e}")
+            return
+        if response is not None:
+            self.send_line(response)
+    
+    def pump_notifications(self, stream: queue.Queue):
+        while self.open:
+            try:
+                message = stream.get(timeout=1)
+            except queue.Empty:
+                continue
+            self.send_line(codec.dumps(message))
+    
+    def send_line(self, text: str):
+        data = text.encode('utf-8') + b'\n'
+        with self.write_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                self.open = False
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    
+    def __init__(self, *args, **kwargs):
+        self.connections = set()  # Open client sockets, closed on stop()
+        self.connections_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+
+class MCPSocketServer:
+    """Unix socket listener feeding MCPServer.handle_message"""
+    
+    def __init__(self, mcp_server, socket_path: str = None):
+        self.mcp_server = mcp_server
+        self.socket_path = socket_path or default_socket_path()
+        self.server = None
+        self.server_thread = None
+        self.logger = logging.getLogger('CCMaster.MCP.Socket')
+    
+    def start(self) -> bool:
+        """Start listening; returns False if the socket could not be bound"""
+        try:
+            os.makedirs(os.path.dirname(self.socket_path), mode=0o700, exist_ok=True)
+            if os.path.exists(self.socket_path):
+                # Left behind by a crashed instance that had the same pid
+                os.unlink(self.socket_path)
+            
+            self.server = _UnixServer(self.socket_path, MCPSocketHandler)
+            self.server.mcp_server = self.mcp_server
+            os.chmod(self.socket_path, 0o600)
+            
+            self.server_thread = threading.Thread(
+                target=self.server.serve_forever,
+                name='MCPSocketServer',
+                daemon=True
+            )
+            self.server_thread.start()
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"Failed to start MCP socket server: {e}")
+            self.server = None
+            return False
+    
+    def stop(self):
+        """Stop listening and remove the socket"""
+        if not self.server:
+            return
+        
+        self.server.shutdown()
+        self.server.server_close()
+        with self.server.connections_lock:
+            connections = list(self.server.connections)
+        for connection in connections:
+            try:
+                # Wakes the handler's read loop; clients see EOF and fall back or fail fast
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.server_thread:
+            self.server_thread.join(timeout=5)
+        
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        self.server = None
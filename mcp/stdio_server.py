@@ -3,31 +3,77 @@
 CCMaster MCP STDIO Server
 
 This is a wrapper that allows CCMaster MCP server to be used as a stdio-based
-MCP server by Claude Code. It acts as a bridge between stdio and the HTTP-based
+MCP server by Claude Code. It acts as a bridge between stdio and the
 CCMaster MCP server.
+
+The bridge prefers CCMaster's Unix socket, which speaks the same
+newline-delimited JSON-RPC as stdio, so lines are passed through as they are.
+It finds the socket from --socket or the ~/.ccmaster/mcp_port.json registry
+and falls back to HTTP when no live socket is found.
+
+Tool calls get a trace id (params._meta.traceId) here unless the client sent
+one. The bridge logs its own stage timings under that id (see tracing.py).
 """
 
+import os
 import sys
 import json
 import argparse
 import logging
+import socket
 import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 
+# Loaded as a sibling module: the bridge runs as a script, outside the mcp package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import codec
+from tracing import Trace, TraceLog, message_trace_id, new_trace_id
+
 # Delay requests import to allow --help to work without it
 requests = None
 
+# Written by CCMaster when its MCP server starts
+REGISTRY_FILE = os.path.join(os.path.expanduser('~'), '.ccmaster', 'mcp_port.json')
+
+# HTTP requests the bridge keeps in flight (and keep-alive connections it pools)
+DEFAULT_MAX_IN_FLIGHT = 16
+
+# Longest the server runs a tool call before timing it out (mcp.workers.slow_timeout),
+# until the registry says otherwise; HTTP requests wait that long plus a margin
+DEFAULT_CALL_TIMEOUT = 120
+HTTP_TIMEOUT_MARGIN = 10
+
 
 class StdioMCPBridge:
     """Bridge between stdio MCP and HTTP MCP server"""
     
-    def __init__(self, host: str = 'localhost', port: int = 8080):
+    def __init__(self, host: str = 'localhost', port: int = 8181, socket_path: str = None,
+                 registry_path: str = REGISTRY_FILE, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
         self.host = host
         self.port = port
         self.server_url = f"http://{host}:{port}"
         self.running = True
         
+        # Unix socket transport (preferred when available)
+        self.socket_path = socket_path
+        self.registry_path = registry_path
+        self.sock = None
+        self.sock_lock = threading.Lock()
+        self.in_flight = {}  # Request id sent over the socket and not yet answered -> (trace, sent at)
+        self.relay_started = False
+        self.call_timeout = DEFAULT_CALL_TIMEOUT
+        
+        # Identifies this bridge to the server so notifications reach the right client
+        self.client_id = uuid.uuid4().hex
+        self.output_lock = threading.Lock()
+        self.tools_etag = None
+        
+        # Stage timings of tool calls, written next to the server's (ccmaster trace <id>)
+        self.trace_log = TraceLog()
+        
         # Setup logging to stderr (stdout is reserved for MCP messages)
         logging.basicConfig(
             level=logging.INFO,
@@ -36,48 +82,213 @@ class StdioMCPBridge:
         )
         self.logger = logging.getLogger('CCMaster.MCP.StdioBridge')
         
-        # Session for HTTP requests
-        self.session = requests.Session()
+        # Session for HTTP requests, pooling one keep-alive connection per in-flight request
+        self.session = None
+        if requests:
+            self.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+            self.session.mount('http://', adapter)
         
-    def send_to_server(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Send message to HTTP MCP server"""
+        # HTTP calls run here so a slow call never holds up the ones after it
+        self.workers = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='BridgeCall')
+    
+    def read_registry(self) -> Dict[str, Any]:
+        """Endpoints of the running CCMaster, or {} if it is not running"""
+        try:
+            with open(self.registry_path, 'r') as f:
+                registry = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        pid = registry.get('pid')
+        if pid:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return {}
+            except PermissionError:
+                pass
+        return registry
+    
+    def connect_socket(self) -> bool:
+        """Connect to the explicit socket or the registered one (sock_lock held)"""
+        registry = self.read_registry()
+        self.call_timeout = registry.get('call_timeout') or self.call_timeout
+        candidates = [self.socket_path, registry.get('socket')]
+        for path in candidates:
+            if not path or not os.path.exists(path):
+                continue
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(path)
+            except OSError:
+                sock.close()
+                continue
+            self.sock = sock
+            self.logger.info(f"Connected to CCMaster MCP socket {path}")
+            threading.Thread(target=self.read_socket, args=(sock,), name='SocketReader', daemon=True).start()
+            return True
+        
+        # No socket; make sure HTTP at least targets the registered port
+        if registry.get('last_port') and registry.get('last_port') != self.port:
+            self.port = registry['last_port']
+            self.server_url = f"http://{registry.get('host', self.host)}:{self.port}"
+            self.logger.info(f"Using registered CCMaster MCP server at {self.server_url}")
+        return False
+    
+    def start_traces(self, message: Any) -> Dict[Any, Trace]:
+        """Give each tool call in a message or batch a trace id; returns request id -> Trace"""
+        traces = {}
+        if not self.trace_log.enabled:
+            return traces
+        for item in (message if isinstance(message, list) else [message]):
+            if not isinstance(item, dict) or item.get('method') != 'tools/call' or 'id' not in item:
+                continue
+            params = item.get('params')
+            if not isinstance(params, dict):
+                continue
+            trace_id = message_trace_id(params)
+            if trace_id is None:
+                trace_id = new_trace_id()
+                meta = params.get('_meta') if isinstance(params.get('_meta'), dict) else {}
+                params['_meta'] = dict(meta, traceId=trace_id)
+            traces[item['id']] = Trace(trace_id, 'bridge', tool=params.get('name'),
+                                       action=(params.get('arguments') or {}).get('action'))
+        return traces
+    
+    def finish_trace(self, trace: Optional[Trace], transport: str, sent: float, received: float,
+                     written: float = None):
+        """Record the transport and stdout stages of a traced call and log it"""
+        if trace is None:
+            return
+        trace.add_span(transport, sent, received)
+        trace.add_span("write", received, written or time.perf_counter())
+        trace.finish(self.trace_log)
+    
+    def send_to_socket(self, message: Any, line: str, traces: Dict[Any, Trace] = None) -> bool:
+        """Write a message to the socket as-is; False if no socket is usable"""
+        ids = [item.get('id') for item in (message if isinstance(message, list) else [message])
+               if isinstance(item, dict) and 'id' in item]
+        traces = traces or {}
+        with self.sock_lock:
+            if self.sock is None and not self.connect_socket():
+                return False
+            try:
+                sent = time.perf_counter()
+                self.in_flight.update((message_id, (traces.get(message_id), sent)) for message_id in ids)
+                self.sock.sendall(line.encode('utf-8') + b'\n')
+                return True
+            except OSError as e:
+                self.logger.warning(f"MCP socket write failed: {e}")
+                for message_id in ids:
+                    self.in_flight.pop(message_id, None)
+                self.sock.close()
+                self.sock = None
+                return False
+    
+    def read_socket(self, sock: socket.socket):
+        """Pass responses and notifications from the socket straight to stdout"""
+        try:
+            for raw in sock.makefile('rb'):
+                line = raw.strip()
+                if not line:
+                    continue
+                received = time.perf_counter()
+                answered = []
+                try:
+                    reply = codec.loads(line)
+                    replies = reply if isinstance(reply, list) else [reply]
+                    with self.sock_lock:
+                        for item in replies:
+                            if isinstance(item, dict) and 'id' in item:
+                                answered.append(self.in_flight.pop(item.get('id'), (None, None)))
+                except codec.DecodeError:
+                    pass
+                self.send_line(line.decode('utf-8'))
+                for trace, sent in answered:
+                    self.finish_trace(trace, "socket", sent, received)
+        except OSError:
+            pass
+        
+        with self.sock_lock:
+            if self.sock is not sock:
+                return
+            self.sock = None
+            lost = list(self.in_flight)
+            self.in_flight.clear()
+        if self.running:
+            self.logger.warning("CCMaster MCP socket closed")
+        for message_id in lost:
+            self.send_response(self.error_reply(
+                {"id": message_id}, -32603, "Connection to CCMaster MCP server lost"
+            ))
+    
+
+    def send_to_server(self, message: Any) -> Optional[Any]:
+        """Send a message or batch to HTTP MCP server"""
+        if self.session is None:
+            return self.error_reply(message, -32603, "CCMaster MCP socket unavailable and requests is not installed")
         try:
             response = self.session.post(
                 self.server_url,
-                json=message,
-                headers={'Content-Type': 'application/json'},
-                timeout=30
+                data=codec.dumps_bytes(message),
+                headers={'Content-Type': 'application/json', 'X-CCMaster-Client': self.client_id},
+                timeout=self.http_timeout(message)
             )
             response.raise_for_status()
-            return response.json()
+            if response.status_code == 202 or not response.content:
+                # Notifications accepted; nothing to send back
+                return None
+            return codec.loads(response.content)
         except requests.exceptions.ConnectionError:
             self.logger.error(f"Cannot connect to CCMaster MCP server at {self.server_url}")
             self.logger.error("Make sure CCMaster is running with 'ccmaster watch'")
-            return {
-                "jsonrpc": "2.0",
-                "id": message.get("id", "unknown"),
-                "error": {
-                    "code": -32603,
-                    "message": f"Cannot connect to CCMaster MCP server at {self.server_url}. Make sure CCMaster is running."
-                }
-            }
+            return self.error_reply(
+                message, -32603,
+                f"Cannot connect to CCMaster MCP server at {self.server_url}. Make sure CCMaster is running."
+            )
         except Exception as e:
             self.logger.error(f"Error communicating with server: {e}")
-            return {
-                "jsonrpc": "2.0",
-                "id": message.get("id", "unknown"),
-                "error": {
-                    "code": -32603,
-                    "message": f"Server communication error: {str(e)}"
-                }
+            return self.error_reply(message, -32603, f"Server communication error: {str(e)}")
+    
+    def http_timeout(self, message: Any) -> float:
+        """How long to wait for the server's answer: never less than the server may take to answer itself"""
+        timeout = self.call_timeout
+        for item in message if isinstance(message, list) else [message]:
+            if not isinstance(item, dict) or item.get('method') != 'tools/call':
+                continue
+            # Calls with their own timeout argument get that plus headroom on the server (get_call_timeout)
+            requested = (item.get('params') or {}).get('arguments', {}).get('timeout')
+            if isinstance(requested, (int, float)):
+                timeout = max(timeout, requested + 10)
+        return timeout + HTTP_TIMEOUT_MARGIN
+    
+    def error_reply(self, message: Any, code: int, text: str) -> Optional[Any]:
+        """Error response for a message, or one per request in a batch (None if only notifications)"""
+        if isinstance(message, list):
+            replies = [self.error_reply(item, code, text) for item in message]
+            return [reply for reply in replies if reply] or None
+        if isinstance(message, dict) and "id" not in message:
+            return None
+        return {
+            "jsonrpc": "2.0",
+            "id": message.get("id", "unknown") if isinstance(message, dict) else None,
+            "error": {
+                "code": code,
+                "message": text
             }
+        }
     
     def send_response(self, response: Dict[str, Any]):
         """Send response to stdout"""
+        self.send_line(codec.dumps(response))
+    
+    def send_line(self, line: str):
+        """Write one JSON-RPC line to stdout"""
         try:
-            # Write response to stdout with newline
-            sys.stdout.write(json.dumps(response) + '\n')
-            sys.stdout.flush()
+            # Responses and notifications come from several threads
+            with self.output_lock:
+                sys.stdout.write(line + '\n')
+                sys.stdout.flush()
         except Exception as e:
             self.logger.error(f"Error sending response: {e}")
     
@@ -85,19 +296,8 @@ class StdioMCPBridge:
         """Handle a single message from stdin"""
         try:
             # Parse the JSON-RPC message
-            message = json.loads(line)
-            
-            # Log the incoming message (to stderr)
-            self.logger.debug(f"Received: {message.get('method', 'unknown')}")
-            
-            # Forward to HTTP server
-            response = self.send_to_server(message)
-            
-            # Send response back via stdout
-            if response:
-                self.send_response(response)
-                
-        except json.JSONDecodeError as e:
+            message = codec.loads(line)
+        except codec.DecodeError as e:
             self.logger.error(f"Invalid JSON received: {e}")
             error_response = {
                 "jsonrpc": "2.0",
@@ -108,6 +308,37 @@ class StdioMCPBridge:
                 }
             }
             self.send_response(error_response)
+            return
+        
+        try:
+            # Log the incoming message (to stderr)
+            if isinstance(message, list):
+                self.logger.debug(f"Received batch of {len(message)}")
+            else:
+                self.logger.debug(f"Received: {message.get('method', 'unknown')}")
+            
+            # Tool calls carry a trace id from here on
+            traces = self.start_traces(message)
+            if traces:
+                line = codec.dumps(message)
+                parsed = time.perf_counter()
+                for trace in traces.values():
+                    trace.add_span("parse", trace.start, parsed)
+            
+            # Pass through the socket when possible, otherwise forward to HTTP server
+            if self.send_to_socket(message, line, traces):
+                return
+            self.start_relay()
+            sent = time.perf_counter()
+            response = self.send_to_server(message)
+            received = time.perf_counter()
+            
+            # Send response back via stdout
+            if response:
+                self.send_response(response)
+            for trace in traces.values():
+                self.finish_trace(trace, "http", sent, received)
+                
         except Exception as e:
             self.logger.error(f"Error handling message: {e}")
             error_response = {
@@ -120,21 +351,78 @@ class StdioMCPBridge:
             }
             self.send_response(error_response)
     
+    def report_connectivity(self):
+        if self.check_server():
+            self.logger.info("Successfully connected to CCMaster MCP server")
+        else:
+            self.logger.warning("CCMaster MCP server may not be running")
+    
+    def check_server(self) -> bool:
+        """Check that the server answers, revalidating the cached tool catalogue by ETag"""
+        if self.session is None:
+            return False
+        headers = {'If-None-Match': self.tools_etag} if self.tools_etag else {}
+        try:
+            response = self.session.get(f"{self.server_url}/tools", headers=headers, timeout=5)
+        except Exception:
+            return False
+        if response.status_code in (200, 304):
+            self.tools_etag = response.headers.get('ETag', self.tools_etag)
+            return True
+        return False
+    
+    def start_relay(self):
+        """Start relaying the HTTP notification stream (socket clients get notifications inline)"""
+        with self.sock_lock:
+            if self.relay_started or self.session is None:
+                return
+            self.relay_started = True
+        threading.Thread(target=self.relay_notifications, name='NotificationRelay', daemon=True).start()
+    
+    def relay_notifications(self):
+        """Copy server notifications (progress etc.) from the /events stream to stdout"""
+        events = requests.Session()
+        backoff = 0.5
+        while self.running:
+            try:
+                with events.get(f"{self.server_url}/events", params={'client': self.client_id},
+                                stream=True, timeout=(5, 60)) as response:
+                    response.raise_for_status()
+                    backoff = 0.5
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not self.running:
+                            break
+                        if line and line.startswith('data: '):
+                            self.send_response(codec.loads(line[6:]))
+            except Exception as e:
+                self.logger.debug(f"Notification stream unavailable: {e}")
+            if self.running:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 10)
+        events.close()
+    
+    def dispatch(self, line: str):
+        """Handle a message without blocking stdin; replies are written as they complete"""
+        if self.sock is not None:
+            # Socket writes never wait for the reply
+            self.handle_message(line)
+            return
+        self.workers.submit(self.handle_message, line)
+    
     def run(self):
         """Main loop - read from stdin and process messages"""
-        self.logger.info(f"Starting CCMaster MCP STDIO bridge to {self.server_url}")
+        with self.sock_lock:
+            connected = self.connect_socket()
         
-        # Send a test connection to verify server is running
-        test_response = self.send_to_server({
-            "jsonrpc": "2.0",
-            "method": "tools/list",
-            "id": "test"
-        })
-        
-        if test_response and not test_response.get("error"):
+        if connected:
+            # Notifications arrive on the socket itself
             self.logger.info("Successfully connected to CCMaster MCP server")
         else:
-            self.logger.warning("CCMaster MCP server may not be running")
+            self.logger.info(f"Starting CCMaster MCP STDIO bridge to {self.server_url}")
+            
+            # Only for the log; stdin is served right away rather than after a probe
+            self.workers.submit(self.report_connectivity)
+            self.start_relay()
         
         try:
             while self.running:
@@ -149,7 +437,7 @@ class StdioMCPBridge:
                     continue
                 
                 # Handle the message
-                self.handle_message(line)
+                self.dispatch(line)
                 
         except KeyboardInterrupt:
             self.logger.info("Shutting down STDIO bridge")
@@ -157,34 +445,43 @@ class StdioMCPBridge:
             self.logger.error(f"Unexpected error in main loop: {e}")
         finally:
             self.running = False
-            self.session.close()
+            # Claude has gone away; don't start calls that are still queued
+            self.workers.shutdown(wait=False, cancel_futures=True)
+            with self.sock_lock:
+                if self.sock is not None:
+                    self.sock.close()
+                    self.sock = None
+            if self.session is not None:
+                self.session.close()
 
 
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='CCMaster MCP STDIO Server Bridge')
     parser.add_argument('--host', default='localhost', help='CCMaster MCP server host')
-    parser.add_argument('--port', type=int, default=8080, help='CCMaster MCP server port')
+    parser.add_argument('--port', type=int, default=8181, help='CCMaster MCP server port')
+    parser.add_argument('--socket', help='CCMaster MCP Unix socket (default: from ~/.ccmaster/mcp_port.json)')
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help='Concurrent HTTP requests to the CCMaster MCP server')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     
     args = parser.parse_args()
     
-    # Check for requests module when actually running (not just --help)
+    # requests is only needed for the HTTP fallback
     global requests
     try:
         import requests as req
         requests = req
     except ImportError:
-        print("ERROR: requests module required for MCP stdio server", file=sys.stderr)
+        print("WARNING: requests module not installed; only the CCMaster Unix socket can be used", file=sys.stderr)
         print("Install with: pip install requests", file=sys.stderr)
-        sys.exit(1)
     
     # Set debug level if requested
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Create and run the bridge
-    bridge = StdioMCPBridge(args.host, args.port)
+    bridge = StdioMCPBridge(args.host, args.port, socket_path=args.socket, max_in_flight=args.max_in_flight)
     bridge.run()
 
 
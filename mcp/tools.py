@@ -7,6 +7,7 @@ and multi-agent coordination.
 
 import json
 import os
+import shutil
 import subprocess
 import sys
 import time
@@ -15,10 +16,60 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
 
+from .operations import OperationCancelled, cancellable_sleep, report_progress
+from .paging import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, page_limit, paginate, project
+from .idempotency import DEFAULT_MAX_ENTRIES, DEFAULT_TTL, IdempotencyCache
+from .jobgraph import JobGraph
+from .jobstore import POOL_PREFIX, JobStore, order_key, pool_queue
+from .tracing import annotate, span
+
 
 class SessionTools:
     """Tools for managing Claude Code sessions"""
     
+    # (tool, action) pairs that launch processes, drive the terminal or sleep;
+    # the MCP server runs them on a separate worker pool from quick queries
+    SLOW_CALLS = {
+        ("session", "create"),
+        ("session", "kill"),
+        ("session", "watch"),
+        ("session", "interrupt"),
+        ("session", "continue"),
+        ("session", "spawn_temp"),
+        ("session", "coordinate"),
+        ("communicate", "send_message"),
+        ("communicate", "send_to_member"),
+        ("communicate", "broadcast"),
+        ("kill_self", None),
+    }
+    
+    # (tool, action) pairs that only wait for other calls; the MCP server runs
+    # them on the request's own thread so they never hold a worker the awaited
+    # call might need
+    INLINE_CALLS = {
+        ("operation", "wait"),
+    }
+    
+    # (tool, action) pairs that change state; they accept an idempotency_key
+    MUTATING_CALLS = {
+        ("session", "create"),
+        ("session", "kill"),
+        ("session", "interrupt"),
+        ("session", "continue"),
+        ("session", "spawn_temp"),
+        ("session", "coordinate"),
+        ("communicate", "send_message"),
+        ("communicate", "send_to_member"),
+        ("communicate", "broadcast"),
+        ("communicate", "send_mail"),
+        ("communicate", "reply_mail"),
+        ("job", "send_to_session"),
+        ("job", "send_to_member"),
+        ("job", "send_to_pool"),
+        ("job", "cancel"),
+        ("job", "complete"),
+    }
+    
     def __init__(self, ccmaster_instance):
         self.ccmaster = ccmaster_instance
         # Team management: identity -> session_id mapping
@@ -32,9 +83,12 @@ class SessionTools:
         self.mailbox_dir = Path(os.path.expanduser("~/.ccmaster/mailbox"))
         self.mailbox_dir.mkdir(parents=True, exist_ok=True)
         
-        # Job queue system initialization
-        self.job_queue_dir = Path(os.path.expanduser("~/.ccmaster/job_queue"))
-        self.job_queue_dir.mkdir(parents=True, exist_ok=True)
+        # Job queues, shared with CCMaster's idle-time job dispatch
+        self.job_store = getattr(self.ccmaster, 'job_store', None) or JobStore()
+        self.job_graph = getattr(self.ccmaster, 'job_graph', None) or JobGraph(self.job_store)
+        
+        # Default page size for list actions (limit/cursor/fields)
+        self.page_size = self.ccmaster.config.get('mcp', {}).get('page_size', DEFAULT_PAGE_SIZE)
         
         self.tools = {
             # Consolidated tools
@@ -47,6 +101,34 @@ class SessionTools:
             "list_sessions": self.list_sessions,
             "kill_self": self.kill_self
         }
+        
+        # Recent results of mutating calls, so retries with the same idempotency_key don't repeat them
+        idempotency_config = self.ccmaster.config.get('mcp', {}).get('idempotency', {})
+        self.idempotency = IdempotencyCache(
+            ttl=idempotency_config.get('ttl', DEFAULT_TTL),
+            max_entries=idempotency_config.get('max_entries', DEFAULT_MAX_ENTRIES)
+        )
+        for tool_name in {tool for tool, _ in self.MUTATING_CALLS}:
+            self.tools[tool_name] = self.with_idempotency(tool_name, self.tools[tool_name])
+    
+    def with_idempotency(self, tool_name: str, func):
+        """Wrap a consolidated tool so its mutating actions honour idempotency_key"""
+        def call(**arguments):
+            key = arguments.pop('idempotency_key', None)
+            action = arguments.get('action')
+            if not key or (tool_name, action) not in self.MUTATING_CALLS:
+                return func(**arguments)
+            return self.idempotency.run((tool_name, action, key), arguments, lambda: func(**arguments))
+        return call
+    
+    def call_class(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Classify a tool call as 'slow' (launch/wait), 'fast' (query/update) or 'inline' (waits on other calls)"""
+        call = (tool_name, arguments.get("action"))
+        if call in self.INLINE_CALLS:
+            return "inline"
+        if call in self.SLOW_CALLS:
+            return "slow"
+        return "fast"
     
     def session(self, action: str, **kwargs) -> Dict[str, Any]:
         """Consolidated session management tool"""
@@ -106,6 +188,14 @@ class SessionTools:
             return self.job_status(**kwargs)
         elif action == "complete":
             return self.complete_job(**kwargs)
+        elif action == "send_to_pool":
+            return self.send_job_to_pool(**kwargs)
+        elif action == "join_pool":
+            return self.join_pool(**kwargs)
+        elif action == "leave_pool":
+            return self.leave_pool(**kwargs)
+        elif action == "list_pools":
+            return self.list_pools(**kwargs)
         else:
             return {"error": f"Unknown job action: {action}"}
     
@@ -178,6 +268,15 @@ class SessionTools:
                             "type": "integer",
                             "description": "Number of log lines to retrieve",
                             "default": 100
+                        },
+                        "idempotency_key": {
+                            "type": "string",
+                            "description": "Client-chosen key making create/spawn_temp/kill/interrupt/continue/coordinate safe to retry; repeats return the first result"
+                        },
+                        "async": {
+                            "type": "boolean",
+                            "description": "Return an operation handle immediately (track it with the operation tool)",
+                            "default": False
                         }
                     },
                     "required": ["action"]
@@ -260,6 +359,15 @@ class SessionTools:
                             "description": "Wait for response (message method)",
                             "default": False
                         },
+                        "idempotency_key": {
+                            "type": "string",
+                            "description": "Client-chosen key making send_message/send_to_member/broadcast/send_mail/reply_mail safe to retry; repeats return the first result"
+                        },
+                        "async": {
+                            "type": "boolean",
+                            "description": "Return an operation handle immediately (track it with the operation tool)",
+                            "default": False
+                        },
                         "mail_id": {
                             "type": "string",
                             "description": "Mail ID for reply"
@@ -271,8 +379,16 @@ class SessionTools:
                         },
                         "limit": {
                             "type": "integer",
-                            "description": "Limit number of results for check_mail/list_mail",
-                            "default": 10
+                            "description": "Page size for check_mail (default 10) and list_mail (default 50)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "next_cursor from the previous page of check_mail/list_mail"
+                        },
+                        "fields": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Only return these fields of each record in check_mail/list_mail"
                         },
                         "folder": {
                             "type": "string",
@@ -305,9 +421,19 @@ class SessionTools:
                     "properties": {
                         "action": {
                             "type": "string",
-                            "enum": ["send_to_session", "send_to_member", "list", "cancel", "get_status", "complete"],
+                            "enum": ["send_to_session", "send_to_member", "send_to_pool", "list", "cancel", "get_status", "complete",
+                                     "join_pool", "leave_pool", "list_pools"],
                             "description": "Job action to perform"
                         },
+                        "pool": {
+                            "type": "string",
+                            "description": "Pool name, e.g. developer (send_to_pool/join_pool/leave_pool); a pool job starts on whichever member goes idle first"
+                        },
+                        "pinned": {
+                            "type": "boolean",
+                            "description": "Keep the job on its session; otherwise idle teammates sharing a pool may take it over while that session is busy",
+                            "default": False
+                        },
                         "session_id": {
                             "type": "string",
                             "description": "Target session ID"
@@ -334,6 +460,15 @@ class SessionTools:
                             "type": "string",
                             "description": "Job ID for status/cancel/complete"
                         },
+                        "job_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Several job IDs for get_status, looked up in one call (use fields to trim each job)"
+                        },
+                        "idempotency_key": {
+                            "type": "string",
+                            "description": "Client-chosen key making send_to_session/send_to_member/send_to_pool/cancel/complete safe to retry; repeats return the first result"
+                        },
                         "reason": {
                             "type": "string",
                             "description": "Reason for cancellation"
@@ -361,6 +496,19 @@ class SessionTools:
                             "type": "array",
                             "items": {"type": "string"},
                             "description": "Filter by priority for list action"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Page size for list action (default 50, max 500)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "next_cursor from the previous page of list action"
+                        },
+                        "fields": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Only return these fields of each record in list action (and get_status with job_ids)"
                         }
                     },
                     "required": ["action"]
@@ -389,6 +537,19 @@ class SessionTools:
                             "type": "boolean",
                             "description": "Include inactive members",
                             "default": False
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Page size for list_members (default 50, max 500)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "next_cursor from the previous page of list_members"
+                        },
+                        "fields": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Only return these fields of each record in list_members"
                         }
                     },
                     "required": ["action"]
@@ -404,6 +565,19 @@ class SessionTools:
                             "type": "boolean",
                             "description": "Include ended sessions in the list",
                             "default": False
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Page size for the session list (default 50, max 500)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "next_cursor from the previous page of the session list"
+                        },
+                        "fields": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Only return these fields of each record in the session list"
                         }
                     }
                 }
@@ -455,7 +629,8 @@ class SessionTools:
             if hasattr(self.ccmaster, 'cli_log'):
                 self.ccmaster.cli_log(f"Warning: Could not restore team identities: {e}", log_type='warning')
     
-    def list_sessions(self, include_ended: bool = False) -> Dict[str, Any]:
+    def list_sessions(self, include_ended: bool = False, limit: int = None, cursor: str = None,
+                      fields: List[str] = None) -> Dict[str, Any]:
         """List all active sessions"""
         sessions = []
         for session_id, session_data in self.ccmaster.sessions.items():
@@ -473,12 +648,23 @@ class SessionTools:
             }
             sessions.append(session_info)
         
+        try:
+            page, next_cursor = self.paginate(sessions, "session_id", limit, cursor, fields)
+        except ValueError as e:
+            return {"error": str(e)}
+        
         return {
-            "sessions": sessions,
+            "sessions": page,
             "total_count": len(sessions),
-            "active_count": len(self.ccmaster.active_sessions)
+            "active_count": len(self.ccmaster.active_sessions),
+            "next_cursor": next_cursor
         }
     
+    def paginate(self, records: List[Dict[str, Any]], key: str, limit: int = None, cursor: str = None,
+                 fields: List[str] = None):
+        """Page and project a list result; raises ValueError for a bad cursor"""
+        return paginate(records, key, limit, cursor, fields, default_limit=self.page_size)
+    
     def get_session_status(self, session_id: str) -> Dict[str, Any]:
         """Get detailed status of a session"""
         if session_id not in self.ccmaster.sessions:
@@ -486,6 +672,7 @@ class SessionTools:
         
         session_data = self.ccmaster.sessions[session_id]
         current_status = self.ccmaster.current_status.get(session_id, 'unknown')
+        tracker = self.ccmaster.tool_latency.get(session_id)
         
         return {
             "session_id": session_id,
@@ -497,7 +684,8 @@ class SessionTools:
             "is_active": session_id in self.ccmaster.active_sessions,
             "watch_mode": self.ccmaster.watch_modes.get(session_id, False),
             "auto_continue_count": self.ccmaster.auto_continue_counts.get(session_id, 0),
-            "max_turns": self.ccmaster.max_turns.get(session_id)
+            "max_turns": self.ccmaster.max_turns.get(session_id),
+            "tool_latency": tracker.summary() if tracker else {}
         }
     
     def send_message_to_session(self, session_id: str, message: str, wait_for_response: bool = False) -> Dict[str, Any]:
@@ -507,7 +695,9 @@ class SessionTools:
         
         try:
             # Send message through CCMaster's existing mechanism
-            success = self.ccmaster.send_continue_to_claude(session_id, message)
+            annotate(session=session_id)
+            with span("deliver"):
+                success = self.ccmaster.send_continue_to_claude(session_id, message)
             
             result = {
                 "success": success,
@@ -518,11 +708,13 @@ class SessionTools:
             
             if wait_for_response:
                 # Wait for session to process the message
-                time.sleep(2)  # Simple wait - could be improved with actual response monitoring
+                cancellable_sleep(2)  # Simple wait - could be improved with actual response monitoring
                 result["session_status"] = self.ccmaster.current_status.get(session_id, 'unknown')
             
             return result
             
+        except OperationCancelled:
+            raise
         except Exception as e:
             return {"error": f"Failed to send message: {str(e)}"}
     
@@ -690,14 +882,7 @@ class SessionTools:
                     monitor_thread.start()
                     self.ccmaster.session_threads[session_id] = {'monitor': monitor_thread}
                     
-                    status_thread = threading.Thread(
-                        target=self.ccmaster.monitor_status,
-                        args=(session_id,),
-                        name=f"Status-{session_id}",
-                        daemon=True
-                    )
-                    status_thread.start()
-                    self.ccmaster.session_threads[session_id]['status'] = status_thread
+                    self.ccmaster.monitor_status(session_id)
                     
                 except Exception as e:
                     self.ccmaster.cli_log(f"Error launching MCP session: {e}", log_type='error')
@@ -714,7 +899,13 @@ class SessionTools:
             launch_thread.start()
             
             # Give it a moment to start
-            time.sleep(1)
+            report_progress(1, 2, f"Launching {session_id}")
+            try:
+                cancellable_sleep(1)
+            except OperationCancelled:
+                # The launch is already under way; cancelling only skips the wait
+                pass
+            report_progress(2, 2, f"{session_id} launched")
             
             return {
                 "success": True,
@@ -770,6 +961,7 @@ class SessionTools:
         """Spawn a temporary session, run a command, and kill it"""
         try:
             # Create temporary session
+            report_progress(0, 4, "Creating temporary session")
             session_result = self.create_session(working_dir, watch_mode=False, max_turns=1)
             
             if not session_result.get('success'):
@@ -777,23 +969,33 @@ class SessionTools:
             
             session_id = session_result['session_id']
             
-            # Wait for session to start
-            time.sleep(3)
-            
-            # Send command
-            message_result = self.send_message_to_session(session_id, command, wait_for_response=True)
-            
-            if not message_result.get('success'):
+            try:
+                # Wait for session to start
+                report_progress(1, 4, f"Waiting for {session_id} to start")
+                cancellable_sleep(3)
+                
+                # Send command
+                report_progress(2, 4, "Sending command")
+                message_result = self.send_message_to_session(session_id, command, wait_for_response=True)
+                
+                if not message_result.get('success'):
+                    self.kill_session(session_id)
+                    return message_result
+                
+                # Wait for execution or timeout
+                start_time = time.time()
+                while time.time() - start_time < timeout:
+                    status = self.get_session_status(session_id)
+                    if status.get('current_state') == 'idle':
+                        break
+                    report_progress(3, 4, f"Running ({int(time.time() - start_time)}s of {timeout}s)")
+                    cancellable_sleep(1)
+            except OperationCancelled:
+                # Don't leave the temporary session behind
                 self.kill_session(session_id)
-                return message_result
+                raise
             
-            # Wait for execution or timeout
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                status = self.get_session_status(session_id)
-                if status.get('current_state') == 'idle':
-                    break
-                time.sleep(1)
+            report_progress(4, 4, "Collecting logs")
             
             # Get logs before killing
             logs = self.get_session_logs(session_id, lines=50)
@@ -810,6 +1012,8 @@ class SessionTools:
                 "kill_result": kill_result
             }
             
+        except OperationCancelled:
+            raise
         except Exception as e:
             return {"error": f"Failed to spawn temp session: {str(e)}"}
     
@@ -1260,7 +1464,8 @@ Please acknowledge and begin working on your assigned subtask.
         except Exception as e:
             return {"error": f"Failed to send message to member: {str(e)}"}
     
-    def list_team_members(self, include_inactive: bool = False) -> Dict[str, Any]:
+    def list_team_members(self, include_inactive: bool = False, limit: int = None, cursor: str = None,
+                          fields: List[str] = None) -> Dict[str, Any]:
         """List all team members with their identities and status"""
         try:
             members = []
@@ -1294,11 +1499,13 @@ Please acknowledge and begin working on your assigned subtask.
             
             # Sort by identity for readability
             members.sort(key=lambda x: x['identity'])
+            page, next_cursor = self.paginate(members, "identity", limit, cursor, fields)
             
             return {
-                "team_members": members,
+                "team_members": page,
                 "active_count": len([m for m in members if m['is_active']]),
                 "total_count": len(members),
+                "next_cursor": next_cursor,
                 "message": f"Team has {len(members)} members ({len([m for m in members if m['is_active']])} active)"
             }
             
@@ -1533,7 +1740,8 @@ Please acknowledge and begin working on your assigned subtask.
         except Exception as e:
             return {"error": f"Failed to send mail: {str(e)}"}
     
-    def check_mail(self, unread_only: bool = True, limit: int = 10) -> Dict[str, Any]:
+    def check_mail(self, unread_only: bool = True, limit: int = 10, cursor: str = None,
+                   fields: List[str] = None) -> Dict[str, Any]:
         """Check mailbox for new messages"""
         try:
             # Get current session
@@ -1551,45 +1759,81 @@ Please acknowledge and begin working on your assigned subtask.
                     "message": "No mail in inbox"
                 }
             
-            # Load all mail files
-            mails = []
-            mail_files = sorted(inbox_path.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
+            # Newest first; listing the inbox and the read markers is enough to count and page
+            read_ids = self.mail_read_ids(current_session)
+            entries = []
+            with os.scandir(inbox_path) as listing:
+                for entry in listing:
+                    if entry.name.endswith('.json'):
+                        entries.append((entry.stat().st_mtime, entry.name[:-len('.json')]))
+            entries.sort(reverse=True)
+            
+            unread_count = len([mail_id for _, mail_id in entries if mail_id not in read_ids])
+            listed = [{"id": mail_id} for _, mail_id in entries if not (unread_only and mail_id in read_ids)]
             
-            for mail_file in mail_files[:limit]:
+            # Log mail check
+            if unread_count > 0:
+                self.ccmaster.cli_log(f"You have {unread_count} unread mail(s)", log_type='info', color='CYAN')
+            
+            # Only the mails on the requested page are read
+            refs, next_cursor = self.paginate(listed, "id", limit, cursor)
+            page = []
+            for ref in refs:
+                mail_file = inbox_path / f"{ref['id']}.json"
                 try:
                     with open(mail_file, 'r') as f:
                         mail_data = json.load(f)
-                    
-                    # Check if unread
-                    is_read = current_session in mail_data.get('read_by', [])
-                    if unread_only and is_read:
-                        continue
-                    
-                    # Add read status
-                    mail_data['is_read'] = is_read
-                    mails.append(mail_data)
-                    
                 except Exception as e:
                     self.ccmaster.cli_log(f"Error reading mail {mail_file}: {e}", log_type='warning')
-            
-            # Get unread count
-            unread_count = len([m for m in mails if not m['is_read']])
-            
-            # Log mail check
-            if unread_count > 0:
-                self.ccmaster.cli_log(f"You have {unread_count} unread mail(s)", log_type='info', color='CYAN')
+                    continue
+                mail_data['is_read'] = ref['id'] in read_ids or current_session in mail_data.get('read_by', [])
+                page.append(project(mail_data, fields))
             
             return {
                 "success": True,
-                "mail_count": len(mails),
+                "mail_count": len(page),
+                "total_count": len(listed),
                 "unread_count": unread_count,
-                "mails": mails,
-                "message": f"Found {len(mails)} mail(s), {unread_count} unread"
+                "mails": page,
+                "next_cursor": next_cursor,
+                "message": f"Found {len(listed)} mail(s), {unread_count} unread"
             }
             
         except Exception as e:
             return {"error": f"Failed to check mail: {str(e)}"}
     
+    def mail_read_ids(self, session_id: str) -> set:
+        """Ids of the inbox mails a session has read
+        
+        Each read mail has an empty marker file, mailbox/<session>/read/<mail id>,
+        so the read state is a directory listing rather than a decode of every
+        mail. Mailboxes from before the markers are indexed once from read_by.
+        """
+        read_dir = self.mailbox_dir / session_id / "read"
+        if not read_dir.is_dir():
+            # Built aside and renamed into place, so a concurrent reader never sees half an index
+            staging = read_dir.with_name(f"read.{uuid.uuid4().hex[:8]}")
+            staging.mkdir(parents=True)
+            for mail_file in (self.mailbox_dir / session_id / "inbox").glob("*.json"):
+                try:
+                    with open(mail_file, 'r') as f:
+                        read_by = json.load(f).get('read_by', [])
+                except (OSError, ValueError, AttributeError):
+                    continue
+                if session_id in read_by:
+                    (staging / mail_file.stem).touch()
+            try:
+                os.rename(staging, read_dir)
+            except OSError:
+                # Another caller indexed it first
+                shutil.rmtree(staging, ignore_errors=True)
+        return set(os.listdir(read_dir))
+    
+    def mark_mail_read(self, session_id: str, mail_id: str):
+        """Record that a session has read one of its inbox mails"""
+        self.mail_read_ids(session_id)
+        (self.mailbox_dir / session_id / "read" / mail_id).touch()
+    
     def reply_mail(self, mail_id: str, body: str, reply_all: bool = False) -> Dict[str, Any]:
         """Reply to a mail message"""
         try:
@@ -1614,6 +1858,7 @@ Please acknowledge and begin working on your assigned subtask.
                 original_mail.setdefault('read_by', []).append(current_session)
                 with open(mail_file, 'w') as f:
                     json.dump(original_mail, f, indent=2)
+            self.mark_mail_read(current_session, mail_id)
             
             # Determine recipients
             recipients = []
@@ -1663,79 +1908,84 @@ Please acknowledge and begin working on your assigned subtask.
             return {"error": f"Failed to reply to mail: {str(e)}"}
     
     def list_mail(self, folder: str = "inbox", unread_only: bool = False, 
-                  from_session: str = None, priority: str = None) -> Dict[str, Any]:
-        """List mail messages with filtering"""
+                  from_session: str = None, priority: str = None, limit: int = None,
+                  cursor: str = None, fields: List[str] = None) -> Dict[str, Any]:
+        """List mail messages with filtering
+        
+        Mails are listed newest first from the folders' file listings and the
+        read markers, so only the mails on the page are read. The counts come
+        from that listing too: they cover unread_only, but not the from_session
+        and priority filters, which need each mail's contents.
+        """
         try:
             # Get current session
             current_session = os.environ.get('CCMASTER_SESSION_ID', 'unknown')
             if current_session == 'unknown':
                 return {"error": "Cannot determine session ID for mail listing"}
             
-            # Determine folder path
-            if folder == "inbox":
-                folder_path = self.mailbox_dir / current_session / "inbox"
-            elif folder == "sent":
-                folder_path = self.mailbox_dir / current_session / "sent"
-            else:  # all
-                # List both inbox and sent
-                inbox_path = self.mailbox_dir / current_session / "inbox"
-                sent_path = self.mailbox_dir / current_session / "sent"
-                folder_path = None
-            
-            mails = []
-            
-            # Helper function to load and filter mails
-            def load_mails_from_folder(path, mail_type):
-                if not path.exists():
-                    return
-                
-                for mail_file in sorted(path.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True):
-                    try:
-                        with open(mail_file, 'r') as f:
-                            mail_data = json.load(f)
-                        
-                        # Apply filters
-                        if from_session and mail_data.get('from') != from_session:
-                            continue
-                        
-                        if priority and mail_data.get('priority') != priority:
+            # inbox, sent, or both for "all"
+            folders = [folder] if folder in ("inbox", "sent") else ["inbox", "sent"]
+            read_ids = self.mail_read_ids(current_session) if "inbox" in folders else set()
+            
+            # (-mtime, mail id, folder, is_read), newest first
+            entries = []
+            for mail_type in folders:
+                path = self.mailbox_dir / current_session / mail_type
+                if not path.is_dir():
+                    continue
+                with os.scandir(path) as listing:
+                    for entry in listing:
+                        if not entry.name.endswith('.json'):
                             continue
-                        
-                        is_read = current_session in mail_data.get('read_by', [])
+                        mail_id = entry.name[:-len('.json')]
+                        is_read = mail_type == "inbox" and mail_id in read_ids
                         if unread_only and is_read:
                             continue
-                        
-                        # Add metadata
-                        mail_data['is_read'] = is_read
-                        mail_data['folder'] = mail_type
-                        
-                        mails.append(mail_data)
-                        
-                    except Exception as e:
-                        self.ccmaster.cli_log(f"Error reading mail {mail_file}: {e}", log_type='warning')
-            
-            # Load mails based on folder selection
-            if folder_path:
-                load_mails_from_folder(folder_path, folder)
-            else:
-                if inbox_path:
-                    load_mails_from_folder(inbox_path, "inbox")
-                if sent_path:
-                    load_mails_from_folder(sent_path, "sent")
-            
-            # Sort by timestamp
-            mails.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+                        entries.append((-entry.stat().st_mtime, mail_id, mail_type, is_read))
+            entries.sort()
             
             # Summary statistics
-            total_count = len(mails)
-            unread_count = len([m for m in mails if not m.get('is_read', False) and m.get('folder') == 'inbox'])
+            total_count = len(entries)
+            unread_count = len([entry for entry in entries if entry[2] == "inbox" and not entry[3]])
+            
+            # Read mails from the cursor on until the page is full
+            limit = page_limit(limit, self.page_size)
+            start = self.mail_cursor(cursor, entries)
+            page = []
+            index = start
+            while index < len(entries) and len(page) < limit:
+                _, mail_id, mail_type, is_read = entries[index]
+                index += 1
+                mail_file = self.mailbox_dir / current_session / mail_type / f"{mail_id}.json"
+                try:
+                    with open(mail_file, 'r') as f:
+                        mail_data = json.load(f)
+                except Exception as e:
+                    self.ccmaster.cli_log(f"Error reading mail {mail_file}: {e}", log_type='warning')
+                    continue
+                
+                # Apply filters
+                if from_session and mail_data.get('from') != from_session:
+                    continue
+                if priority and mail_data.get('priority') != priority:
+                    continue
+                
+                # Add metadata
+                mail_data['is_read'] = is_read or current_session in mail_data.get('read_by', [])
+                mail_data['folder'] = mail_type
+                page.append(project(mail_data, fields))
+            
+            next_cursor = None
+            if index < len(entries):
+                next_cursor = encode_cursor(index, list(entries[index - 1][:3]))
             
             return {
                 "success": True,
                 "folder": folder,
                 "total_count": total_count,
                 "unread_count": unread_count,
-                "mails": mails,
+                "mails": page,
+                "next_cursor": next_cursor,
                 "filters": {
                     "unread_only": unread_only,
                     "from_session": from_session,
@@ -1746,46 +1996,92 @@ Please acknowledge and begin working on your assigned subtask.
         except Exception as e:
             return {"error": f"Failed to list mail: {str(e)}"}
     
+    def mail_cursor(self, cursor: str, entries: List[tuple]) -> int:
+        """Index in a list_mail listing to resume from; raises ValueError for a bad cursor"""
+        if not cursor:
+            return 0
+        anchor = decode_cursor(cursor).get("a")
+        if isinstance(anchor, list) and len(anchor) == 3:
+            # Right after the (-mtime, mail id, folder) of the last mail returned, even if it is gone
+            position = tuple(anchor)
+            return next((index for index, entry in enumerate(entries) if entry[:3] > position), len(entries))
+        # Cursors issued before mail was paged from the listing anchor on the mail id
+        for index, entry in enumerate(entries):
+            if entry[1] == anchor:
+                return index + 1
+        raise ValueError(f"Invalid cursor: {cursor}")
+    
+    def add_job(self, assigned_to: str, title: str, description: str, priority: str = "p1",
+                deadline: str = None, dependencies: List[str] = None, **extra) -> Dict[str, Any]:
+        """Validate and store a new job; returns the job, or {"error": ...}"""
+        # Get sender info
+        sender_session = os.environ.get('CCMASTER_SESSION_ID', 'unknown')
+        sender_identity = self.session_identities.get(sender_session, sender_session)
+        
+        # Create job data
+        job_id = f"job_{uuid.uuid4().hex[:8]}"
+        
+        # Dependencies may be queued for any session, but must already exist
+        dependency_error = self.job_graph.check_dependencies(dependencies or [])
+        if dependency_error:
+            return {"error": dependency_error}
+        job_data = {
+            "id": job_id,
+            "title": title,
+            "description": description,
+            "priority": priority,
+            "status": "pending",
+            "created_by": sender_session,
+            "created_by_identity": sender_identity,
+            "assigned_to": assigned_to,
+            "created_at": datetime.now().isoformat(),
+            "deadline": deadline,
+            "dependencies": dependencies or [],
+            "started_at": None,
+            "completed_at": None,
+            "result": None,
+            "artifacts": []
+        }
+        job_data.update(extra)
+        
+        # Save job to its queue; an idle session that can run it starts it right away
+        self.job_store.add(job_data)
+        self.dispatch_jobs(self.job_graph.sync(), f"job {job_id} queued")
+        return job_data
+    
+    def dispatch_jobs(self, queues, reason: str):
+        """Ask CCMaster to offer jobs now to idle sessions that could take work from these queues
+        
+        That is the sessions themselves, the members of pools among them, and
+        the pool-mates of the sessions, who may steal their jobs.
+        """
+        sessions = set()
+        for queue in queues:
+            if not queue:
+                continue
+            if queue.startswith(POOL_PREFIX):
+                sessions.update(self.job_store.pool_members(queue[len(POOL_PREFIX):]))
+                continue
+            sessions.add(queue)
+            for pool in self.job_store.pools_of(queue):
+                sessions.update(self.job_store.pool_members(pool))
+        if sessions:
+            self.ccmaster.request_job_dispatch(sessions, reason)
+    
     def send_job_to_session(self, session_id: str, title: str, description: str, 
                            priority: str = "p1", deadline: str = None, 
-                           dependencies: List[str] = None) -> Dict[str, Any]:
+                           dependencies: List[str] = None, pinned: bool = False) -> Dict[str, Any]:
         """Send a job to a session's job queue"""
         try:
             # Validate session exists
             if session_id not in self.ccmaster.sessions:
                 return {"error": f"Session {session_id} not found"}
             
-            # Get sender info
-            sender_session = os.environ.get('CCMASTER_SESSION_ID', 'unknown')
-            sender_identity = self.session_identities.get(sender_session, sender_session)
-            
-            # Create job data
-            job_id = f"job_{uuid.uuid4().hex[:8]}"
-            job_data = {
-                "id": job_id,
-                "title": title,
-                "description": description,
-                "priority": priority,
-                "status": "pending",
-                "created_by": sender_session,
-                "created_by_identity": sender_identity,
-                "assigned_to": session_id,
-                "created_at": datetime.now().isoformat(),
-                "deadline": deadline,
-                "dependencies": dependencies or [],
-                "started_at": None,
-                "completed_at": None,
-                "result": None,
-                "artifacts": []
-            }
-            
-            # Save job to target session's queue
-            session_queue_dir = self.job_queue_dir / session_id
-            session_queue_dir.mkdir(parents=True, exist_ok=True)
-            
-            job_file = session_queue_dir / f"{job_id}.json"
-            with open(job_file, 'w') as f:
-                json.dump(job_data, f, indent=2)
+            job_data = self.add_job(session_id, title, description, priority, deadline, dependencies,
+                                    pinned=bool(pinned))
+            if "error" in job_data:
+                return job_data
+            job_id = job_data["id"]
             
             # Log the job assignment with more details
             target_identity = self.session_identities.get(session_id, session_id)
@@ -1816,7 +2112,7 @@ Please acknowledge and begin working on your assigned subtask.
     
     def send_job_to_member(self, member: str, title: str, description: str,
                           priority: str = "p1", deadline: str = None,
-                          dependencies: List[str] = None) -> Dict[str, Any]:
+                          dependencies: List[str] = None, pinned: bool = False) -> Dict[str, Any]:
         """Send a job to a team member by their identity"""
         try:
             # Look up session ID by member identity
@@ -1835,7 +2131,8 @@ Please acknowledge and begin working on your assigned subtask.
                 description=description,
                 priority=priority,
                 deadline=deadline,
-                dependencies=dependencies
+                dependencies=dependencies,
+                pinned=pinned
             )
             
             # Add member info to result
@@ -1847,8 +2144,125 @@ Please acknowledge and begin working on your assigned subtask.
         except Exception as e:
             return {"error": f"Failed to send job to member: {str(e)}"}
     
+    def send_job_to_pool(self, pool: str, title: str, description: str,
+                         priority: str = "p1", deadline: str = None,
+                         dependencies: List[str] = None) -> Dict[str, Any]:
+        """Send a job to a pool; the first member to go idle runs it"""
+        try:
+            members = self.job_store.pool_members(pool)
+            
+            job_data = self.add_job(pool_queue(pool), title, description, priority, deadline, dependencies,
+                                    pool=pool)
+            if "error" in job_data:
+                return job_data
+            job_id = job_data["id"]
+            
+            self.ccmaster.cli_log(f"📋 Job '{title}' ({priority}) → pool '{pool}' ({len(members)} members)", 
+                                log_type='info', color='MAGENTA')
+            
+            result = {
+                "success": True,
+                "job_id": job_id,
+                "title": title,
+                "pool": pool,
+                "members": [self.session_identities.get(member, member) for member in members],
+                "priority": priority,
+                "message": f"Job {job_id} added to pool '{pool}'"
+            }
+            if not members:
+                result["warning"] = f"Pool '{pool}' has no members yet; the job waits until one joins"
+            return result
+            
+        except Exception as e:
+            return {"error": f"Failed to send job to pool: {str(e)}"}
+    
+    def resolve_pool_member(self, member: str = None, session_id: str = None):
+        """Session id for a pool membership change: a member identity, a session id, or the caller"""
+        if member:
+            return self.team_members.get(member)
+        if session_id:
+            return session_id if session_id in self.ccmaster.sessions else None
+        current_session = os.environ.get('CCMASTER_SESSION_ID', 'unknown')
+        return current_session if current_session in self.ccmaster.sessions else None
+    
+    def join_pool(self, pool: str, member: str = None, session_id: str = None) -> Dict[str, Any]:
+        """Add a session to a job pool"""
+        try:
+            target = self.resolve_pool_member(member, session_id)
+            if not target:
+                return {"error": f"Session to add not found: {member or session_id or 'current session'}"}
+            
+            joined = self.job_store.join_pool(pool, target)
+            identity = self.session_identities.get(target, target)
+            if joined:
+                self.ccmaster.cli_log(f"👥 {identity} joined pool '{pool}'", log_type='info', color='CYAN')
+                # The pool may already have work waiting
+                self.ccmaster.request_job_dispatch([target], f"joined pool {pool}")
+            
+            return {
+                "success": True,
+                "pool": pool,
+                "member": identity,
+                "session_id": target,
+                "message": f"{identity} {'joined' if joined else 'is already in'} pool '{pool}'"
+            }
+            
+        except Exception as e:
+            return {"error": f"Failed to join pool: {str(e)}"}
+    
+    def leave_pool(self, pool: str, member: str = None, session_id: str = None) -> Dict[str, Any]:
+        """Remove a session from a job pool"""
+        try:
+            target = self.resolve_pool_member(member, session_id)
+            if not target:
+                return {"error": f"Session to remove not found: {member or session_id or 'current session'}"}
+            
+            if not self.job_store.leave_pool(pool, target):
+                return {"error": f"{self.session_identities.get(target, target)} is not in pool '{pool}'"}
+            
+            identity = self.session_identities.get(target, target)
+            self.ccmaster.cli_log(f"👥 {identity} left pool '{pool}'", log_type='info', color='CYAN')
+            return {
+                "success": True,
+                "pool": pool,
+                "member": identity,
+                "session_id": target,
+                "message": f"{identity} left pool '{pool}'"
+            }
+            
+        except Exception as e:
+            return {"error": f"Failed to leave pool: {str(e)}"}
+    
+    def list_pools(self) -> Dict[str, Any]:
+        """List job pools with their members and waiting jobs"""
+        try:
+            pools = {}
+            for pool, members in self.job_store.pools().items():
+                counts = self.job_store.counts(pool_queue(pool))
+                pools[pool] = {
+                    "members": [
+                        {
+                            "session_id": member,
+                            "identity": self.session_identities.get(member, member),
+                            "status": self.ccmaster.current_status.get(member, 'unknown')
+                        }
+                        for member in members
+                    ],
+                    "pending_jobs": counts.get('pending', 0)
+                }
+            
+            return {
+                "success": True,
+                "pools": pools,
+                "total_count": len(pools)
+            }
+            
+        except Exception as e:
+            return {"error": f"Failed to list pools: {str(e)}"}
+    
     def list_jobs(self, session_id: str = None, status_filter: List[str] = None,
-                  priority_filter: List[str] = None) -> Dict[str, Any]:
+                  priority_filter: List[str] = None, limit: int = None, cursor: str = None,
+                  fields: List[str] = None) -> Dict[str, Any]:
         """List jobs in the queue"""
         try:
             # Use current session if not specified
@@ -1857,54 +2271,24 @@ Please acknowledge and begin working on your assigned subtask.
                 if session_id == 'unknown':
                     return {"error": "Cannot determine session ID for job listing"}
             
-            # Get session's job queue directory
-            session_queue_dir = self.job_queue_dir / session_id
-            if not session_queue_dir.exists():
-                return {
-                    "success": True,
-                    "jobs": [],
-                    "total_count": 0,
-                    "message": "No jobs in queue"
-                }
+            # Counted and paged by the job store, so a page costs the same however long the backlog is
+            status_counts = self.job_store.counts(session_id, statuses=status_filter, priorities=priority_filter)
+            limit = page_limit(limit, self.page_size)
+            offset, after = self.job_cursor(cursor)
             
-            # Load all job files
-            jobs = []
-            for job_file in session_queue_dir.glob("*.json"):
-                try:
-                    with open(job_file, 'r') as f:
-                        job_data = json.load(f)
-                    
-                    # Apply filters
-                    if status_filter and job_data.get('status') not in status_filter:
-                        continue
-                    
-                    if priority_filter and job_data.get('priority') not in priority_filter:
-                        continue
-                    
-                    jobs.append(job_data)
-                    
-                except Exception as e:
-                    self.ccmaster.cli_log(f"Error reading job {job_file}: {e}", log_type='warning')
-            
-            # Sort by priority (p0 first) and creation time
-            priority_order = {"p0": 0, "p1": 1, "p2": 2}
-            jobs.sort(key=lambda x: (
-                priority_order.get(x.get('priority', 'p1'), 1),
-                x.get('created_at', '')
-            ))
-            
-            # Count by status
-            status_counts = {
-                "pending": len([j for j in jobs if j.get('status') == 'pending']),
-                "doing": len([j for j in jobs if j.get('status') == 'doing']),
-                "done": len([j for j in jobs if j.get('status') == 'done']),
-                "cancelled": len([j for j in jobs if j.get('status') == 'cancelled'])
-            }
+            # Queue order: priority (p0 first), then creation time; one extra row tells whether there is more
+            jobs = self.job_store.page(session_id, statuses=status_filter, priorities=priority_filter,
+                                       after=after, limit=limit + 1)
+            page = jobs[:limit]
+            next_cursor = None
+            if len(jobs) > limit:
+                next_cursor = encode_cursor(offset + len(page), list(order_key(page[-1])))
             
             return {
                 "success": True,
-                "jobs": jobs,
-                "total_count": len(jobs),
+                "jobs": [project(job, fields) for job in page],
+                "total_count": sum(status_counts.values()),
+                "next_cursor": next_cursor,
                 "status_counts": status_counts,
                 "session_id": session_id,
                 "session_identity": self.session_identities.get(session_id, session_id)
@@ -1913,52 +2297,46 @@ Please acknowledge and begin working on your assigned subtask.
         except Exception as e:
             return {"error": f"Failed to list jobs: {str(e)}"}
     
+    def job_cursor(self, cursor: str = None):
+        """(offset, order key to resume after) of a job list cursor; raises ValueError for a bad cursor"""
+        if not cursor:
+            return 0, None
+        position = decode_cursor(cursor)
+        anchor = position.get("a")
+        if isinstance(anchor, list) and len(anchor) == 3:
+            return int(position["o"]), tuple(anchor)
+        # Cursors issued before job lists were paged by the store anchor on the job id
+        job = self.job_store.get(anchor) if isinstance(anchor, str) else None
+        if job is None:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return int(position["o"]), order_key(job)
+    
     def cancel_job(self, job_id: str, reason: str = None) -> Dict[str, Any]:
         """Cancel a pending job"""
         try:
             # Get current session
             current_session = os.environ.get('CCMASTER_SESSION_ID', 'unknown')
             
-            # Find the job file
-            job_file = None
-            job_data = None
-            
-            # Search in current session's queue first
-            if current_session != 'unknown':
-                session_queue_dir = self.job_queue_dir / current_session
-                potential_file = session_queue_dir / f"{job_id}.json"
-                if potential_file.exists():
-                    job_file = potential_file
-            
-            # If not found, search all queues
-            if not job_file:
-                for queue_dir in self.job_queue_dir.iterdir():
-                    if queue_dir.is_dir():
-                        potential_file = queue_dir / f"{job_id}.json"
-                        if potential_file.exists():
-                            job_file = potential_file
-                            break
-            
-            if not job_file:
-                return {"error": f"Job {job_id} not found"}
+            # Update job status, unless it already finished
+            job_data, cancelled = self.job_store.update(job_id, {
+                'status': 'cancelled',
+                'cancelled_at': datetime.now().isoformat(),
+                'cancelled_by': current_session,
+                'cancel_reason': reason
+            }, allowed=('pending', 'doing'))
             
-            # Load job data
-            with open(job_file, 'r') as f:
-                job_data = json.load(f)
+            if not job_data:
+                return {"error": f"Job {job_id} not found"}
             
             # Check if job can be cancelled
-            if job_data.get('status') not in ['pending', 'doing']:
+            if not cancelled:
                 return {"error": f"Job {job_id} is {job_data.get('status')}, cannot cancel"}
             
-            # Update job status
-            job_data['status'] = 'cancelled'
-            job_data['cancelled_at'] = datetime.now().isoformat()
-            job_data['cancelled_by'] = current_session
-            job_data['cancel_reason'] = reason
-            
-            # Save updated job
-            with open(job_file, 'w') as f:
-                json.dump(job_data, f, indent=2)
+            # A session whose running job was cancelled is free for its next one
+            sessions = self.job_graph.sync()
+            if job_data.get('status') == 'doing':
+                sessions.add(job_data.get('assigned_to'))
+            self.dispatch_jobs(sessions, f"job {job_id} cancelled")
             
             # Log cancellation
             self.ccmaster.cli_log(f"Job '{job_data['title']}' cancelled{' - ' + reason if reason else ''}", 
@@ -1975,28 +2353,18 @@ Please acknowledge and begin working on your assigned subtask.
         except Exception as e:
             return {"error": f"Failed to cancel job: {str(e)}"}
     
-    def job_status(self, job_id: str) -> Dict[str, Any]:
+    def job_status(self, job_id: str = None, job_ids: List[str] = None, fields: List[str] = None) -> Dict[str, Any]:
         """Get detailed status of a job"""
+        if job_ids is not None:
+            return self.job_statuses(job_ids, fields)
+        if not job_id:
+            return {"error": "job_id or job_ids is required"}
+        
         try:
-            # Find the job file
-            job_file = None
-            job_data = None
-            
-            # Search all queues
-            for queue_dir in self.job_queue_dir.iterdir():
-                if queue_dir.is_dir():
-                    potential_file = queue_dir / f"{job_id}.json"
-                    if potential_file.exists():
-                        job_file = potential_file
-                        break
-            
-            if not job_file:
+            job_data = self.job_store.get(job_id)
+            if not job_data:
                 return {"error": f"Job {job_id} not found"}
             
-            # Load job data
-            with open(job_file, 'r') as f:
-                job_data = json.load(f)
-            
             # Add computed fields
             job_data['assigned_to_identity'] = self.session_identities.get(
                 job_data.get('assigned_to'), job_data.get('assigned_to')
@@ -2004,25 +2372,17 @@ Please acknowledge and begin working on your assigned subtask.
             
             # Check dependencies status
             if job_data.get('dependencies'):
+                dep_jobs = self.job_store.get_many(job_data['dependencies'])
                 dep_status = []
                 for dep_id in job_data['dependencies']:
-                    # Try to find dependency job
-                    dep_found = False
-                    for queue_dir in self.job_queue_dir.iterdir():
-                        if queue_dir.is_dir():
-                            dep_file = queue_dir / f"{dep_id}.json"
-                            if dep_file.exists():
-                                with open(dep_file, 'r') as f:
-                                    dep_data = json.load(f)
-                                dep_status.append({
-                                    "id": dep_id,
-                                    "status": dep_data.get('status'),
-                                    "title": dep_data.get('title')
-                                })
-                                dep_found = True
-                                break
-                    
-                    if not dep_found:
+                    dep_data = dep_jobs.get(dep_id)
+                    if dep_data:
+                        dep_status.append({
+                            "id": dep_id,
+                            "status": dep_data.get('status'),
+                            "title": dep_data.get('title')
+                        })
+                    else:
                         dep_status.append({
                             "id": dep_id,
                             "status": "not_found",
@@ -2039,6 +2399,31 @@ Please acknowledge and begin working on your assigned subtask.
         except Exception as e:
             return {"error": f"Failed to get job status: {str(e)}"}
     
+    def job_statuses(self, job_ids: List[str], fields: List[str] = None) -> Dict[str, Any]:
+        """Look up many jobs at once, by id"""
+        try:
+            if fields and set(fields) <= {"id", "assigned_to", "assigned_to_identity", "status"}:
+                # Served from the id index alone
+                jobs = {job_id: dict(located, id=job_id) for job_id, located in self.job_store.locate(job_ids).items()}
+            else:
+                jobs = self.job_store.get_many(job_ids)
+            
+            found = {}
+            for job_id, job_data in jobs.items():
+                job_data['assigned_to_identity'] = self.session_identities.get(
+                    job_data.get('assigned_to'), job_data.get('assigned_to')
+                )
+                found[job_id] = project(job_data, fields)
+            
+            return {
+                "success": True,
+                "jobs": found,
+                "not_found": [job_id for job_id in dict.fromkeys(job_ids) if job_id not in found]
+            }
+            
+        except Exception as e:
+            return {"error": f"Failed to get job status: {str(e)}"}
+    
     def complete_job(self, job_id: str, result: str, artifacts: List[str] = None) -> Dict[str, Any]:
         """Mark a job as completed"""
         try:
@@ -2047,17 +2432,17 @@ Please acknowledge and begin working on your assigned subtask.
             if current_session == 'unknown':
                 return {"error": "Cannot determine session ID"}
             
-            # Find job in current session's queue
-            session_queue_dir = self.job_queue_dir / current_session
-            job_file = session_queue_dir / f"{job_id}.json"
+            # Update job data; only jobs in the current session's queue can be completed
+            job_data, completed = self.job_store.update(job_id, {
+                'status': 'done',
+                'completed_at': datetime.now().isoformat(),
+                'result': result,
+                'artifacts': artifacts or []
+            }, allowed=('pending', 'doing'), assigned_to=current_session)
             
-            if not job_file.exists():
+            if not job_data:
                 return {"error": f"Job {job_id} not found in your queue"}
             
-            # Load job data
-            with open(job_file, 'r') as f:
-                job_data = json.load(f)
-            
             # Check if job can be completed
             if job_data.get('status') == 'done':
                 return {"error": f"Job {job_id} is already completed"}
@@ -2065,15 +2450,13 @@ Please acknowledge and begin working on your assigned subtask.
             if job_data.get('status') == 'cancelled':
                 return {"error": f"Job {job_id} is cancelled"}
             
-            # Update job data
-            job_data['status'] = 'done'
-            job_data['completed_at'] = datetime.now().isoformat()
-            job_data['result'] = result
-            job_data['artifacts'] = artifacts or []
+            if not completed:
+                return {"error": f"Job {job_id} is {job_data.get('status')}, cannot complete"}
+            
+            job_data = completed
             
-            # Save updated job
-            with open(job_file, 'w') as f:
-                json.dump(job_data, f, indent=2)
+            # Jobs waiting on this one may now be ready, in any session's queue
+            self.dispatch_jobs(self.job_graph.sync(), f"job {job_id} completed")
             
             # Log completion with details
             current_identity = self.session_identities.get(current_session, current_session)
@@ -0,0 +1,287 @@
+"""
+Request tracing for CCMaster MCP tool calls
+
+Every tools/call carries a trace id in `params._meta.traceId`. The stdio
+bridge adds one when the client did not, and the server makes one up for
+clients that talk to it directly. The id is returned in the result's
+`_meta`.
+
+Each process times its own stages and appends one compact JSON line per
+trace to ~/.ccmaster/logs/traces.log:
+
+    {"id": "9c1b7d4e5f60a2b3", "src": "server", "ts": 1737300000.12, "ms": 512.3,
+     "spans": [["queue", 0.0, 0.2], ["tool", 0.2, 510.8], ["osascript", 1.1, 505.0]],
+     "tool": "communicate", "action": "send_to_member", "session": "..."}
+
+Span entries are [name, start offset ms, duration ms] relative to "ts".
+`ccmaster trace <id>` merges the bridge and server records into a single
+timeline.
+
+Code running on behalf of a traced call times its stages with span(). It
+finds the trace through a thread-local, so outside a traced call span() is
+a no-op and callers can use it unconditionally.
+
+Configured from the "mcp.trace" section of ~/.ccmaster/config.json:
+
+    "trace": {
+        "enabled": true,
+        "max_bytes": 4194304,   # rotate the log once it passes this size
+        "backups": 2            # rotated files kept (traces.log.1, .2, ...)
+    }
+
+This module has no package-relative imports, because the stdio bridge loads
+it as a plain script.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_TRACE_CONFIG = {
+    'enabled': True,
+    'max_bytes': 4 * 1024 * 1024,
+    'backups': 2
+}
+
+
+def default_trace_path() -> str:
+    return str(Path.home() / '.ccmaster' / 'logs' / 'traces.log')
+
+
+def load_trace_config(config_file=None) -> Dict[str, Any]:
+    """Read mcp.trace from config.json, falling back to the defaults"""
+    config_file = config_file or Path.home() / '.ccmaster' / 'config.json'
+    trace_config = dict(DEFAULT_TRACE_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            trace_config.update(json.load(f).get('mcp', {}).get('trace', {}))
+    except (OSError, ValueError, AttributeError):
+        pass
+    return trace_config
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def message_trace_id(params: Any) -> Optional[str]:
+    """Trace id carried in a request's params._meta, if any"""
+    if not isinstance(params, dict):
+        return None
+    meta = params.get('_meta')
+    if isinstance(meta, dict) and isinstance(meta.get('traceId'), str):
+        return meta['traceId']
+    return None
+
+
+_context = threading.local()
+
+
+def current_trace() -> Optional['Trace']:
+    """Trace of the call running on this thread, if any"""
+    return getattr(_context, 'trace', None)
+
+
+@contextmanager
+def activate(trace: Optional['Trace']):
+    """Make trace current on this thread for the duration of the block"""
+    previous = current_trace()
+    _context.trace = trace
+    try:
+        yield trace
+    finally:
+        _context.trace = previous
+
+
+@contextmanager
+def span(name: str):
+    """Time a stage of the current trace"""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    with trace.span(name):
+        yield
+
+
+def annotate(**attrs):
+    """Attach attributes (e.g. the target session) to the current trace"""
+    trace = current_trace()
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+class Trace:
+    """Stage timings one process records for one traced request"""
+    
+    def __init__(self, trace_id: str, source: str, **attrs):
+        self.id = trace_id
+        self.source = source
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self.spans = []  # [name, offset ms, duration ms]
+        self.lock = threading.Lock()
+        self.pending = 1  # Parties that must finish() before the record is written
+        self.log = None
+    
+    def _ms(self, seconds: float) -> float:
+        return round(seconds * 1000, 3)
+    
+    def add_span(self, name: str, start: float, end: float):
+        """Record a stage given perf_counter() start and end times"""
+        with self.lock:
+            self.spans.append([name, self._ms(start - self.start), self._ms(end - start)])
+    
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter())
+    
+    def hold(self):
+        """Delay the record until one more finish(), e.g. for a call still running on a worker"""
+        with self.lock:
+            self.pending += 1
+    
+    def finish(self, log: 'TraceLog' = None, **attrs):
+        """Close the trace; the last party to finish writes it"""
+        with self.lock:
+            self.attrs.update(attrs)
+            self.log = log or self.log
+            self.pending -= 1
+            if self.pending > 0:
+                return
+            self.end = time.perf_counter()
+        if self.log:
+            self.log.write(self)
+    
+    def to_record(self) -> Dict[str, Any]:
+        end = self.end if self.end is not None else time.perf_counter()
+        with self.lock:
+            spans = sorted(self.spans, key=lambda s: s[1])
+        record = {
+            "id": self.id,
+            "src": self.source,
+            "ts": round(self.started_at, 6),
+            "ms": self._ms(end - self.start),
+            "spans": spans
+        }
+        record.update({key: value for key, value in self.attrs.items() if value is not None})
+        return record
+
+
+def traced(trace: Trace, func: Callable) -> Callable:
+    """Wrap a function submitted to a worker pool so it runs under trace
+    
+    The time spent waiting for a worker is recorded as "queue" and the call
+    itself as "tool". The trace is held open until the call returns, so a
+    call that outlives its request is still recorded in full.
+    """
+    trace.hold()
+    submitted = time.perf_counter()
+    
+    def run(**arguments):
+        started = time.perf_counter()
+        trace.add_span("queue", submitted, started)
+        try:
+            with activate(trace):
+                return func(**arguments)
+        finally:
+            trace.add_span("tool", started, time.perf_counter())
+            trace.finish()
+    
+    return run
+
+
+class TraceLog:
+    """Size-capped trace log shared by CCMaster and its stdio bridges"""
+    
+    def __init__(self, config: Dict[str, Any] = None, path: str = None):
+        config = dict(DEFAULT_TRACE_CONFIG, **(config if config is not None else load_trace_config()))
+        self.enabled = bool(config.get('enabled', True))
+        self.max_bytes = int(config.get('max_bytes', DEFAULT_TRACE_CONFIG['max_bytes']))
+        self.backups = max(int(config.get('backups', DEFAULT_TRACE_CONFIG['backups'])), 0)
+        self.path = str(path or default_trace_path())
+    
+    def write(self, trace: Trace):
+        """Append one trace record; tracing never fails the request"""
+        if not self.enabled:
+            return
+        line = (json.dumps(trace.to_record(), separators=(',', ':')) + '\n').encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = self._open_locked()
+            try:
+                if self.max_bytes > 0 and os.fstat(fd).st_size + len(line) > self.max_bytes:
+                    self._rotate()
+                    os.close(fd)
+                    fd = self._open_locked()
+                os.write(fd, line)
+            finally:
+                # Closing the descriptor releases the lock
+                os.close(fd)
+        except OSError:
+            pass
+    
+    def _open_locked(self) -> int:
+        """Open the current log file and lock it, following concurrent rotations"""
+        while True:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            # Another writer may have rotated the file while we waited
+            try:
+                current = os.stat(self.path).st_ino
+            except OSError:
+                current = None
+            if os.fstat(fd).st_ino == current:
+                return fd
+            os.close(fd)
+    
+    def _rotate(self):
+        """Shift traces.log -> traces.log.1 -> ... dropping the oldest"""
+        if self.backups == 0:
+            os.truncate(self.path, 0)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+    
+    def files(self) -> List[str]:
+        """Log files, oldest first"""
+        rotated = [f"{self.path}.{index}" for index in range(self.backups, 0, -1)]
+        return [path for path in rotated + [self.path] if os.path.exists(path)]
+    
+    def records(self):
+        """Every record, oldest first"""
+        for path in self.files():
+            try:
+                with open(path, 'rb') as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue
+            except OSError:
+                continue
+    
+    def find(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Records for a trace id, or for the traces it is a unique prefix of"""
+        matches = [record for record in self.records() if str(record.get('id', '')).startswith(trace_id)]
+        return sorted(matches, key=lambda record: record.get('ts', 0))
+    
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Latest server-side records (one per traced tool call)"""
+        records = [record for record in self.records() if record.get('src') == 'server']
+        return records[-limit:]
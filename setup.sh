@@ -76,6 +76,11 @@ if [ $? -ne 0 ]; then
     echo "   Install with: pip3 install requests"
     echo ""
 fi
+python3 -c "import orjson" 2>/dev/null || python3 -c "import ujson" 2>/dev/null
+if [ $? -ne 0 ]; then
+    echo "ℹ️  Optional: pip3 install orjson for faster MCP message encoding"
+    echo ""
+fi
 
 echo "CCMaster v${VERSION} setup complete!"
 echo ""
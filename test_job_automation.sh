@@ -4,11 +4,14 @@
 echo "Testing CCMaster Job Automation..."
 echo "=================================="
 
+# Jobs live in ~/.ccmaster/jobs.db; mcp/jobstore.py only needs the standard library
+MCP_DIR="$(cd "$(dirname "$0")" && pwd)/mcp"
+
 # Find a designer session
-DESIGNER_SESSION=$(ls ~/.ccmaster/job_queue | grep -E "designer|mcp_" | head -1)
+DESIGNER_SESSION=$(python3 -c "import json, os; sessions = json.load(open(os.path.expanduser('~/.ccmaster/sessions.json'))); print('\n'.join(s for s, d in sessions.items() if d.get('status') != 'ended'))" 2>/dev/null | grep -E "designer|mcp_" | head -1)
 
 if [ -z "$DESIGNER_SESSION" ]; then
-    echo "No session found with job queue. Please ensure CCMaster is watching sessions."
+    echo "No active session found. Please ensure CCMaster is watching sessions."
     exit 1
 fi
 
@@ -17,12 +20,13 @@ echo ""
 
 # Create a test job
 JOB_ID="job_test_$(date +%s)"
-JOB_FILE="$HOME/.ccmaster/job_queue/$DESIGNER_SESSION/$JOB_ID.json"
 
-mkdir -p "$HOME/.ccmaster/job_queue/$DESIGNER_SESSION"
+python3 - "$MCP_DIR" <<EOF || exit 1
+import sys
+sys.path.insert(0, sys.argv[1])
+from jobstore import JobStore
 
-cat > "$JOB_FILE" <<EOF
-{
+JobStore().add({
   "id": "$JOB_ID",
   "title": "Test Automated Job Execution",
   "description": "This is a test job to verify automation is working. Please type 'echo Job automation is working!' and then mark this job as complete.",
@@ -32,11 +36,11 @@ cat > "$JOB_FILE" <<EOF
   "created_by_identity": "tester",
   "assigned_to": "$DESIGNER_SESSION",
   "created_at": "$(date -u +%Y-%m-%dT%H:%M:%S.%NZ)"
-}
+})
 EOF
 
 echo "Created test job: $JOB_ID"
-echo "Job file: $JOB_FILE"
+echo "Job store: $HOME/.ccmaster/jobs.db"
 echo ""
 echo "Now monitoring job status..."
 echo "If automation is working, the job should change from 'pending' to 'doing' within 20 seconds."
@@ -44,8 +48,8 @@ echo ""
 
 # Monitor job status for 30 seconds
 for i in {1..30}; do
-    if [ -f "$JOB_FILE" ]; then
-        STATUS=$(jq -r '.status' "$JOB_FILE" 2>/dev/null)
+    STATUS=$(python3 -c "import sys; sys.path.insert(0, '$MCP_DIR'); from jobstore import JobStore; job = JobStore().get('$JOB_ID'); print(job['status'] if job else '')" 2>/dev/null)
+    if [ -n "$STATUS" ]; then
         echo -ne "\rCheck $i/30: Job status = $STATUS    "
         
         if [ "$STATUS" = "doing" ]; then
@@ -55,7 +59,7 @@ for i in {1..30}; do
             exit 0
         fi
     else
-        echo -e "\n\n❌ Job file disappeared unexpectedly!"
+        echo -e "\n\n❌ Job disappeared from the job store unexpectedly!"
         exit 1
     fi
     sleep 1
@@ -0,0 +1,85 @@
+"""
+Shared fixtures for the CCMaster test suite
+
+Every test runs with HOME pointed at a temporary directory, so job stores,
+mailboxes and journals never touch the real ~/.ccmaster.
+"""
+
+import importlib.machinery
+import importlib.util
+import os
+import queue
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'ccmaster', 'hooks'))
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.delenv('CCMASTER_SESSION_ID', raising=False)
+    return tmp_path
+
+
+def load_ccmaster_module():
+    """Import bin/ccmaster (a script without a .py suffix) as a module"""
+    path = os.path.join(ROOT, 'ccmaster', 'bin', 'ccmaster')
+    loader = importlib.machinery.SourceFileLoader('ccmaster_main', path)
+    spec = importlib.util.spec_from_loader('ccmaster_main', loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def ccmaster(home):
+    """A CCMaster with a real job store and graph, but no terminals, hooks or MCP server
+    
+    Prompts typed into sessions are recorded in `sent` instead of being sent.
+    """
+    from mcp.jobstore import JobStore
+    from mcp.jobgraph import JobGraph
+    
+    module = load_ccmaster_module()
+    instance = module.CCMaster.__new__(module.CCMaster)
+    instance.config = {}
+    instance.sessions = {}
+    instance.active_sessions = {}
+    instance.current_status = {}
+    instance.session_identities = {}
+    instance.message_queue = queue.Queue()
+    instance.job_store = JobStore(str(home / 'jobs.db'), str(home / 'job_queue'))
+    instance.job_graph = JobGraph(instance.job_store)
+    instance.job_dispatch_pending = set()
+    instance.job_dispatch_lock = threading.Lock()
+    instance.sent = []
+    instance.log_event = lambda *args, **kwargs: None
+    instance.cli_log = lambda *args, **kwargs: None
+    instance.get_session_prefix = lambda session_id: ''
+    instance.send_continue_to_claude = lambda session_id, prompt=None: instance.sent.append((session_id, prompt)) or True
+    return instance
+
+
+def add_session(ccmaster, session_id, status='idle'):
+    ccmaster.sessions[session_id] = {'status': 'active'}
+    ccmaster.active_sessions[session_id] = {'index': len(ccmaster.active_sessions) + 1}
+    ccmaster.current_status[session_id] = status
+
+
+def add_blocking_tool(server, monkeypatch, name='hold'):
+    """Register a slow tool on an MCPServer that runs until the returned event is set"""
+    release = threading.Event()
+    
+    def hold(action=None):
+        release.wait(10)
+        return {"released": release.is_set()}
+    
+    server.register_tool(name, hold, {"name": name, "description": "Block until released",
+                                      "inputSchema": {"type": "object", "properties": {}}})
+    monkeypatch.setattr(server.session_tools, 'SLOW_CALLS', server.session_tools.SLOW_CALLS | {(name, None)})
+    return release
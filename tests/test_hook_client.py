@@ -0,0 +1,24 @@
+"""Hook entrypoints forwarding to the hook server, or applying events themselves"""
+
+import time
+
+import hook_client
+import hook_utils
+
+
+def test_direct_path_applies_slow_events_to_completion(home, monkeypatch):
+    monkeypatch.setattr(hook_client, 'SOCKET_PATH', str(home / 'no-server.sock'))
+    applied = []
+    
+    def slow_handle_event(event, session_id, data, event_id=None, ts=None):
+        # Well past the 5 ms budget
+        time.sleep(0.05)
+        applied.append(event_id)
+        return {"allow": True, "applied": True}
+    
+    monkeypatch.setattr(hook_utils, 'handle_event', slow_handle_event)
+    monkeypatch.setattr(hook_client, 'spool_event', lambda *args: applied.append('spooled'))
+    
+    response = hook_client.deliver_event('PreToolUse', 'alice', {})
+    assert response == {"allow": True, "applied": True}
+    assert len(applied) == 1 and applied[0] != 'spooled'
@@ -0,0 +1,127 @@
+"""Jobs reach idle sessions one at a time, on JOB messages and idle checks"""
+
+import queue
+
+from mcp.tools import SessionTools
+
+from conftest import add_session
+
+
+def drain(ccmaster):
+    """Handle queued JOB messages the way the watch loop does"""
+    while True:
+        try:
+            session_id, msg_type, _, _, message = ccmaster.message_queue.get_nowait()
+        except queue.Empty:
+            return
+        if msg_type == 'JOB':
+            ccmaster.handle_job_dispatch(session_id, message)
+
+
+def send(tools, session_id, title, **kwargs):
+    result = tools.job(action='send_to_session', session_id=session_id, title=title, description=title, **kwargs)
+    assert result.get('success'), result
+    return result['job_id']
+
+
+def test_burst_of_jobs_starts_one(ccmaster):
+    add_session(ccmaster, 'alice')
+    tools = SessionTools(ccmaster)
+    first = send(tools, 'alice', 'first')
+    second = send(tools, 'alice', 'second')
+    
+    # Both sends asked for dispatch, but only one message is queued for the session
+    assert ccmaster.message_queue.qsize() == 1
+    drain(ccmaster)
+    
+    assert len(ccmaster.sent) == 1
+    assert ccmaster.current_status['alice'] == 'processing'
+    statuses = {job_id: ccmaster.job_store.get(job_id)['status'] for job_id in (first, second)}
+    assert sorted(statuses.values()) == ['doing', 'pending']
+
+
+def test_next_job_starts_after_complete(ccmaster, monkeypatch):
+    add_session(ccmaster, 'alice')
+    tools = SessionTools(ccmaster)
+    first = send(tools, 'alice', 'first', priority='p0')
+    second = send(tools, 'alice', 'second', priority='p2')
+    drain(ccmaster)
+    assert ccmaster.job_store.get(first)['status'] == 'doing'
+    
+    # Claude completes the job while still busy, so the dispatch it triggers is a no-op...
+    monkeypatch.setenv('CCMASTER_SESSION_ID', 'alice')
+    assert tools.job(action='complete', job_id=first, result='ok').get('success')
+    drain(ccmaster)
+    assert ccmaster.job_store.get(second)['status'] == 'pending'
+    
+    # ...and the next job starts when its Stop hook reports idle
+    ccmaster.current_status['alice'] = 'idle'
+    assert ccmaster.check_and_start_job('alice') == second
+    assert ccmaster.job_store.get(second)['status'] == 'doing'
+    assert [prompt for _, prompt in ccmaster.sent if second in prompt]
+
+
+def test_busy_session_is_not_dispatched(ccmaster):
+    add_session(ccmaster, 'alice', status='working')
+    tools = SessionTools(ccmaster)
+    job_id = send(tools, 'alice', 'later')
+    drain(ccmaster)
+    
+    assert ccmaster.sent == []
+    assert ccmaster.job_store.get(job_id)['status'] == 'pending'
+    
+    # Dispatch requests are accepted again once the earlier one was handled
+    ccmaster.current_status['alice'] = 'idle'
+    ccmaster.request_job_dispatch(['alice'])
+    drain(ccmaster)
+    assert ccmaster.job_store.get(job_id)['status'] == 'doing'
+
+
+def test_unsent_prompt_returns_job_to_queue(ccmaster):
+    add_session(ccmaster, 'alice')
+    ccmaster.send_continue_to_claude = lambda session_id, message=None: False
+    tools = SessionTools(ccmaster)
+    job_id = send(tools, 'alice', 'first')
+    drain(ccmaster)
+    
+    job = ccmaster.job_store.get(job_id)
+    assert job['status'] == 'pending'
+    assert job['assigned_to'] == 'alice'
+    assert ccmaster.current_status['alice'] == 'idle'
+    # And the graph offers it again
+    assert ccmaster.job_graph.pop_ready('alice') == job_id
+
+
+def test_stolen_job_claims_for_thief(ccmaster):
+    add_session(ccmaster, 'alice', status='working')
+    add_session(ccmaster, 'bob')
+    tools = SessionTools(ccmaster)
+    for session_id in ('alice', 'bob'):
+        ccmaster.job_store.join_pool('team', session_id)
+    stealable = send(tools, 'alice', 'stealable')
+    pinned = send(tools, 'alice', 'pinned', pinned=True)
+    drain(ccmaster)
+    
+    job = ccmaster.job_store.get(stealable)
+    assert (job['status'], job['assigned_to'], job['stolen_from']) == ('doing', 'bob', 'alice')
+    assert ccmaster.job_store.get(pinned)['status'] == 'pending'
+    assert [session_id for session_id, _ in ccmaster.sent] == ['bob']
+
+
+def test_idle_check_between_write_and_dispatch(ccmaster):
+    add_session(ccmaster, 'alice')
+    add_session(ccmaster, 'bob')
+    tools = SessionTools(ccmaster)
+    add = ccmaster.job_store.add
+    
+    def add_then_check_bob(job):
+        # bob's watch loop looks for work after the job is written but before it is dispatched
+        add(job)
+        assert ccmaster.check_and_start_job('bob') is None
+    
+    ccmaster.job_store.add = add_then_check_bob
+    job_id = send(tools, 'alice', 'first')
+    drain(ccmaster)
+    
+    assert ccmaster.job_store.get(job_id)['status'] == 'doing'
+    assert [session_id for session_id, _ in ccmaster.sent] == ['alice']
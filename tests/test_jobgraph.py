@@ -0,0 +1,148 @@
+"""Dependency graph: ready heaps kept in step with the job store's change feed"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from mcp.jobgraph import JobGraph
+from mcp.jobstore import JobStore, pool_queue
+
+BASE = datetime(2025, 1, 1)
+
+
+def job(job_id, assigned_to='alice', priority='p1', minute=0, dependencies=(), **extra):
+    return dict({
+        "id": job_id,
+        "assigned_to": assigned_to,
+        "status": "pending",
+        "priority": priority,
+        "created_at": (BASE + timedelta(minutes=minute)).isoformat(),
+        "dependencies": list(dependencies)
+    }, **extra)
+
+
+@pytest.fixture
+def store(home):
+    return JobStore(str(home / 'jobs.db'), str(home / 'job_queue'))
+
+
+@pytest.fixture
+def graph(store):
+    return JobGraph(store)
+
+
+def test_pops_in_priority_then_age_order(store, graph):
+    store.add(job('p2', priority='p2'))
+    store.add(job('late', minute=2))
+    store.add(job('early', minute=1))
+    store.add(job('p0', priority='p0', minute=5))
+    assert graph.sync() == {'alice'}
+    
+    assert [graph.pop_ready('alice') for _ in range(5)] == ['p0', 'early', 'late', 'p2', None]
+
+
+def test_complete_releases_dependents_across_sessions(store, graph):
+    store.add(job('build', assigned_to='bob'))
+    store.add(job('deploy', dependencies=['build']))
+    graph.sync()
+    assert graph.pop_ready('alice') is None
+    assert graph.pop_ready('bob') == 'build'
+    
+    store.update('build', {'status': 'doing'})
+    assert graph.sync() == set()
+    store.update('build', {'status': 'done'})
+    # alice gained a ready job and is told so
+    assert graph.sync() == {'alice'}
+    assert graph.pop_ready('alice') == 'deploy'
+
+
+def test_waits_for_every_dependency(store, graph):
+    store.add(job('a'))
+    store.add(job('b'))
+    store.add(job('c', dependencies=['a', 'b']))
+    graph.sync()
+    for job_id in ('a', 'b'):
+        assert graph.pop_ready('alice') == job_id
+    
+    store.update('a', {'status': 'done'})
+    graph.sync()
+    assert graph.pop_ready('alice') is None
+    store.update('b', {'status': 'done'})
+    graph.sync()
+    assert graph.pop_ready('alice') == 'c'
+
+
+def test_cancelled_dependency_is_never_met(store, graph):
+    store.add(job('a'))
+    store.add(job('b', dependencies=['a']))
+    graph.sync()
+    store.update('a', {'status': 'cancelled'})
+    assert graph.sync() == set()
+    assert graph.pop_ready('alice') is None
+    assert graph.ready_count(('alice', False)) == 0
+
+
+def test_cancelled_job_leaves_its_queue(store, graph):
+    store.add(job('a'))
+    store.add(job('b', minute=1))
+    graph.sync()
+    store.update('a', {'status': 'cancelled'})
+    graph.sync()
+    assert graph.ready_count(('alice', False)) == 1
+    assert graph.pop_ready('alice') == 'b'
+
+
+def test_started_elsewhere_is_skipped(store, graph):
+    store.add(job('a'))
+    store.add(job('b', minute=1))
+    graph.sync()
+    # Another process starts 'a' without going through this graph
+    JobStore(store.path, str(store.legacy_dir)).update('a', {'status': 'doing'})
+    graph.sync()
+    assert graph.pop_ready('alice') == 'b'
+
+
+def test_requeue_after_failed_claim(store, graph):
+    store.add(job('a'))
+    graph.sync()
+    assert graph.pop_ready('alice') == 'a'
+    assert graph.pop_ready('alice') is None
+    graph.requeue('a')
+    assert graph.pop_ready('alice') == 'a'
+
+
+def test_reassigned_job_moves_queue(store, graph):
+    store.add(job('a', assigned_to=pool_queue('team')))
+    assert graph.sync() == {pool_queue('team')}
+    store.update('a', {'assigned_to': 'bob'})
+    assert graph.sync() == {'bob'}
+    assert graph.pop_best([(pool_queue('team'), False)]) is None
+    assert graph.pop_ready('bob') == 'a'
+
+
+def test_pop_best_across_queues(store, graph):
+    store.add(job('own', minute=3))
+    store.add(job('pinned', minute=2, pinned=True))
+    store.add(job('pooled', assigned_to=pool_queue('team'), minute=1))
+    graph.sync()
+    queues = [('alice', False), ('alice', True), (pool_queue('team'), False)]
+    assert [graph.pop_best(queues) for _ in range(4)] == ['pooled', 'pinned', 'own', None]
+
+
+def test_rebuild_matches_incremental_state(store, graph):
+    store.add(job('a'))
+    store.add(job('b', dependencies=['a']))
+    store.add(job('c', minute=1))
+    graph.sync()
+    store.update('a', {'status': 'done'})
+    graph.sync()
+    
+    fresh = JobGraph(store)
+    assert [fresh.pop_ready('alice') for _ in range(3)] == ['b', 'c', None]
+    assert [graph.pop_ready('alice') for _ in range(3)] == ['b', 'c', None]
+
+
+def test_check_dependencies(store, graph):
+    store.add(job('a'))
+    assert graph.check_dependencies(['a']) is None
+    assert graph.check_dependencies(['a', 'nope']) == "Unknown dependencies: nope"
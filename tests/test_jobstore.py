@@ -0,0 +1,141 @@
+"""SQLite job store: writes, claims, change feed and migration"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from mcp.jobstore import JobStore, pool_queue
+
+BASE = datetime(2025, 1, 1)
+
+
+def job(job_id, assigned_to='alice', status='pending', priority='p1', minute=0, **extra):
+    return dict({
+        "id": job_id,
+        "title": job_id,
+        "assigned_to": assigned_to,
+        "status": status,
+        "priority": priority,
+        "created_at": (BASE + timedelta(minutes=minute)).isoformat(),
+        "dependencies": []
+    }, **extra)
+
+
+@pytest.fixture
+def store(home):
+    return JobStore(str(home / 'jobs.db'), str(home / 'job_queue'))
+
+
+def test_add_and_read_back(store):
+    store.add(job('a', extra_field=[1, 2]))
+    assert store.get('a')['extra_field'] == [1, 2]
+    assert store.get('missing') is None
+    with pytest.raises(sqlite3.IntegrityError):
+        store.add(job('a'))
+
+
+def test_list_is_in_queue_order(store):
+    store.add(job('late-p1', minute=5))
+    store.add(job('p2', priority='p2', minute=0))
+    store.add(job('early-p1', minute=1))
+    store.add(job('p0', priority='p0', minute=9))
+    store.add(job('bob', assigned_to='bob'))
+    store.add(job('custom', priority='urgent', minute=3))
+    
+    assert [j['id'] for j in store.list('alice')] == ['p0', 'early-p1', 'custom', 'late-p1', 'p2']
+    # Unknown priorities sort with p1 but only match their own name
+    assert [j['id'] for j in store.list('alice', priorities=['p1'])] == ['early-p1', 'late-p1']
+    assert [j['id'] for j in store.list('alice', priorities=['urgent'])] == ['custom']
+    assert [j['id'] for j in store.list('alice', limit=2)] == ['p0', 'early-p1']
+
+
+def test_claim_only_from_allowed_status(store):
+    store.add(job('a'))
+    before, after = store.update('a', {'status': 'doing'}, allowed=('pending',))
+    assert (before['status'], after['status']) == ('pending', 'doing')
+    
+    # A second claimer loses: nothing is written
+    before, after = store.update('a', {'status': 'doing', 'assigned_to': 'bob'}, allowed=('pending',))
+    assert before['status'] == 'doing' and after is None
+    assert store.get('a')['assigned_to'] == 'alice'
+    
+    assert store.update('missing', {'status': 'done'}) == (None, None)
+    # assigned_to guards against touching another session's job
+    assert store.update('a', {'status': 'done'}, assigned_to='bob') == (None, None)
+
+
+def test_counts_and_locate(store):
+    store.add(job('a'))
+    store.add(job('b', status='done'))
+    store.add(job('c', assigned_to='bob', status='doing'))
+    
+    assert store.counts('alice') == {'pending': 1, 'doing': 0, 'done': 1, 'cancelled': 0}
+    assert store.counts()['doing'] == 1
+    assert store.locate(['c', 'a', 'missing']) == {
+        'a': {'assigned_to': 'alice', 'status': 'pending'},
+        'c': {'assigned_to': 'bob', 'status': 'doing'}
+    }
+    assert set(store.get_many(['a', 'b', 'missing'])) == {'a', 'b'}
+
+
+def test_page_resumes_after_key(store):
+    for n in range(5):
+        store.add(job(f'j{n}', minute=n))
+    first = store.page('alice', limit=2)
+    after = (1, first[-1]['created_at'], first[-1]['id'])
+    assert [j['id'] for j in store.page('alice', after=after)] == ['j2', 'j3', 'j4']
+
+
+def test_change_feed_follows_every_write(store, home):
+    store.add(job('a'))
+    store.add(job('b'))
+    seq = store.changes(0)[-1][0]
+    
+    # Writes through another connection (another process) show up too
+    other = JobStore(store.path, str(home / 'job_queue'))
+    other.update('a', {'status': 'doing'})
+    changes = store.changes(seq)
+    assert [(j['id'], j['status']) for _, j in changes] == [('a', 'doing')]
+    assert changes[0][0] > seq
+
+
+def test_pools(store):
+    assert store.join_pool('team', 'alice')
+    assert store.join_pool('team', 'bob')
+    assert not store.join_pool('team', 'alice')
+    assert store.pools_of('alice') == ['team']
+    assert store.pool_members('team') == ['alice', 'bob']
+    assert store.leave_pool('team', 'alice')
+    assert not store.leave_pool('team', 'alice')
+    assert store.pools() == {'team': ['bob']}
+    assert pool_queue('team') == 'pool:team'
+
+
+def test_migrates_legacy_job_files(home):
+    legacy = home / 'job_queue'
+    (legacy / 'alice').mkdir(parents=True)
+    (legacy / 'alice' / 'old1.json').write_text(json.dumps({"title": "t", "status": "pending", "priority": "p0",
+                                                             "created_at": BASE.isoformat()}))
+    (legacy / 'alice' / 'broken.json').write_text('{')
+    
+    store = JobStore(str(home / 'jobs.db'), str(legacy))
+    assert store.migrated == 1
+    assert store.get('old1')['assigned_to'] == 'alice'
+    assert not legacy.exists() and (home / 'job_queue.migrated').is_dir()
+    # Opening again doesn't import twice
+    assert JobStore(str(home / 'jobs.db'), str(legacy)).migrated == 0
+
+
+def test_upgrades_version_1_database(home):
+    path = str(home / 'jobs.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, assigned_to TEXT NOT NULL, status TEXT NOT NULL, "
+                 "priority INTEGER NOT NULL, created_at TEXT NOT NULL, data TEXT NOT NULL)")
+    conn.execute("INSERT INTO jobs VALUES ('a', 'alice', 'pending', 1, '', ?)", (json.dumps(job('a')),))
+    conn.commit()
+    conn.close()
+    
+    store = JobStore(path, str(home / 'job_queue'))
+    assert [j['id'] for _, j in store.changes(0)] == ['a']
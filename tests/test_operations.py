@@ -0,0 +1,45 @@
+"""Asynchronous tool calls tracked with the operation tool"""
+
+import json
+import threading
+
+import pytest
+
+from mcp.server import MCPServer
+
+from conftest import add_blocking_tool
+
+
+@pytest.fixture
+def server(ccmaster):
+    ccmaster.config = {'mcp': {'workers': {'slow': 1}}}
+    server = MCPServer(ccmaster, 'localhost', 0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def call(server, message_id, name, **arguments):
+    response = json.loads(server.handle_tool_call(message_id, {"name": name, "arguments": arguments}))
+    return json.loads(response['result']['content'][0]['text'])
+
+
+def test_wait_does_not_need_a_slow_worker(server, monkeypatch):
+    release = add_blocking_tool(server, monkeypatch)
+    try:
+        operation_id = call(server, 1, 'hold', **{'async': True})['operation_id']
+        
+        # The only slow worker is running the call being waited for
+        waited = []
+        waiter = threading.Thread(target=lambda: waited.append(
+            call(server, 2, 'operation', action='wait', operation_id=operation_id, timeout=0.2)))
+        waiter.start()
+        waiter.join(5)
+        assert waited and waited[0]['status'] == 'running'
+        
+        release.set()
+        result = call(server, 3, 'operation', action='wait', operation_id=operation_id, timeout=5)
+        assert result['status'] == 'completed'
+        assert result['result'] == {"released": True}
+    finally:
+        release.set()
@@ -0,0 +1,226 @@
+"""Cursor pagination of list results: in memory, job store keyset pages, and mail"""
+
+import json
+import os
+import time
+
+import pytest
+
+from mcp.paging import MAX_PAGE_SIZE, decode_cursor, encode_cursor, paginate
+from mcp.tools import SessionTools
+
+from conftest import add_session
+
+
+def walk(fetch, limit):
+    """Follow next_cursor from the first page to the last; fetch(limit, cursor) -> (items, next_cursor)"""
+    items, cursor, pages = [], None, 0
+    while True:
+        page, cursor = fetch(limit, cursor)
+        items.extend(page)
+        pages += 1
+        if not cursor:
+            return items, pages
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(42, ['p', 'x'])
+    assert decode_cursor(cursor) == {"o": 42, "a": ['p', 'x']}
+    with pytest.raises(ValueError):
+        decode_cursor('not a cursor')
+
+
+def test_paginate_walks_every_record_once():
+    records = [{"id": n} for n in range(23)]
+    items, pages = walk(lambda limit, cursor: paginate(records, "id", limit, cursor), 5)
+    assert [item["id"] for item in items] == list(range(23))
+    assert pages == 5
+
+
+def test_paginate_boundary_survives_insert_ahead():
+    records = [{"id": n, "name": str(n)} for n in range(10)]
+    page, cursor = paginate(records, "id", 4, fields=["id"])
+    assert page == [{"id": n} for n in range(4)]
+    # A newer record lands ahead of the page boundary
+    records.insert(0, {"id": 99})
+    page, _ = paginate(records, "id", 4, cursor)
+    assert [record["id"] for record in page] == [4, 5, 6, 7]
+
+
+def test_paginate_clamps_limit():
+    records = [{"id": n} for n in range(MAX_PAGE_SIZE + 5)]
+    page, cursor = paginate(records, "id", 10 ** 6)
+    assert len(page) == MAX_PAGE_SIZE and cursor
+
+
+@pytest.fixture
+def tools(ccmaster, monkeypatch):
+    add_session(ccmaster, 'alice', status='working')
+    add_session(ccmaster, 'bob', status='working')
+    monkeypatch.setenv('CCMASTER_SESSION_ID', 'alice')
+    return SessionTools(ccmaster)
+
+
+def send_jobs(tools, count, priority='p1'):
+    ids = []
+    for n in range(count):
+        result = tools.job(action='send_to_session', session_id='alice', title=f'job {n}',
+                           description='-', priority=priority)
+        ids.append(result['job_id'])
+    return ids
+
+
+def list_page(tools, **kwargs):
+    def fetch(limit, cursor):
+        result = tools.job(action='list', limit=limit, cursor=cursor, **kwargs)
+        assert result.get('success'), result
+        return result['jobs'], result['next_cursor']
+    return fetch
+
+
+def test_job_list_pages_in_queue_order(tools):
+    low = send_jobs(tools, 4, 'p2')
+    high = send_jobs(tools, 3, 'p0')
+    normal = send_jobs(tools, 5)
+    
+    jobs, pages = walk(list_page(tools), 3)
+    assert [job['id'] for job in jobs] == high + normal + low
+    assert pages == 4
+
+
+def test_job_list_counts_and_filters(tools):
+    ids = send_jobs(tools, 6)
+    send_jobs(tools, 2, 'p0')
+    tools.job_store.update(ids[0], {'status': 'done'})
+    tools.job_store.update(ids[1], {'status': 'cancelled'})
+    
+    result = tools.job(action='list', limit=2, status_filter=['pending'], priority_filter=['p1'], fields=['id'])
+    assert result['total_count'] == 4
+    assert result['status_counts'] == {'pending': 4, 'doing': 0, 'done': 0, 'cancelled': 0}
+    assert result['jobs'] == [{'id': ids[2]}, {'id': ids[3]}]
+    
+    everything = tools.job(action='list')
+    assert everything['total_count'] == 8
+    assert everything['status_counts']['done'] == 1
+
+
+def test_job_list_cursor_survives_new_jobs(tools):
+    first = send_jobs(tools, 4)
+    result = tools.job(action='list', limit=2)
+    # A p0 job queued between pages sorts ahead of the cursor and doesn't shift the next page
+    send_jobs(tools, 1, 'p0')
+    following = tools.job(action='list', limit=2, cursor=result['next_cursor'])
+    assert [job['id'] for job in following['jobs']] == first[2:]
+
+
+def test_job_list_accepts_id_anchored_cursor(tools):
+    ids = send_jobs(tools, 4)
+    cursor = encode_cursor(2, ids[1])
+    result = tools.job(action='list', limit=10, cursor=cursor)
+    assert [job['id'] for job in result['jobs']] == ids[2:]
+    assert 'error' in tools.job(action='list', cursor=encode_cursor(2, 'job_gone'))
+
+
+def write_mail(tools, session_id, mail_id, read_by=(), age=0, folder='inbox', sender='bob', priority='normal'):
+    inbox = tools.mailbox_dir / session_id / folder
+    inbox.mkdir(parents=True, exist_ok=True)
+    path = inbox / f'{mail_id}.json'
+    path.write_text(json.dumps({"id": mail_id, "from": sender, "to": [session_id], "subject": mail_id,
+                                "body": "-", "priority": priority, "read_by": list(read_by)}))
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+def test_check_mail_pages_newest_first(tools):
+    for n in range(7):
+        write_mail(tools, 'alice', f'm{n}', read_by=['alice'] if n % 3 == 0 else [], age=100 - n)
+    
+    def fetch(limit, cursor):
+        result = tools.communicate(action='check_mail', unread_only=False, limit=limit, cursor=cursor)
+        assert result['total_count'] == 7 and result['unread_count'] == 4
+        return result['mails'], result['next_cursor']
+    mails, pages = walk(fetch, 3)
+    assert [mail['id'] for mail in mails] == [f'm{n}' for n in range(6, -1, -1)]
+    assert [mail['is_read'] for mail in mails] == [True, False, False, True, False, False, True]
+    assert pages == 3
+
+
+def count_opens(monkeypatch):
+    """Paths of mail files opened from here on"""
+    opened = []
+    real_open = open
+    
+    def counting_open(path, *args, **kwargs):
+        if str(path).endswith('.json'):
+            opened.append(path)
+        return real_open(path, *args, **kwargs)
+    monkeypatch.setattr('builtins.open', counting_open)
+    return opened
+
+
+def test_check_mail_reads_only_the_page(tools, monkeypatch):
+    for n in range(20):
+        write_mail(tools, 'alice', f'm{n}', age=100 - n)
+    tools.mail_read_ids('alice')  # Index the inbox once, as the first call would
+    opened = count_opens(monkeypatch)
+    
+    result = tools.communicate(action='check_mail', limit=2)
+    assert result['unread_count'] == 20 and len(result['mails']) == 2
+    assert len(opened) == 2
+
+
+def test_list_mail_reads_only_the_page(tools, monkeypatch):
+    for n in range(20):
+        write_mail(tools, 'alice', f'm{n}', read_by=['alice'] if n < 5 else [], age=100 - n)
+    tools.mail_read_ids('alice')
+    opened = count_opens(monkeypatch)
+    
+    result = tools.communicate(action='list_mail', limit=3)
+    assert [mail['id'] for mail in result['mails']] == ['m19', 'm18', 'm17']
+    assert (result['total_count'], result['unread_count']) == (20, 15)
+    assert len(opened) == 3
+    
+    def fetch(limit, cursor):
+        result = tools.communicate(action='list_mail', limit=limit, cursor=cursor)
+        return result['mails'], result['next_cursor']
+    mails, pages = walk(fetch, 6)
+    assert [mail['id'] for mail in mails] == [f'm{n}' for n in range(19, -1, -1)]
+    assert pages == 4
+
+
+def test_list_mail_filters_and_folders(tools):
+    for n in range(6):
+        write_mail(tools, 'alice', f'in{n}', sender='bob' if n % 2 else 'carol', age=100 - n,
+                   priority='high' if n == 5 else 'normal')
+    write_mail(tools, 'alice', 'out', folder='sent', sender='alice', age=0)
+    
+    def fetch(limit, cursor, **filters):
+        result = tools.communicate(action='list_mail', limit=limit, cursor=cursor, **filters)
+        assert result.get('success'), result
+        return result['mails'], result['next_cursor']
+    mails, _ = walk(lambda limit, cursor: fetch(limit, cursor, folder='all'), 3)
+    assert [(mail['id'], mail['folder']) for mail in mails][:2] == [('out', 'sent'), ('in5', 'inbox')]
+    mails, _ = walk(lambda limit, cursor: fetch(limit, cursor, from_session='bob'), 2)
+    assert [mail['id'] for mail in mails] == ['in5', 'in3', 'in1']
+    mails, _ = fetch(10, None, priority='high')
+    assert [mail['id'] for mail in mails] == ['in5']
+
+
+def test_list_mail_resumes_after_a_removed_mail(tools):
+    for n in range(4):
+        write_mail(tools, 'alice', f'm{n}', age=100 - n)
+    result = tools.communicate(action='list_mail', limit=2)
+    (tools.mailbox_dir / 'alice' / 'inbox' / 'm2.json').unlink()
+    result = tools.communicate(action='list_mail', limit=2, cursor=result['next_cursor'])
+    assert [mail['id'] for mail in result['mails']] == ['m1', 'm0']
+    assert tools.communicate(action='list_mail', cursor='nonsense').get('error')
+
+
+def test_reply_marks_mail_read(tools):
+    add_session(tools.ccmaster, 'bob', status='working')
+    write_mail(tools, 'alice', 'm1')
+    tools.communicate(action='reply_mail', mail_id='m1', body='thanks')
+    
+    result = tools.communicate(action='check_mail', unread_only=True)
+    assert result['total_count'] == 0 and result['unread_count'] == 0
+    assert tools.mail_read_ids('alice') == {'m1'}
@@ -0,0 +1,95 @@
+"""Prompt journal and its timestamp index"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from prompt_journal import DEDUPE_ENTRIES, INDEX_RECORD, PromptJournal
+
+
+@pytest.fixture
+def journal(home):
+    return PromptJournal(home / 'logs', 'alice')
+
+
+def prompts(entries):
+    return [entry['prompt'] for entry in entries]
+
+
+def test_append_and_query_ranges(journal):
+    for n in range(10):
+        assert journal.append(f'prompt {n}', ts=1000.0 + n * 10)
+    
+    assert prompts(journal.query()) == [f'prompt {n}' for n in range(10)]
+    assert prompts(journal.query(since=1020, until=1040)) == ['prompt 2', 'prompt 3', 'prompt 4']
+    assert prompts(journal.query(since=1021, until=1039)) == ['prompt 3']
+    assert prompts(journal.query(last=2)) == ['prompt 8', 'prompt 9']
+    assert prompts(journal.query(until=1035, last=2)) == ['prompt 2', 'prompt 3']
+    assert journal.query(since=5000) == []
+    assert os.path.getsize(journal.index_path) == 10 * INDEX_RECORD.size
+
+
+def test_duplicate_events_are_dropped(journal):
+    assert journal.append('hi', ts=1000.0, event_id='e1')
+    assert journal.append('there', ts=1001.0, event_id='e2')
+    # Same hook event, e.g. spooled and then delivered after all, even behind newer ones
+    assert not journal.append('hi', ts=1000.0, event_id='e1')
+    # Same text from a new event is a genuine repeat
+    assert journal.append('hi', ts=1000.5, event_id='e3')
+    assert journal.append('hi', ts=1000.6)
+    assert prompts(journal.query()) == ['hi', 'there', 'hi', 'hi']
+
+
+def test_dedupe_window_is_bounded(journal):
+    for n in range(DEDUPE_ENTRIES + 1):
+        assert journal.append(f'p{n}', ts=1000.0 + n, event_id=f'e{n}')
+    assert not journal.append('again', event_id=f'e{DEDUPE_ENTRIES}')
+    assert not journal.append('again', event_id='e1')
+    # Too old to be remembered
+    assert journal.append('again', event_id='e0')
+
+
+def test_late_prompt_keeps_index_sorted(journal):
+    journal.append('first', ts=1000.0)
+    journal.append('second', ts=1010.0)
+    journal.append('late', ts=1005.0)
+    
+    # Indexed at the latest timestamp so far, so range queries stay correct
+    assert prompts(journal.query(since=1008)) == ['second', 'late']
+    assert journal.query()[-1]['ts'] == 1005.0
+
+
+def test_missing_or_stale_index_is_rebuilt(journal):
+    for n in range(3):
+        journal.append(f'p{n}', ts=1000.0 + n)
+    os.unlink(journal.index_path)
+    assert prompts(journal.query(since=1001)) == ['p1', 'p2']
+    
+    # A crash between the log write and the index write leaves the index behind
+    with open(journal.log_path, 'a') as log:
+        log.write(json.dumps({'ts': 1003.0, 'prompt': 'p3'}) + '\n')
+    assert prompts(journal.query(since=1002.5)) == ['p3']
+    
+    # A torn index record
+    with open(journal.index_path, 'ab') as idx:
+        idx.write(b'\x00' * 3)
+    assert prompts(journal.query()) == ['p0', 'p1', 'p2', 'p3']
+
+
+def test_old_logs_without_ts_are_indexed(journal):
+    os.makedirs(os.path.dirname(journal.log_path))
+    with open(journal.log_path, 'w') as log:
+        for n in range(3):
+            log.write(json.dumps({'timestamp': datetime.fromtimestamp(1000 + n).isoformat(),
+                                  'prompt': f'old {n}'}) + '\n')
+        log.write('not json\n')
+    
+    assert prompts(journal.query(since=1001)) == ['old 1', 'old 2']
+    assert journal.append('new', ts=2000.0)
+    assert prompts(journal.query(last=2)) == ['old 2', 'new']
+
+
+def test_no_journal(journal):
+    assert journal.query() == []
@@ -0,0 +1,82 @@
+"""Requests on the MCP Unix socket run on the server's bounded pools"""
+
+import json
+import socket
+import threading
+
+import pytest
+
+from mcp.server import MCPServer
+
+from conftest import add_blocking_tool
+
+
+@pytest.fixture
+def server(ccmaster, home):
+    ccmaster.config = {'mcp': {'workers': {'socket': 2}}}
+    server = MCPServer(ccmaster, 'localhost', 0, socket_path=str(home / 'mcp.sock'))
+    server.start()
+    yield server
+    server.stop()
+
+
+def connect(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(server.socket_path)
+    return sock, sock.makefile('rb')
+
+
+def request(message_id, method='tools/list', params=None):
+    message = {"jsonrpc": "2.0", "id": message_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return (json.dumps(message) + '\n').encode()
+
+
+def test_many_requests_share_the_socket_pool(server):
+    sock, replies = connect(server)
+    try:
+        sock.sendall(b''.join(request(n) for n in range(20)))
+        answered = {json.loads(replies.readline())['id'] for _ in range(20)}
+        assert answered == set(range(20))
+        
+        threads = [thread.name for thread in threading.enumerate()]
+        assert len([name for name in threads if name.startswith('MCP-socket')]) <= 2
+        assert 'MCPSocketCall' not in threads
+    finally:
+        sock.close()
+
+
+def test_fast_call_returns_while_slow_calls_fill_the_pool(server, monkeypatch):
+    release = add_blocking_tool(server, monkeypatch)
+    sock, replies = connect(server)
+    sock.settimeout(5)
+    try:
+        sock.sendall(b''.join(request(n, 'tools/call', {"name": "hold", "arguments": {}}) for n in range(2)))
+        # Both socket workers are now waiting for their slow call
+        sock.sendall(request(2, 'tools/call', {"name": "job", "arguments": {"action": "list"}}))
+        reply = json.loads(replies.readline())
+        assert reply['id'] == 2 and 'result' in reply
+        
+        release.set()
+        assert {json.loads(replies.readline())['id'] for _ in range(2)} == {0, 1}
+    finally:
+        release.set()
+        sock.close()
+
+
+def test_parse_errors_and_notifications(server):
+    sock, replies = connect(server)
+    try:
+        # A notification gets no reply, so the next line read answers the request after it
+        sock.sendall(b'{not json\n'
+                     b'{"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 9}}\n'
+                     + request(1))
+        assert json.loads(replies.readline())['error']['code'] == -32603
+        assert json.loads(replies.readline())['id'] == 1
+    finally:
+        sock.close()
+
+
+def test_socket_pool_depth_is_reported(server):
+    assert server.pool_stats()['socket'] == {"workers": 2, "queued": 0}
@@ -0,0 +1,141 @@
+"""Shared status table slots, and the watcher that scans it"""
+
+import os
+import threading
+
+import pytest
+
+import hook_utils
+from status_journal import append_event, journal_path
+from status_table import StatusTable
+from status_watcher import StatusWatcher, _load_inotify
+
+
+@pytest.fixture
+def table(home):
+    table = StatusTable(str(home / 'status.table'), slot_count=4).open()
+    yield table
+    table.close()
+
+
+def test_update_bumps_sequence(table):
+    table.update('alice', 'working', 'Bash', ts=1.0)
+    table.update('alice', 'idle', ts=2.0)
+    # state=None keeps the state and only moves the counter
+    table.update('alice', ts=3.0)
+    
+    slot = table.scan()['alice']
+    assert (slot['state'], slot['tool'], slot['seq'], slot['ts']) == ('idle', None, 3, 3.0)
+
+
+def test_other_processes_see_updates(table):
+    other = StatusTable(table.path).open()
+    try:
+        other.update('bob', 'processing')
+        assert table.scan()['bob']['state'] == 'processing'
+    finally:
+        other.close()
+
+
+def test_concurrent_writers_never_lose_a_bump(table):
+    # Two "processes" (separate descriptors), each with writer threads sharing its table
+    tables = [table, StatusTable(table.path).open()]
+    
+    def bump(shared):
+        for _ in range(200):
+            shared.update('alice', 'working')
+    
+    try:
+        writers = [threading.Thread(target=bump, args=(shared,)) for shared in tables for _ in range(2)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        assert table.scan()['alice']['seq'] == 800
+    finally:
+        tables[1].close()
+
+
+def test_torn_slot_is_skipped(table):
+    table.update('alice', 'working')
+    index = table._find('alice')
+    # Flip one byte of the state, as if a reader caught the slot mid-write
+    offset = table._offset(index) + 64
+    byte = os.pread(table.fd, 1, offset)
+    os.pwrite(table.fd, bytes([byte[0] ^ 0xff]), offset)
+    
+    assert table.read_slot(index) is None
+    assert 'alice' not in table.scan()
+
+
+def test_full_table_recycles_stalest_slot(table):
+    for n, session_id in enumerate(['a', 'b', 'c', 'd']):
+        table.update(session_id, 'idle', ts=10.0 + n)
+    table.update('e', 'working', ts=20.0)
+    
+    assert set(table.scan()) == {'b', 'c', 'd', 'e'}
+
+
+class Recorder:
+    def __init__(self):
+        self.changed = []
+        self.event = threading.Event()
+    
+    def __call__(self, session_id):
+        self.changed.append(session_id)
+        self.event.set()
+    
+    def wait(self, timeout=2.0):
+        assert self.event.wait(timeout), "no dispatch"
+        self.event.clear()
+
+
+BACKENDS = ['poll'] + (['inotify'] if _load_inotify() else [])
+
+
+@pytest.fixture(params=BACKENDS)
+def watcher(request, home, monkeypatch):
+    status_dir = home / '.ccmaster' / 'status'
+    status_dir.mkdir(parents=True)
+    monkeypatch.setattr(hook_utils, '_status_table', None)
+    recorder = Recorder()
+    watcher = StatusWatcher(status_dir, recorder, poll_interval=0.05, backend=request.param, table=StatusTable())
+    watcher.recorder = recorder
+    watcher.start()
+    yield watcher
+    watcher.stop()
+
+
+def test_hook_write_dispatches_session(watcher):
+    watcher.watch('alice')
+    watcher.recorder.wait()  # Registration dispatches once
+    watcher.recorder.changed.clear()
+    
+    hook_utils.HookUtils('alice').update_status('working', tool='Bash')
+    watcher.recorder.wait()
+    assert set(watcher.recorder.changed) == {'alice'}
+
+
+def test_journal_event_without_table_update_is_dispatched(watcher):
+    if watcher.backend == 'poll':
+        pytest.skip("polling reads only the table for sessions that have a slot")
+    watcher.watch('alice')
+    hook_utils.HookUtils('alice').update_status('working')
+    watcher.recorder.wait()
+    watcher.recorder.changed.clear()
+    
+    # A hook whose table update failed: the journal still has the event
+    append_event(journal_path(watcher.status_dir, 'alice'), {'state': 'idle'})
+    watcher.recorder.wait()
+    assert 'alice' in watcher.recorder.changed
+
+
+def test_unwatched_sessions_are_not_dispatched(watcher):
+    watcher.watch('alice')
+    watcher.recorder.wait()
+    watcher.recorder.changed.clear()
+    
+    hook_utils.HookUtils('bob').update_status('working')
+    hook_utils.HookUtils('alice').update_status('idle')
+    watcher.recorder.wait()
+    assert 'bob' not in watcher.recorder.changed
@@ -0,0 +1,31 @@
+"""The stdio bridge waits for HTTP replies at least as long as the server may take"""
+
+import json
+
+from mcp.stdio_server import HTTP_TIMEOUT_MARGIN, StdioMCPBridge
+
+
+def call(timeout=None):
+    arguments = {"action": "wait"}
+    if timeout is not None:
+        arguments["timeout"] = timeout
+    return {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "operation", "arguments": arguments}}
+
+
+def test_http_timeout_follows_registry(home):
+    registry = home / 'mcp_port.json'
+    registry.write_text(json.dumps({"last_port": 8181, "call_timeout": 300}))
+    bridge = StdioMCPBridge(registry_path=str(registry))
+    bridge.connect_socket()
+    
+    assert bridge.http_timeout(call()) == 300 + HTTP_TIMEOUT_MARGIN
+    # A call asking for longer gets the server's headroom too, also inside a batch
+    assert bridge.http_timeout([call(), call(timeout=600)]) == 610 + HTTP_TIMEOUT_MARGIN
+    bridge.workers.shutdown()
+
+
+def test_http_timeout_default_covers_slow_calls(home):
+    bridge = StdioMCPBridge(registry_path=str(home / 'missing.json'))
+    bridge.connect_socket()
+    assert bridge.http_timeout({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}) > 120
+    bridge.workers.shutdown()